@@ -15,6 +15,10 @@ import sys
 import json
 import asyncio
 import logging
+import functools
+import hashlib
+import threading
+from collections import OrderedDict, deque
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
@@ -23,9 +27,10 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
 from plotly.utils import PlotlyJSONEncoder
 
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, Response, render_template, request, jsonify, session
 from flask_socketio import SocketIO, emit
 
 # Configuration des chemins
@@ -34,6 +39,11 @@ DATA_DIR = PROJECT_ROOT / 'data'
 EXPORTS_DIR = PROJECT_ROOT / 'exports'
 MODELS_DIR = PROJECT_ROOT / 'models'
 
+# Serveur Socket.IO en threads système : eventlet (déprécié) remplacerait les
+# threads des pools de calcul (chargement, extraction PDF, analyses) par des
+# greenlets sur un seul thread, annulant leur parallélisme
+ASYNC_MODE = 'threading'
+
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -43,8 +53,10 @@ from dashboard.services.ollama_service import OllamaService
 from dashboard.services.rag_service import RAGService
 from dashboard.services.data_service import DataService
 from dashboard.services.map_service import MapService
-from dashboard.utils.chart_generator import ChartGenerator
+from dashboard.utils.chart_generator import ChartGenerator, PLOTLY_JSON_ENGINE
 from dashboard.utils.helpers import setup_dashboard_logging
+from dashboard.utils.json_provider import install_json_provider
+from dashboard.utils.typed_array import pack_arrays
 
 class DashboardApp:
     """Application Dashboard principale"""
@@ -53,7 +65,8 @@ class DashboardApp:
         """Initialise l'application dashboard"""
         self.app = Flask(__name__, static_folder='dashboard/static', template_folder='templates')
         self.app.secret_key = 'malaysia-dashboard-key'
-        self.socketio = SocketIO(self.app, cors_allowed_origins="*")
+        install_json_provider(self.app)
+        self.socketio = SocketIO(self.app, cors_allowed_origins="*", async_mode=ASYNC_MODE)
         
         # Services
         self.ollama_service = OllamaService()
@@ -67,9 +80,31 @@ class DashboardApp:
             'data_loaded': False,
             'last_update': None,
             'current_dataset': None,
-            'analysis_history': []
+            'analysis_history': deque(maxlen=100)
         }
         
+        # Grille heatmap de consommation, calculée une fois par chargement
+        self._heatmap_grid = None
+        
+        # État d'Ollama, renseigné en tâche de fond au démarrage
+        self._ollama_status = None
+        
+        # Réponses LLM déjà calculées (correspondance exacte de la question),
+        # LRU partagé entre les threads des requêtes
+        self._qa_cache: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._qa_cache_size = 256
+        self._qa_cache_lock = threading.Lock()
+        
+        # Cache des réponses graphiques/cartes, indexé par version du jeu de données
+        self._dataset_version = 0
+        self._payload_builders = []
+        for name in ('_build_overview_charts', '_build_consumption_charts',
+                     '_build_buildings_map', '_build_consumption_heatmap',
+                     '_build_zones_map', '_build_map_statistics'):
+            cached = functools.lru_cache(maxsize=128)(getattr(self, name))
+            setattr(self, name, cached)
+            self._payload_builders.append(cached)
+        
         self._setup_routes()
         logger.info("✅ Dashboard App initialisée")
     
@@ -89,6 +124,10 @@ class DashboardApp:
                 self.cache['data_loaded'] = True
                 self.cache['last_update'] = datetime.now()
                 self.cache['current_dataset'] = data_info
+                self._invalidate_payload_cache()
+                with self._qa_cache_lock:
+                    self._qa_cache.clear()
+                self._heatmap_grid = self._precompute_heatmap_grid()
                 
                 return jsonify({
                     'success': True,
@@ -100,6 +139,7 @@ class DashboardApp:
                 return jsonify({'success': False, 'error': str(e)}), 500
         
         @self.app.route('/api/data/summary')
+        @self._versioned
         def data_summary():
             """Résumé des données actuelles"""
             if not self.cache['data_loaded']:
@@ -112,32 +152,31 @@ class DashboardApp:
                 return jsonify({'success': False, 'error': str(e)}), 500
         
         @self.app.route('/api/charts/overview')
+        @self._versioned
         def charts_overview():
             """Génère les graphiques de vue d'ensemble"""
             if not self.cache['data_loaded']:
                 return jsonify({'success': False, 'error': 'Aucune donnée chargée'})
             
             try:
-                charts = self.chart_generator.create_overview_charts(
-                    self.data_service.get_current_data()
+                return self._json_response(
+                    self._build_overview_charts(self._dataset_version)
                 )
-                return jsonify({'success': True, 'charts': charts})
             except Exception as e:
                 return jsonify({'success': False, 'error': str(e)}), 500
         
         @self.app.route('/api/charts/consumption')
+        @self._versioned
         def charts_consumption():
             """Graphiques de consommation électrique"""
             try:
                 time_range = request.args.get('range', '7d')
                 building_type = request.args.get('type', 'all')
+                raw = request.args.get('raw', 'false').lower() == 'true'
                 
-                charts = self.chart_generator.create_consumption_charts(
-                    self.data_service.get_current_data(),
-                    time_range=time_range,
-                    building_type=building_type
+                return self._json_response(
+                    self._build_consumption_charts(self._dataset_version, time_range, building_type, raw)
                 )
-                return jsonify({'success': True, 'charts': charts})
             except Exception as e:
                 return jsonify({'success': False, 'error': str(e)}), 500
         
@@ -151,6 +190,19 @@ class DashboardApp:
                 if not question:
                     return jsonify({'success': False, 'error': 'Question requise'})
                 
+                # Questions triviales : réponse directe sans RAG ni LLM
+                cache_key = ' '.join(question.lower().split())
+                if len(cache_key) < 4:
+                    return jsonify(self._trivial_analysis_response(question))
+                
+                # Question déjà posée sur le même jeu de données
+                with self._qa_cache_lock:
+                    cached = self._qa_cache.get(cache_key)
+                    if cached is not None:
+                        self._qa_cache.move_to_end(cache_key)
+                if cached is not None:
+                    return jsonify(cached)
+                
                 # Recherche dans le RAG
                 context = self.rag_service.search_context(question)
                 
@@ -168,16 +220,26 @@ class DashboardApp:
                     'analysis': analysis
                 })
                 
-                return jsonify({
+                response = {
                     'success': True,
                     'analysis': analysis,
                     'context_used': len(context) > 0
-                })
+                }
+                
+                if analysis.get('success'):
+                    with self._qa_cache_lock:
+                        self._qa_cache[cache_key] = response
+                        self._qa_cache.move_to_end(cache_key)
+                        if len(self._qa_cache) > self._qa_cache_size:
+                            self._qa_cache.popitem(last=False)
+                
+                return jsonify(response)
             except Exception as e:
                 logger.error(f"Erreur analyse LLM: {e}")
                 return jsonify({'success': False, 'error': str(e)}), 500
         
         @self.app.route('/api/map/buildings')
+        @self._versioned
         def map_buildings():
             """Données cartographiques des bâtiments"""
             if not self.cache['data_loaded']:
@@ -187,69 +249,54 @@ class DashboardApp:
                 density = int(request.args.get('density', 100))
                 building_type = request.args.get('type', 'all')
                 
-                buildings_data = self.data_service.get_current_data().get('buildings')
-                
-                # Filtrage par type si nécessaire
-                if building_type != 'all' and buildings_data is not None:
-                    buildings_data = buildings_data[
-                        buildings_data['building_type'] == building_type
-                    ]
-                
-                map_data = self.map_service.create_buildings_map_data(
-                    buildings_data, density_percentage=density
+                return self._json_response(
+                    self._build_buildings_map(self._dataset_version, density, building_type)
                 )
                 
-                return jsonify({'success': True, 'map_data': map_data})
-                
             except Exception as e:
                 return jsonify({'success': False, 'error': str(e)}), 500
         
         @self.app.route('/api/map/consumption-heatmap')
+        @self._versioned
         def map_consumption_heatmap():
             """Heatmap de consommation"""
             if not self.cache['data_loaded']:
                 return jsonify({'success': False, 'error': 'Aucune donnée chargée'})
             
             try:
-                current_data = self.data_service.get_current_data()
-                
-                heatmap_data = self.map_service.create_consumption_heatmap_data(
-                    current_data.get('consumption'),
-                    current_data.get('buildings')
+                return self._json_response(
+                    self._build_consumption_heatmap(self._dataset_version)
                 )
                 
-                return jsonify({'success': True, 'heatmap_data': heatmap_data})
-                
             except Exception as e:
                 return jsonify({'success': False, 'error': str(e)}), 500
         
         @self.app.route('/api/map/zones')
+        @self._versioned
         def map_zones():
             """Analyse cartographique par zone"""
             if not self.cache['data_loaded']:
                 return jsonify({'success': False, 'error': 'Aucune donnée chargée'})
             
             try:
-                buildings_data = self.data_service.get_current_data().get('buildings')
-                
-                zones_data = self.map_service.create_zone_analysis_data(buildings_data)
-                
-                return jsonify({'success': True, 'zones_data': zones_data})
+                return self._json_response(
+                    self._build_zones_map(self._dataset_version)
+                )
                 
             except Exception as e:
                 return jsonify({'success': False, 'error': str(e)}), 500
         
         @self.app.route('/api/map/statistics')
+        @self._versioned
         def map_statistics():
             """Statistiques cartographiques"""
             if not self.cache['data_loaded']:
                 return jsonify({'success': False, 'error': 'Aucune donnée chargée'})
             
             try:
-                buildings_data = self.data_service.get_current_data().get('buildings')
-                stats = self.map_service.get_map_statistics(buildings_data)
-                
-                return jsonify({'success': True, 'statistics': stats})
+                return self._json_response(
+                    self._build_map_statistics(self._dataset_version)
+                )
                 
             except Exception as e:
                 return jsonify({'success': False, 'error': str(e)}), 500
@@ -263,6 +310,8 @@ class DashboardApp:
                     self.rag_service.index_current_data(
                         self.data_service.get_current_data()
                     )
+                    with self._qa_cache_lock:
+                        self._qa_cache.clear()
                 
                 return jsonify({
                     'success': True,
@@ -275,7 +324,10 @@ class DashboardApp:
         def handle_connect():
             """Gestion connexion WebSocket"""
             logger.info("Client connecté au dashboard")
-            emit('status', {'message': 'Connecté au dashboard Malaysia'})
+            emit('status', {
+                'message': 'Connecté au dashboard Malaysia',
+                'ollama': self._ollama_status
+            })
         
         @self.socketio.on('request_analysis')
         def handle_analysis_request(data):
@@ -286,39 +338,253 @@ class DashboardApp:
                 # Analyse asynchrone
                 emit('analysis_started', {'question': question})
                 
-                # Recherche contexte
-                context = self.rag_service.search_context(question)
-                emit('context_found', {'context_items': len(context)})
-                
-                # Analyse LLM
-                analysis = self.ollama_service.analyze_data_stream(
-                    question=question,
-                    context=context,
-                    data_summary=self.data_service.get_data_summary()
+                # Génération en tâche de fond pour ne pas bloquer le serveur
+                self.socketio.start_background_task(
+                    self._stream_analysis, request.sid, question
                 )
                 
-                emit('analysis_complete', {
-                    'question': question,
-                    'analysis': analysis
-                })
-                
             except Exception as e:
                 emit('analysis_error', {'error': str(e)})
+    
+    def _check_ollama(self):
+        """Vérifie Ollama via son API HTTP et diffuse le résultat aux clients"""
+        health = self.ollama_service.health_check(timeout=2)
+        model = self.ollama_service.model
+        
+        if health['status'] != 'healthy':
+            logger.warning(f"❌ Ollama non accessible: {health.get('error')}")
+            logger.info("🔧 Installez depuis: https://ollama.ai")
+        elif not health['target_model_available']:
+            logger.warning(f"⚠️ Modèle {model} non trouvé")
+            logger.info(f"🔧 Installez avec: ollama pull {model}")
+        else:
+            logger.info(f"✅ Modèle {model} disponible")
+        
+        self._ollama_status = {
+            'available': health['status'] == 'healthy',
+            'model': model,
+            'model_available': health.get('target_model_available', False)
+        }
+        self.socketio.emit('status', {
+            'message': 'Statut Ollama mis à jour',
+            'ollama': self._ollama_status
+        })
+    
+    def _stream_analysis(self, sid: str, question: str):
+        """Diffuse la réponse Ollama au client au fil de la génération"""
+        try:
+            # Recherche contexte
+            context = self.rag_service.search_context(question)
+            self.socketio.emit('context_found', {'context_items': len(context)}, to=sid)
+            
+            # Analyse LLM token par token
+            chunks_count = 0
+            for chunk in self.ollama_service.analyze_data_stream(
+                question=question,
+                context=context,
+                data_summary=self.data_service.get_data_summary()
+            ):
+                if chunk['type'] == 'error':
+                    self.socketio.emit('analysis_error', {'error': chunk['error']}, to=sid)
+                    return
+                
+                self.socketio.emit('analysis_token', {'text': chunk['content']}, to=sid)
+                chunks_count += 1
+                # Rend la main pour envoyer le token immédiatement
+                self.socketio.sleep(0)
+            
+            self.socketio.emit('analysis_complete', {
+                'question': question,
+                'chunks': chunks_count
+            }, to=sid)
+            
+        except Exception as e:
+            logger.error(f"Erreur analyse streaming: {e}")
+            self.socketio.emit('analysis_error', {'error': str(e)}, to=sid)
 
-    def run(self, host='127.0.0.1', port=8080, debug=True):
-        """Lance l'application dashboard"""
+    # =========================================================================
+    # RÉPONSES MISES EN CACHE
+    # =========================================================================
+    
+    def _invalidate_payload_cache(self):
+        """Invalide les réponses en cache après un rechargement des données"""
+        self._dataset_version += 1
+        for builder in self._payload_builders:
+            builder.cache_clear()
+    
+    def _trivial_analysis_response(self, question: str) -> Dict:
+        """Réponse déterministe pour les questions trop courtes pour être analysées"""
+        message = (
+            "Question trop courte pour une analyse. Précisez par exemple un type de "
+            "bâtiment, une zone ou une période (ex : « Quels sont les pics de consommation ? »)."
+        )
+        return {
+            'success': True,
+            'analysis': {
+                'success': True,
+                'analysis': {
+                    'full_response': message,
+                    'sections': {},
+                    'summary': message,
+                    'insights': [],
+                    'recommendations': [],
+                    'metrics': {}
+                },
+                'model_used': None,
+                'timestamp': datetime.now().isoformat(),
+                'context_items': 0
+            },
+            'context_used': False
+        }
+    
+    def _versioned(self, view):
+        """
+        Décorateur de route : ETag dérivé de la version des données et de l'URL
+        
+        Renvoie 304 Not Modified si le navigateur possède déjà la réponse,
+        sans recalculer ni resérialiser le contenu.
+        """
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not self.cache['data_loaded']:
+                return view(*args, **kwargs)
+            
+            etag = hashlib.blake2b(
+                f"{self._dataset_version}|{request.full_path}".encode('utf-8'),
+                digest_size=8
+            ).hexdigest()
+            
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+            else:
+                response = self.app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            
+            # Revalidation systématique : la version change à chaque chargement
+            response.set_etag(etag)
+            response.cache_control.no_cache = True
+            return response
+        
+        return wrapper
+    
+    def _json_response(self, body: bytes) -> Response:
+        """Réponse HTTP à partir d'un corps JSON déjà sérialisé"""
+        return Response(body, mimetype='application/json')
+    
+    def _dump_payload(self, payload: Dict) -> bytes:
+        """Sérialise une réponse JSON en octets"""
+        return self.app.json.dumps(payload).encode('utf-8')
+    
+    def _build_overview_charts(self, version: int) -> bytes:
+        """Graphiques de vue d'ensemble sérialisés"""
+        charts = self.chart_generator.create_overview_charts(
+            self.data_service.get_current_data()
+        )
+        return self._serialize_charts(charts)
+    
+    def _build_consumption_charts(self, version: int, time_range: str, building_type: str,
+                                  raw: bool = False) -> bytes:
+        """Graphiques de consommation sérialisés"""
+        charts = self.chart_generator.create_consumption_charts(
+            self.data_service.get_current_data(),
+            time_range=time_range,
+            building_type=building_type,
+            raw=raw
+        )
+        return self._serialize_charts(charts)
+    
+    def _build_buildings_map(self, version: int, density: int, building_type: str) -> bytes:
+        """Données cartographiques des bâtiments sérialisées"""
+        buildings_data = self.data_service.get_buildings_by_type(building_type)
+        
+        map_data = self.map_service.create_buildings_map_data(
+            buildings_data, density_percentage=density
+        )
+        return self._dump_payload({'success': True, 'map_data': pack_arrays(map_data)})
+    
+    def _precompute_heatmap_grid(self) -> Dict:
+        """Grille heatmap du jeu de données courant"""
+        current_data = self.data_service.get_current_data()
+        return self.map_service.precompute_heatmap_grid(
+            current_data.get('consumption'),
+            current_data.get('buildings')
+        )
+    
+    def _build_consumption_heatmap(self, version: int) -> bytes:
+        """Heatmap de consommation sérialisée (grille précalculée au chargement)"""
+        if self._heatmap_grid is None:
+            self._heatmap_grid = self._precompute_heatmap_grid()
+        return self._dump_payload({'success': True, 'heatmap_data': pack_arrays(self._heatmap_grid)})
+    
+    def _build_zones_map(self, version: int) -> bytes:
+        """Analyse par zone sérialisée"""
+        buildings_data = self.data_service.get_current_data().get('buildings')
+        zones_data = self.map_service.create_zone_analysis_data(buildings_data)
+        return self._dump_payload({'success': True, 'zones_data': pack_arrays(zones_data)})
+    
+    def _build_map_statistics(self, version: int) -> bytes:
+        """Statistiques cartographiques sérialisées"""
+        buildings_data = self.data_service.get_current_data().get('buildings')
+        stats = self.map_service.get_map_statistics(buildings_data)
+        return self._dump_payload({'success': True, 'statistics': pack_arrays(stats)})
+    
+    def _serialize_charts(self, charts: Dict) -> bytes:
+        """
+        Assemble la réponse JSON des graphiques sans repasser par jsonify
+
+        Les figures Plotly sont sérialisées une à une (moteur orjson, sans
+        revalidation) puis insérées telles quelles dans l'enveloppe.
+        """
+        dumps = self.app.json.dumps
+        buf = bytearray(b'{"success":true,"charts":{')
+
+        for i, (name, chart) in enumerate(charts.items()):
+            if i:
+                buf += b','
+            buf += dumps(str(name)).encode('utf-8')
+            buf += b':'
+
+            if isinstance(chart, go.Figure):
+                raw = pio.to_json(chart, validate=False, engine=PLOTLY_JSON_ENGINE)
+            else:
+                raw = dumps(chart)
+            buf += raw.encode('utf-8') if isinstance(raw, str) else raw
+
+        buf += b'}}'
+        return bytes(buf)
+
+    def run(self, host='127.0.0.1', port=8080, debug=True,
+            allow_unsafe_werkzeug: Optional[bool] = None):
+        """
+        Lance l'application dashboard
+        
+        Args:
+            allow_unsafe_werkzeug: Autorise le serveur Werkzeug hors terminal
+                interactif (défaut: variable DASHBOARD_ALLOW_UNSAFE_WERKZEUG)
+        """
+        if allow_unsafe_werkzeug is None:
+            allow_unsafe_werkzeug = os.getenv(
+                'DASHBOARD_ALLOW_UNSAFE_WERKZEUG', 'False'
+            ).lower() == 'true'
+        
         logger.info(f"🚀 Lancement Dashboard Malaysia sur http://{host}:{port}")
         logger.info("📊 Fonctionnalités:")
         logger.info("   • Visualisation données électriques Malaysia")
         logger.info("   • Analyse LLM avec Ollama (Mistral)")
         logger.info("   • Système RAG pour contexte intelligent")
         logger.info("   • Dashboards interactifs temps réel")
+        logger.info(f"   • Serveur WebSocket: {ASYNC_MODE}")
+        
+        # Vérification Ollama sans bloquer le démarrage du serveur
+        self.socketio.start_background_task(self._check_ollama)
         
         self.socketio.run(
             self.app,
             host=host,
             port=port,
-            debug=debug
+            debug=debug,
+            allow_unsafe_werkzeug=allow_unsafe_werkzeug
         )
 
 
@@ -327,17 +593,6 @@ class DashboardApp:
 # ==============================================================================
 
 if __name__ == '__main__':
-    # Vérification Ollama
-    import subprocess
-    try:
-        result = subprocess.run(['ollama', 'list'], capture_output=True, text=True)
-        if 'mistral:latest' not in result.stdout:
-            print("⚠️ Modèle mistral:latest non trouvé")
-            print("🔧 Installez avec: ollama pull mistral:latest")
-    except FileNotFoundError:
-        print("❌ Ollama non installé")
-        print("🔧 Installez depuis: https://ollama.ai")
-    
     # Lancement de l'application
     app = DashboardApp()
     app.run()
\ No newline at end of file
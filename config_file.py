@@ -152,6 +152,10 @@ class Config:
         
         # Variables d'environnement
         self._load_from_env()
+        
+        # Vue dictionnaire construite une seule fois (les sections restent
+        # synchronisées car elles référencent directement les __dict__)
+        self._dict = self._build_dict()
     
     def _apply_custom_config(self, config_dict: Dict[str, Any]):
         """Applique une configuration personnalisée"""
@@ -181,6 +185,10 @@ class Config:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convertit la configuration en dictionnaire"""
+        return self._dict
+    
+    def _build_dict(self) -> Dict[str, Any]:
+        """Construit la vue dictionnaire des sections de configuration"""
         return {
             'app': self.app.__dict__,
             'ollama': self.ollama.__dict__,
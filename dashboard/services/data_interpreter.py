@@ -10,22 +10,272 @@ pour générer des insights intelligents dès le chargement
 Version: 1.0.0
 """
 
+import asyncio
+import atexit
+import functools
+import hashlib
 import logging
 import json
+import os
+import re
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
+from collections import OrderedDict
+from itertools import chain, islice
 import sqlite3
+import struct
+import threading
+import zlib
 from pathlib import Path
 
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Bases déjà initialisées dans ce processus (schéma créé une seule fois)
+_INITIALIZED_DBS = set()
+_INIT_LOCK = threading.Lock()
+
+# Requêtes fréquentes : texte constant pour profiter du cache de statements sqlite3
+_SQL_INTERPRETATION_EXISTS = """
+    SELECT 1 FROM interpretations
+    WHERE data_hash = ? AND created_at > datetime('now', '-24 hours')
+    LIMIT 1
+"""
+
+_SQL_FETCH_INTERPRETATION = """
+    SELECT interpretation_type, analysis_content, insights, 
+           recommendations, confidence_score, created_at, content_z
+    FROM interpretations 
+    WHERE data_hash = ? 
+    ORDER BY created_at DESC
+"""
+
+# Requête RAG unique pour toutes les analyses (préfixe de prompt commun)
+_SHARED_RAG_QUERY = "analyse énergétique consommation bâtiments recommandations"
+
+# Sections de la réponse groupée : <<<SECTION:nom>>> ... <<<END>>>
+_SECTION_PATTERN = re.compile(r'<<<SECTION:(\w+)>>>(.*?)<<<END>>>', re.S)
+
+_SQL_INSERT_FINGERPRINT = """
+    INSERT OR REPLACE INTO interpretation_vectors (data_hash, vector, last_used)
+    VALUES (?, ?, CURRENT_TIMESTAMP)
+"""
+
+_SQL_DELETE_FINGERPRINT = "DELETE FROM interpretation_vectors WHERE data_hash = ?"
+
+# Colonnes numériques résumées (moyenne, écart-type, min, max) par dataset
+_FINGERPRINT_COLUMNS = {
+    'buildings': ('latitude', 'longitude', 'surface_area_m2'),
+    'consumption': ('y',),
+    'weather': ('temperature', 'humidity'),
+    'water': ('y',),
+}
+_FINGERPRINT_TYPE_BUCKETS = 8
+# Par dataset: présence, lignes, schéma, identifiants, types, statistiques
+_FINGERPRINT_BLOCK = 4 + _FINGERPRINT_TYPE_BUCKETS + 4 * max(
+    len(columns) for columns in _FINGERPRINT_COLUMNS.values()
+)
+_FINGERPRINT_SIZE = _FINGERPRINT_BLOCK * len(_FINGERPRINT_COLUMNS)
+
+# Début de recommandation : puce, ou ligne contenant un verbe de recommandation ;
+# les lignes suivantes qui ne sont pas des débuts en sont la continuation
+_REC_START = r'[ \t]*(?:[•\-*]|[^\n]*?(?:recommande|suggère|devrait|pourrait|optimiser))'
+_RECOMMENDATION_PATTERN = re.compile(
+    rf'^(?={_REC_START})[•\-* \t]*([^\n]*(?:\n(?!{_REC_START})[^\n]*)*)',
+    re.M | re.I
+)
+
+_SQL_INSERT_INTERPRETATION = """
+    INSERT OR REPLACE INTO interpretations
+    (interpretation_type, data_hash, analysis_content, content_z,
+     insights, recommendations, confidence_score, metadata)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Contenus d'analyse compressés (zstd) au-delà de cette longueur
+_COMPRESS_MIN_LENGTH = 512
+
+
+def _json_loads(data: str) -> Any:
+    """Désérialise du JSON (orjson si disponible)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> str:
+    """Sérialise en JSON sans échappement des accents (orjson si disponible)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _compress_content(content: str) -> Tuple[Optional[str], Optional[bytes]]:
+    """
+    (texte, blob zstd) à stocker pour un contenu d'analyse
+    
+    Sans zstandard, ou pour un contenu court, le texte est conservé tel quel.
+    """
+    if not ZSTD_AVAILABLE or len(content) < _COMPRESS_MIN_LENGTH:
+        return content, None
+    return None, zstandard.compress(content.encode('utf-8'), 3)
+
+
+def _decompress_content(text: Optional[str], blob: Optional[bytes]) -> str:
+    """Contenu d'analyse depuis la colonne texte (anciennes lignes) ou le blob zstd"""
+    if blob is None:
+        return text or ''
+    if not ZSTD_AVAILABLE:
+        raise RuntimeError("zstandard requis pour lire les interprétations compressées")
+    return zstandard.decompress(blob).decode('utf-8')
+
+
+def _id_presence_counts(codes_a: np.ndarray, codes_b: np.ndarray, size: int) -> Tuple[int, int]:
+    """
+    Nombre de codes présents uniquement dans codes_a, puis uniquement dans codes_b
+    
+    Les codes proviennent d'un pd.factorize commun (-1 pour les valeurs manquantes).
+    """
+    present_a = np.zeros(size, dtype=np.bool_)
+    present_b = np.zeros(size, dtype=np.bool_)
+    for code in codes_a:
+        if code >= 0:
+            present_a[code] = True
+    for code in codes_b:
+        if code >= 0:
+            present_b[code] = True
+    
+    only_a = 0
+    only_b = 0
+    for i in range(size):
+        if present_a[i] and not present_b[i]:
+            only_a += 1
+        elif present_b[i] and not present_a[i]:
+            only_b += 1
+    return only_a, only_b
+
+
+def _id_presence_counts_numpy(codes_a: np.ndarray, codes_b: np.ndarray, size: int) -> Tuple[int, int]:
+    """Équivalent vectorisé de _id_presence_counts (sans numba)"""
+    present_a = np.zeros(size, dtype=np.bool_)
+    present_b = np.zeros(size, dtype=np.bool_)
+    present_a[codes_a[codes_a >= 0]] = True
+    present_b[codes_b[codes_b >= 0]] = True
+    return int((present_a & ~present_b).sum()), int((present_b & ~present_a).sum())
+
+
+if NUMBA_AVAILABLE:
+    _id_presence_counts = njit(cache=True)(_id_presence_counts)
+else:
+    _id_presence_counts = _id_presence_counts_numpy
+
+
+def _bin_surfaces(surfaces: np.ndarray) -> np.ndarray:
+    """
+    Effectifs des classes de surface <200, 200-1000, 1000-5000 et ≥5000 m²
+    
+    Les NaN ne sont comptés dans aucune classe.
+    """
+    small = 0
+    medium = 0
+    large = 0
+    very_large = 0
+    for i in range(surfaces.size):
+        value = surfaces[i]
+        if value < 200:
+            small += 1
+        elif value < 1000:
+            medium += 1
+        elif value < 5000:
+            large += 1
+        elif value >= 5000:
+            very_large += 1
+    return np.array([small, medium, large, very_large], dtype=np.int64)
+
+
+def _bin_surfaces_numpy(surfaces: np.ndarray) -> np.ndarray:
+    """Équivalent vectorisé de _bin_surfaces (sans numba)"""
+    return np.histogram(surfaces, bins=[-np.inf, 200, 1000, 5000, np.inf])[0]
+
+
+if NUMBA_AVAILABLE:
+    _bin_surfaces = njit(cache=True)(_bin_surfaces)
+else:
+    _bin_surfaces = _bin_surfaces_numpy
+
+
+def _central_moments(values: np.ndarray) -> Tuple[int, float, float, float]:
+    """
+    (n, moyenne, M2, M3) des valeurs non NaN, M2/M3 étant les sommes des écarts
+    à la moyenne au carré et au cube
+    
+    Noyau numba en un seul passage (mise à jour de Welford/Terriberry) si
+    disponible, sinon calcul numpy en float64.
+    """
+    values = values[~np.isnan(values)]
+    n = len(values)
+    if n == 0:
+        return 0, np.nan, 0.0, 0.0
+    mean = values.mean(dtype=np.float64)
+    deviations = values - mean
+    return n, mean, float(np.dot(deviations, deviations)), float(np.sum(deviations ** 3, dtype=np.float64))
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _central_moments_single_pass(values):
+        n = 0
+        mean = 0.0
+        m2 = 0.0
+        m3 = 0.0
+        for i in range(values.size):
+            value = values[i]
+            if np.isnan(value):
+                continue
+            n += 1
+            delta = value - mean
+            delta_n = delta / n
+            term = delta * delta_n * (n - 1)
+            mean += delta_n
+            m3 += term * delta_n * (n - 2) - 3.0 * delta_n * m2
+            m2 += term
+        if n == 0:
+            mean = np.nan
+        return n, mean, m2, m3
+    
+    _central_moments = _central_moments_single_pass
+
 
 class DataInterpreter:
     """Service d'interprétation automatique des données par LLM"""
     
-    def __init__(self, ollama_service, rag_service, data_service):
+    def __init__(self, ollama_service, rag_service, data_service,
+                 max_llm_requests: Optional[int] = None):
         """
         Initialise l'interpréteur de données
         
@@ -33,6 +283,8 @@ class DataInterpreter:
             ollama_service: Service Ollama pour l'IA
             rag_service: Service RAG pour le contexte
             data_service: Service de données
+            max_llm_requests: Appels Ollama simultanés maximum
+                (défaut: OLLAMA_NUM_PARALLEL ou 4)
         """
         self.ollama_service = ollama_service
         self.rag_service = rag_service
@@ -41,7 +293,20 @@ class DataInterpreter:
         # Base de données pour stocker les interprétations
         self.db_path = Path("data/interpretations.db")
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Connexion persistante partagée entre threads (WAL, autocommit)
+        self._conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        # Lectures (historique, statistiques, cache) servies depuis la mémoire
+        self._conn.execute("PRAGMA mmap_size=268435456")  # 256 Mo
+        self._conn.execute("PRAGMA cache_size=-65536")  # 64 Mo de pages
+        self._db_lock = threading.Lock()
         self._init_interpretations_db()
+        atexit.register(self.close)
         
         # Templates d'analyse par type de données
         self.analysis_templates = {
@@ -55,11 +320,51 @@ class DataInterpreter:
             'recommendations': self._get_recommendations_template()
         }
         
+        # Cache des recherches RAG par (requête, top_k), invalidé avec la base
+        self._rag_cache: Dict[Tuple[str, int], List[Dict]] = {}
+        self._rag_cache_version = None
+        # Recherches en cours par (boucle, requête, top_k) : les analyses lancées
+        # ensemble attendent la même recherche au lieu de la relancer
+        self._rag_pending: Dict[Tuple[Any, str, int], asyncio.Future] = {}
+        
+        # Hash des données par version du DataService
+        self._version_to_hash: Dict[int, str] = {}
+        
+        # Limite des appels Ollama en vol, alignée sur OLLAMA_NUM_PARALLEL :
+        # au-delà, le serveur met les requêtes en file sans gain de débit.
+        # Sémaphore de threads (et non asyncio) car chaque requête HTTP
+        # exécute l'interprétation dans sa propre boucle via asyncio.run
+        if max_llm_requests is None:
+            max_llm_requests = int(os.getenv('OLLAMA_NUM_PARALLEL', '4'))
+        self._llm_slots = threading.BoundedSemaphore(max(1, max_llm_requests))
+        
+        # Toutes les analyses en un seul appel LLM (repli sur les appels individuels)
+        self.batch_analyses = True
+        
+        # Cache approximatif (désactivé par défaut) : empreintes numériques des
+        # jeux de données déjà interprétés, réutilisées si chaque composante
+        # diffère de moins de la tolérance relative (ex. 0.01), LRU borné
+        self.fingerprint_tolerance = float(os.getenv('INTERPRETATION_SIMILARITY_TOLERANCE', '0'))
+        self.fingerprint_capacity = 256
+        self._fingerprints: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._fingerprint_matrix: Optional[np.ndarray] = None
+        self._load_fingerprints()
+        
         logger.info("✅ DataInterpreter initialisé")
     
     def _init_interpretations_db(self):
-        """Initialise la base de données des interprétations"""
-        with sqlite3.connect(self.db_path) as conn:
+        """Initialise la base de données des interprétations (une fois par processus)"""
+        db_key = str(self.db_path.resolve())
+        with _INIT_LOCK:
+            if db_key in _INITIALIZED_DBS:
+                return
+            self._create_interpretations_schema()
+            _INITIALIZED_DBS.add(db_key)
+    
+    def _create_interpretations_schema(self):
+        """Crée les tables et index des interprétations"""
+        with self._db_lock:
+            conn = self._conn
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS interpretations (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -86,14 +391,57 @@ class DataInterpreter:
                 )
             """)
             
-            conn.commit()
+            # Contenu compressé (bases créées avant la compression : colonne ajoutée)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(interpretations)")}
+            if 'content_z' not in columns:
+                conn.execute("ALTER TABLE interpretations ADD COLUMN content_z BLOB")
+            
+            # Recherche du cache par hash de données (dernière analyse en premier)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_data_hash
+                ON interpretations (data_hash, created_at DESC)
+            """)
+            
+            # Historique, statistiques 24h et nettoyage filtrent/trient par date
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_created_at
+                ON interpretations (created_at)
+            """)
+            
+            # Empreintes numériques pour le cache approximatif
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS interpretation_vectors (
+                    data_hash TEXT PRIMARY KEY,
+                    vector BLOB,
+                    last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            
+            # Une ligne par (hash, type) : INSERT OR REPLACE remplace l'analyse
+            # précédente. Les doublons des anciennes bases sont d'abord retirés
+            has_unique = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'uniq_hash_type'"
+            ).fetchone()
+            if not has_unique:
+                conn.execute("""
+                    DELETE FROM interpretations WHERE id NOT IN (
+                        SELECT MAX(id) FROM interpretations
+                        GROUP BY data_hash, interpretation_type
+                    )
+                """)
+                conn.execute("""
+                    CREATE UNIQUE INDEX IF NOT EXISTS uniq_hash_type
+                    ON interpretations (data_hash, interpretation_type)
+                """)
     
-    async def interpret_loaded_data(self, force_refresh: bool = False) -> Dict:
+    async def interpret_loaded_data(self, force_refresh: bool = False,
+                                    narrative: bool = False) -> Dict:
         """
         Lance l'interprétation complète des données chargées
         
         Args:
             force_refresh: Force une nouvelle analyse même si déjà fait
+            narrative: Fait rédiger le résumé exécutif par le LLM
             
         Returns:
             Dict: Résultats de toutes les interprétations
@@ -101,69 +449,55 @@ class DataInterpreter:
         try:
             logger.info("🧠 Démarrage interprétation automatique des données...")
             
-            # Récupération des données actuelles
+            # Récupération des données actuelles (version lue avant les données)
+            data_version = getattr(self.data_service, 'data_version', None)
             current_data = self.data_service.get_current_data()
             data_summary = self.data_service.get_data_summary()
             
-            if not any(current_data.values()):
+            if all(df is None for df in current_data.values()):
                 return {
                     'success': False,
                     'error': 'Aucune donnée chargée à interpréter'
                 }
             
             # Calcul du hash des données pour éviter les analyses répétées
-            data_hash = self._calculate_data_hash(current_data)
-            
-            if not force_refresh and self._interpretation_exists(data_hash):
-                logger.info("📋 Interprétation existante trouvée, récupération...")
-                return self._get_existing_interpretation(data_hash)
-            
-            # Analyses par composant
-            interpretations = {}
-            
-            # 1. Vue d'ensemble générale
-            interpretations['overview'] = await self._analyze_overview(
-                current_data, data_summary
-            )
+            data_hash = self._calculate_data_hash(current_data, data_version)
             
-            # 2. Analyse de consommation
-            if current_data.get('consumption') is not None:
-                interpretations['consumption'] = await self._analyze_consumption(
-                    current_data['consumption'], current_data.get('buildings')
-                )
-            
-            # 3. Analyse des bâtiments
-            if current_data.get('buildings') is not None:
-                interpretations['buildings'] = await self._analyze_buildings(
-                    current_data['buildings']
-                )
-            
-            # 4. Corrélations météo (si disponible)
-            if current_data.get('weather') is not None:
-                interpretations['weather'] = await self._analyze_weather_correlation(
-                    current_data['weather'], current_data.get('consumption')
-                )
-            
-            # 5. Détection d'anomalies
-            interpretations['anomalies'] = await self._detect_anomalies(
-                current_data
-            )
-            
-            # 6. Tendances temporelles
-            interpretations['trends'] = await self._analyze_trends(
-                current_data
-            )
-            
-            # 7. Recommandations stratégiques
-            interpretations['recommendations'] = await self._generate_recommendations(
-                current_data, data_summary, interpretations
-            )
-            
-            # Sauvegarde des résultats
-            self._save_interpretation_results(data_hash, interpretations)
+            fingerprint = None
+            if not force_refresh:
+                if self._interpretation_exists(data_hash):
+                    logger.info("📋 Interprétation existante trouvée, récupération...")
+                    return self._get_existing_interpretation(data_hash)
+                
+                # Données quasi identiques (quelques lignes ajoutées, même schéma)
+                if self.fingerprint_tolerance > 0:
+                    fingerprint = self._fingerprint_vector(current_data)
+                    similar_hash = self._find_similar_interpretation(fingerprint)
+                    if similar_hash is not None:
+                        logger.info("📋 Interprétation de données similaires trouvée, récupération...")
+                        self._touch_fingerprint(similar_hash)
+                        result = self._get_existing_interpretation(similar_hash)
+                        result['approximate_match'] = True
+                        result['matched_hash'] = similar_hash
+                        return result
+            
+            # Un seul prompt pour toutes les analyses, repli sur les appels individuels
+            interpretations = None
+            if self.batch_analyses:
+                interpretations = await self._analyze_batched(current_data, data_summary)
+            
+            if interpretations is None:
+                interpretations = await self._analyze_individually(current_data, data_summary)
+            
+            # Sauvegarde des résultats et de leur empreinte (une transaction)
+            if fingerprint is None and self.fingerprint_tolerance > 0:
+                fingerprint = self._fingerprint_vector(current_data)
+            self._save_interpretation_results(data_hash, interpretations, fingerprint)
             
             # Création d'un résumé exécutif
-            executive_summary = await self._create_executive_summary(interpretations)
+            executive_summary = await self._create_executive_summary(
+                interpretations, narrative=narrative
+            )
             
             final_result = {
                 'success': True,
@@ -185,40 +519,241 @@ class DataInterpreter:
                 'fallback_analysis': self._generate_fallback_analysis(data_summary)
             }
     
-    async def _analyze_overview(self, data: Dict, summary: Dict) -> Dict:
-        """Analyse vue d'ensemble des données"""
+    async def _analyze_individually(self, current_data: Dict, data_summary: Dict) -> Dict:
+        """Lance chaque analyse avec son propre appel LLM"""
+        # Analyses indépendantes lancées en parallèle
+        analyses = {
+            'overview': self._analyze_overview(current_data, data_summary),
+            'anomalies': self._detect_anomalies(current_data),
+            'trends': self._analyze_trends(current_data)
+        }
+        
+        if current_data.get('consumption') is not None:
+            analyses['consumption'] = self._analyze_consumption(
+                current_data['consumption'], current_data.get('buildings')
+            )
+        
+        if current_data.get('buildings') is not None:
+            analyses['buildings'] = self._analyze_buildings(
+                current_data['buildings']
+            )
+        
+        if current_data.get('weather') is not None:
+            analyses['weather'] = self._analyze_weather_correlation(
+                current_data['weather'], current_data.get('consumption')
+            )
+        
+        results = await asyncio.gather(*analyses.values(), return_exceptions=True)
+        
+        interpretations = {}
+        for analysis_type, result in zip(analyses.keys(), results):
+            if isinstance(result, BaseException):
+                logger.error(f"Erreur analyse {analysis_type}: {result}")
+                result = self._failed_analysis(analysis_type, result)
+            interpretations[analysis_type] = result
+        
+        # Les recommandations dépendent des insights de toutes les analyses
+        interpretations['recommendations'] = await self._generate_recommendations(
+            current_data, data_summary, interpretations
+        )
+        
+        return interpretations
+    
+    async def _analyze_batched(self, current_data: Dict, data_summary: Dict) -> Optional[Dict]:
+        """
+        Regroupe toutes les analyses dans un seul prompt LLM à sections délimitées
+        
+        Args:
+            current_data: Données chargées
+            data_summary: Résumé des données
+            
+        Returns:
+            Optional[Dict]: Interprétations, ou None si la réponse n'est pas exploitable
+        """
         try:
-            # Préparation du contexte statistique
-            stats_context = f"""
-RÉSUMÉ DES DONNÉES MALAYSIA:
-- Période analysée: {summary.get('period', 'Non définie')}
-- Nombre total de bâtiments: {summary.get('total_buildings', 0):,}
-- Types de bâtiments: {', '.join(summary.get('building_types', []))}
-- Zones géographiques: {', '.join(summary.get('zones', []))}
-- Consommation totale: {summary.get('total_consumption', 0):,.0f} kWh
-- Consommation moyenne: {summary.get('avg_consumption', 0):.1f} kWh
-- Points de données: {summary.get('total_data_points', 0):,}
-
-DISPONIBILITÉ DES DONNÉES:
-- Bâtiments: {'✓' if summary.get('data_availability', {}).get('buildings') else '✗'}
-- Consommation: {'✓' if summary.get('data_availability', {}).get('consumption') else '✗'}
-- Météo: {'✓' if summary.get('data_availability', {}).get('weather') else '✗'}
-- Eau: {'✓' if summary.get('data_availability', {}).get('water') else '✗'}
-"""
+            consumption_df = current_data.get('consumption')
+            buildings_df = current_data.get('buildings')
+            weather_df = current_data.get('weather')
+            
+            async def skipped():
+                return None
+            
+            # Calculs indépendants lancés en parallèle (threads) avec la recherche RAG
+            (consumption_result, buildings_result, weather_context, anomalies_found,
+             trends_context, rag_context) = await asyncio.gather(
+                self._build_consumption_context(consumption_df, buildings_df)
+                if consumption_df is not None else skipped(),
+                self._build_buildings_context(buildings_df)
+                if buildings_df is not None else skipped(),
+                self._run_blocking(self._calculate_weather_correlations, weather_df, consumption_df)
+                if weather_df is not None else skipped(),
+                self._run_blocking(self._collect_anomalies, current_data),
+                self._run_blocking(self._calculate_consumption_trends, consumption_df)
+                if consumption_df is not None else skipped(),
+                self._shared_context()
+            )
             
-            # Recherche de contexte RAG pertinent
-            rag_context = self.rag_service.search_context(
-                "vue d'ensemble données énergétiques Malaysia", top_k=3
+            # Contexte, champs calculés et confiance de chaque section
+            sections = {
+                'overview': (self._build_overview_context(data_summary), {}, 0.9)
+            }
+            
+            if consumption_result is not None:
+                analysis_context, consumption_stats = consumption_result
+                sections['consumption'] = (
+                    analysis_context, {'statistics': consumption_stats}, 0.85
+                )
+            
+            if buildings_result is not None:
+                buildings_context, (type_analysis, geo_analysis, surface_analysis) = buildings_result
+                sections['buildings'] = (buildings_context, {
+                    'building_statistics': {
+                        'types': type_analysis,
+                        'geography': geo_analysis,
+                        'surfaces': surface_analysis
+                    }
+                }, 0.8)
+            
+            if weather_context is not None:
+                sections['weather'] = (weather_context, {'statistics': weather_context}, 0.75)
+            
+            sections['anomalies'] = (self._format_anomalies_context(anomalies_found), {
+                'anomalies_list': anomalies_found,
+                'severity': 'low' if len(anomalies_found) < 5 else 'medium' if len(anomalies_found) < 15 else 'high'
+            }, 0.7)
+            
+            if trends_context is not None:
+                sections['trends'] = (trends_context, {'statistics': trends_context}, 0.75)
+            
+            question = self._get_fused_template(list(sections) + ['recommendations'])
+            
+            analysis = await self._analyze_with_llm(
+                question=question,
+                context=rag_context,
+                data_summary={
+                    **data_summary,
+                    'analyses': {name: section[0] for name, section in sections.items()}
+                }
             )
             
-            # Construction du prompt d'analyse
-            prompt = self.analysis_templates['overview'].format(
-                stats_context=stats_context,
-                rag_context=self._format_rag_context(rag_context)
+            if not analysis.get('success'):
+                raise Exception(f"Échec analyse LLM: {analysis.get('error')}")
+            
+            replies = self._parse_batched_response(
+                analysis['analysis']['full_response'],
+                list(sections) + ['recommendations']
             )
+            if replies is None:
+                logger.warning("⚠️ Réponse groupée invalide - analyses individuelles")
+                return None
+            
+            timestamp = datetime.now().isoformat()
+            interpretations = {}
+            for name, (_, extras, confidence) in sections.items():
+                reply = replies[name]
+                insights = [str(item) for item in reply.get('insights') or []]
+                if name == 'consumption':
+                    insights.extend(self._extract_consumption_insights(consumption_df))
+                
+                interpretations[name] = {
+                    'type': name,
+                    'content': str(reply.get('content', '')),
+                    'insights': insights,
+                    **extras,
+                    'confidence': confidence,
+                    'timestamp': timestamp
+                }
+            
+            reply = replies['recommendations']
+            content = str(reply.get('content', ''))
+            recommendations = [str(item) for item in reply.get('recommendations') or []][:10]
+            if not recommendations:
+                recommendations = self._parse_recommendations(content)
+            
+            interpretations['recommendations'] = {
+                'type': 'recommendations',
+                'content': content,
+                'recommendations': recommendations,
+                'priority_actions': recommendations[:3],
+                'confidence': 0.75,
+                'timestamp': timestamp
+            }
+            
+            logger.info(f"✅ {len(interpretations)} analyses obtenues en un seul appel LLM")
+            return interpretations
+            
+        except Exception as e:
+            logger.warning(f"⚠️ Analyse groupée indisponible: {e}")
+            return None
+    
+    def _get_fused_template(self, names: List[str]) -> str:
+        """
+        Prompt groupé : consignes de chaque template sous un en-tête de section
+        
+        Les données de chaque section sont transmises dans 'analyses' ; seules
+        les INSTRUCTIONS des templates individuels sont reprises ici.
+        """
+        blocks = []
+        for name in names:
+            template = self.analysis_templates[name]
+            instructions = template.split('INSTRUCTIONS:', 1)[-1].strip()
+            blocks.append(f"## SECTION: {name}\n{instructions}")
+        
+        delimiters = "\n".join(f"<<<SECTION:{name}>>>\n...\n<<<END>>>" for name in names)
+        
+        return (
+            "Tu es un expert en analyse de données énergétiques pour la Malaysia. "
+            "Analyse chacune des sections fournies dans 'analyses' en suivant ses consignes.\n\n"
+            + "\n\n".join(blocks)
+            + "\n\nRéponds UNIQUEMENT avec les sections suivantes, dans cet ordre, "
+            "chaque point clé sur une ligne commençant par '- ':\n"
+            + delimiters
+        )
+    
+    def _parse_batched_response(self, response: str, expected: List[str]) -> Optional[Dict]:
+        """
+        Découpe la réponse groupée en sections et vérifie qu'elles sont toutes présentes
+        
+        Format attendu : délimiteurs <<<SECTION:nom>>> ... <<<END>>> ; un objet
+        JSON {nom: {"content": ..., "insights": [...]}} est également accepté.
+        """
+        sections = {name: body.strip() for name, body in _SECTION_PATTERN.findall(response)}
+        if sections:
+            if not all(name in sections for name in expected):
+                return None
+            
+            replies = {}
+            for name in expected:
+                points = self._parse_recommendations(sections[name])
+                key = 'recommendations' if name == 'recommendations' else 'insights'
+                replies[name] = {'content': sections[name], key: points}
+            return replies
+        
+        start = response.find('{')
+        end = response.rfind('}')
+        if start < 0 or end <= start:
+            return None
+        
+        try:
+            replies = _json_loads(response[start:end + 1])
+        except ValueError:
+            return None
+        
+        if not isinstance(replies, dict):
+            return None
+        if not all(isinstance(replies.get(name), dict) for name in expected):
+            return None
+        
+        return replies
+    
+    async def _analyze_overview(self, data: Dict, summary: Dict) -> Dict:
+        """Analyse vue d'ensemble des données"""
+        try:
+            # Recherche de contexte RAG pertinent
+            rag_context = await self._shared_context()
             
             # Analyse par le LLM
-            analysis = self.ollama_service.analyze_data(
+            analysis = await self._analyze_with_llm(
                 question="Analyse et interprète cette vue d'ensemble des données énergétiques",
                 context=rag_context,
                 data_summary=summary
@@ -249,43 +784,15 @@ DISPONIBILITÉ DES DONNÉES:
                                  buildings_df: pd.DataFrame = None) -> Dict:
         """Analyse détaillée de la consommation"""
         try:
-            # Calcul de statistiques avancées
-            consumption_stats = self._calculate_consumption_statistics(consumption_df)
-            
-            # Analyse temporelle
-            temporal_analysis = self._analyze_temporal_patterns(consumption_df)
-            
-            # Corrélation avec les bâtiments si disponible
-            building_correlation = ""
-            if buildings_df is not None:
-                building_correlation = self._analyze_building_consumption_correlation(
-                    consumption_df, buildings_df
-                )
-            
-            # Construction du contexte
-            analysis_context = f"""
-STATISTIQUES DE CONSOMMATION DÉTAILLÉES:
-{consumption_stats}
-
-ANALYSE TEMPORELLE:
-{temporal_analysis}
-
-{building_correlation}
-"""
-            
-            # Recherche RAG contexte
-            rag_context = self.rag_service.search_context(
-                "analyse consommation électrique patterns temporels", top_k=3
+            analysis_context, consumption_stats = await self._build_consumption_context(
+                consumption_df, buildings_df
             )
             
-            # Prompt spécialisé consommation
-            prompt = self.analysis_templates['consumption'].format(
-                analysis_context=analysis_context,
-                rag_context=self._format_rag_context(rag_context)
-            )
+            # Recherche RAG contexte
+            rag_context = await self._shared_context()
             
             # Analyse LLM
-            analysis = self.ollama_service.analyze_data(
+            analysis = await self._analyze_with_llm(
                 question="Analyse en détail ces patterns de consommation électrique",
                 context=rag_context,
                 data_summary={'consumption_data': analysis_context}
@@ -323,38 +830,12 @@ ANALYSE TEMPORELLE:
     async def _analyze_buildings(self, buildings_df: pd.DataFrame) -> Dict:
         """Analyse du patrimoine de bâtiments"""
         try:
-            # Statistiques par type
-            type_analysis = self._analyze_building_types(buildings_df)
-            
-            # Analyse géographique
-            geo_analysis = self._analyze_geographic_distribution(buildings_df)
-            
-            # Analyse des surfaces
-            surface_analysis = self._analyze_surface_distribution(buildings_df)
-            
-            buildings_context = f"""
-ANALYSE DU PATRIMOINE BÂTIMENTS:
-
-RÉPARTITION PAR TYPE:
-{type_analysis}
-
-DISTRIBUTION GÉOGRAPHIQUE:
-{geo_analysis}
-
-ANALYSE DES SURFACES:
-{surface_analysis}
-"""
-            
-            rag_context = self.rag_service.search_context(
-                "analyse bâtiments types patrimoine immobilier", top_k=3
-            )
+            buildings_context, (type_analysis, geo_analysis, surface_analysis) = \
+                await self._build_buildings_context(buildings_df)
             
-            prompt = self.analysis_templates['buildings'].format(
-                buildings_context=buildings_context,
-                rag_context=self._format_rag_context(rag_context)
-            )
+            rag_context = await self._shared_context()
             
-            analysis = self.ollama_service.analyze_data(
+            analysis = await self._analyze_with_llm(
                 question="Analyse le patrimoine de bâtiments et ses caractéristiques",
                 context=rag_context,
                 data_summary={'buildings_data': buildings_context}
@@ -389,39 +870,13 @@ ANALYSE DES SURFACES:
     async def _detect_anomalies(self, data: Dict) -> Dict:
         """Détection d'anomalies dans les données"""
         try:
-            anomalies_found = []
-            
-            # Anomalies de consommation
-            if data.get('consumption') is not None:
-                consumption_anomalies = self._detect_consumption_anomalies(
-                    data['consumption']
-                )
-                anomalies_found.extend(consumption_anomalies)
-            
-            # Anomalies de bâtiments
-            if data.get('buildings') is not None:
-                building_anomalies = self._detect_building_anomalies(
-                    data['buildings']
-                )
-                anomalies_found.extend(building_anomalies)
-            
-            # Incohérences entre datasets
-            cross_anomalies = self._detect_cross_dataset_anomalies(data)
-            anomalies_found.extend(cross_anomalies)
-            
-            anomalies_context = f"""
-ANOMALIES DÉTECTÉES:
-Nombre total d'anomalies: {len(anomalies_found)}
-
-DÉTAILS:
-""" + "\n".join([f"- {anomaly}" for anomaly in anomalies_found])
+            anomalies_found = await self._run_blocking(self._collect_anomalies, data)
+            anomalies_context = self._format_anomalies_context(anomalies_found)
             
             # Analyse par LLM des anomalies
-            rag_context = self.rag_service.search_context(
-                "anomalies données énergétiques validation qualité", top_k=2
-            )
+            rag_context = await self._shared_context()
             
-            analysis = self.ollama_service.analyze_data(
+            analysis = await self._analyze_with_llm(
                 question="Analyse ces anomalies détectées dans les données",
                 context=rag_context,
                 data_summary={'anomalies': anomalies_context}
@@ -449,15 +904,151 @@ DÉTAILS:
                 'timestamp': datetime.now().isoformat()
             }
     
+    async def _analyze_weather_correlation(self, weather_df: pd.DataFrame,
+                                         consumption_df: pd.DataFrame = None) -> Dict:
+        """Analyse des corrélations météo / consommation"""
+        try:
+            weather_context = await self._run_blocking(
+                self._calculate_weather_correlations, weather_df, consumption_df
+            )
+            
+            rag_context = await self._shared_context()
+            
+            analysis = await self._analyze_with_llm(
+                question="Analyse l'impact des conditions météo sur la consommation",
+                context=rag_context,
+                data_summary={'weather_data': weather_context}
+            )
+            
+            if analysis.get('success'):
+                return {
+                    'type': 'weather',
+                    'content': analysis['analysis']['full_response'],
+                    'insights': analysis['analysis'].get('insights', []),
+                    'statistics': weather_context,
+                    'confidence': 0.75,
+                    'timestamp': datetime.now().isoformat()
+                }
+            else:
+                raise Exception("Échec analyse météo")
+                
+        except Exception as e:
+            logger.error(f"Erreur analyse météo: {e}")
+            return self._failed_analysis('weather', e)
+    
+    async def _analyze_trends(self, data: Dict) -> Dict:
+        """Analyse des tendances temporelles de consommation"""
+        try:
+            consumption_df = data.get('consumption')
+            if consumption_df is None:
+                raise Exception("Données de consommation manquantes")
+            
+            trends_context = await self._run_blocking(
+                self._calculate_consumption_trends, consumption_df
+            )
+            
+            rag_context = await self._shared_context()
+            
+            analysis = await self._analyze_with_llm(
+                question="Analyse les tendances d'évolution de la consommation",
+                context=rag_context,
+                data_summary={'trends_data': trends_context}
+            )
+            
+            if analysis.get('success'):
+                return {
+                    'type': 'trends',
+                    'content': analysis['analysis']['full_response'],
+                    'insights': analysis['analysis'].get('insights', []),
+                    'statistics': trends_context,
+                    'confidence': 0.75,
+                    'timestamp': datetime.now().isoformat()
+                }
+            else:
+                raise Exception("Échec analyse tendances")
+                
+        except Exception as e:
+            logger.error(f"Erreur analyse tendances: {e}")
+            return self._failed_analysis('trends', e)
+    
+    async def _run_blocking(self, func, *args, **kwargs):
+        """
+        Exécute un appel bloquant (HTTP Ollama, recherche RAG) dans un thread
+        pour que les analyses lancées en parallèle progressent réellement
+        """
+        if hasattr(asyncio, 'to_thread'):
+            return await asyncio.to_thread(func, *args, **kwargs)
+        
+        # Python 3.8 : équivalent via l'exécuteur par défaut de la boucle
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+    
+    async def _search_context(self, query: str, top_k: int = 5) -> List[Dict]:
+        """Recherche RAG mise en cache tant que la base de connaissances ne change pas"""
+        version = getattr(self.rag_service, 'version', None)
+        if version != self._rag_cache_version:
+            self._rag_cache.clear()
+            self._rag_cache_version = version
+        
+        key = (query, top_k)
+        context = self._rag_cache.get(key)
+        if context is not None:
+            return context
+        
+        pending_key = (asyncio.get_running_loop(), query, top_k)
+        pending = self._rag_pending.get(pending_key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        
+        pending = asyncio.ensure_future(self._run_blocking(
+            self.rag_service.search_context, query, top_k=top_k
+        ))
+        self._rag_pending[pending_key] = pending
+        try:
+            context = await pending
+            self._rag_cache[key] = context
+        finally:
+            self._rag_pending.pop(pending_key, None)
+        
+        return context
+    
+    async def _shared_context(self) -> List[Dict]:
+        """
+        Contexte RAG commun à toutes les analyses d'une interprétation
+        
+        Les prompts Ollama commencent par ce contexte : des appels successifs
+        partagent ainsi un préfixe identique dont le cache KV est réutilisé.
+        """
+        return await self._search_context(_SHARED_RAG_QUERY, top_k=4)
+    
+    async def _analyze_with_llm(self, **kwargs) -> Dict:
+        """Appel ollama_service.analyze_data borné par le nombre de slots Ollama"""
+        return await self._run_blocking(self._analyze_with_llm_slot, **kwargs)
+    
+    def _analyze_with_llm_slot(self, **kwargs) -> Dict:
+        """Exécuté dans un thread : attend un slot libre puis interroge Ollama"""
+        with self._llm_slots:
+            return self.ollama_service.analyze_data(**kwargs)
+    
+    def _failed_analysis(self, analysis_type: str, error: BaseException) -> Dict:
+        """Résultat de repli pour une analyse en échec"""
+        return {
+            'type': analysis_type,
+            'content': f"Analyse {analysis_type} indisponible: {error}",
+            'insights': [],
+            'confidence': 0.1,
+            'timestamp': datetime.now().isoformat()
+        }
+    
     async def _generate_recommendations(self, data: Dict, summary: Dict, 
                                        interpretations: Dict) -> Dict:
         """Génère des recommandations stratégiques"""
         try:
-            # Compilation des insights de toutes les analyses
-            all_insights = []
-            for analysis in interpretations.values():
-                if isinstance(analysis, dict) and 'insights' in analysis:
-                    all_insights.extend(analysis.get('insights', []))
+            # Compilation des insights de toutes les analyses (10 premiers)
+            analyses = [a for a in interpretations.values() if isinstance(a, dict)]
+            all_insights = list(islice(
+                chain.from_iterable(a.get('insights') or () for a in analyses), 10
+            ))
             
             # Contexte pour les recommandations
             recommendations_context = f"""
@@ -469,13 +1060,11 @@ DONNÉES DISPONIBLES:
 - Types: {', '.join(summary.get('building_types', []))}
 
 INSIGHTS DÉTECTÉS:
-""" + "\n".join([f"• {insight}" for insight in all_insights[:10]])  # Top 10 insights
+""" + "\n".join([f"• {insight}" for insight in all_insights])
             
-            rag_context = self.rag_service.search_context(
-                "recommandations optimisation énergétique efficacité", top_k=4
-            )
+            rag_context = await self._shared_context()
             
-            analysis = self.ollama_service.analyze_data(
+            analysis = await self._analyze_with_llm(
                 question="Génère des recommandations stratégiques d'optimisation énergétique",
                 context=rag_context,
                 data_summary={'context': recommendations_context}
@@ -507,40 +1096,57 @@ INSIGHTS DÉTECTÉS:
                 'timestamp': datetime.now().isoformat()
             }
     
-    async def _create_executive_summary(self, interpretations: Dict) -> Dict:
-        """Crée un résumé exécutif de toutes les analyses"""
+    async def _create_executive_summary(self, interpretations: Dict,
+                                        narrative: bool = False) -> Dict:
+        """
+        Crée un résumé exécutif de toutes les analyses
+        
+        Args:
+            interpretations: Résultats des analyses
+            narrative: Demande une rédaction par le LLM (appel supplémentaire)
+                plutôt qu'une synthèse des insights déjà produits
+        """
         try:
-            # Compilation des points clés
-            key_points = []
-            recommendations = []
-            
-            for analysis in interpretations.values():
-                if isinstance(analysis, dict):
-                    # Points clés
-                    insights = analysis.get('insights', [])
-                    if insights:
-                        key_points.extend(insights[:2])  # Top 2 par analyse
-                    
-                    # Recommandations
-                    if analysis.get('type') == 'recommendations':
-                        recs = analysis.get('recommendations', [])
-                        recommendations.extend(recs[:3])  # Top 3
+            analyses = [a for a in interpretations.values() if isinstance(a, dict)]
+            
+            # Points clés : top 2 par analyse, 8 au total
+            key_points = list(islice(chain.from_iterable(
+                islice(a.get('insights') or (), 2) for a in analyses
+            ), 8))
+            
+            # Recommandations : top 3
+            recommendations = list(islice(chain.from_iterable(
+                a.get('recommendations') or () for a in analyses
+                if a.get('type') == 'recommendations'
+            ), 3))
+            
+            if not narrative:
+                # Synthèse directe des insights, sans nouvel appel au LLM
+                key_metrics = self._extract_key_metrics(interpretations)
+                return {
+                    'executive_summary': self._format_executive_summary(
+                        key_points[:5], recommendations[:3], key_metrics
+                    ),
+                    'key_metrics': key_metrics,
+                    'top_insights': key_points[:5],
+                    'priority_actions': recommendations[:3],
+                    'confidence': 0.8,
+                    'timestamp': datetime.now().isoformat()
+                }
             
             summary_context = f"""
 POINTS CLÉS IDENTIFIÉS:
-""" + "\n".join([f"• {point}" for point in key_points[:8]])
+""" + "\n".join([f"• {point}" for point in key_points])
             
             summary_context += f"""
 
 RECOMMANDATIONS PRIORITAIRES:
-""" + "\n".join([f"• {rec}" for rec in recommendations[:5]])
+""" + "\n".join([f"• {rec}" for rec in recommendations])
             
             # Génération du résumé exécutif
-            rag_context = self.rag_service.search_context(
-                "résumé exécutif synthèse analyse énergétique", top_k=2
-            )
+            rag_context = await self._shared_context()
             
-            analysis = self.ollama_service.analyze_data(
+            analysis = await self._analyze_with_llm(
                 question="Crée un résumé exécutif concis de cette analyse énergétique",
                 context=rag_context,
                 data_summary={'summary_context': summary_context}
@@ -567,27 +1173,152 @@ RECOMMANDATIONS PRIORITAIRES:
                 'timestamp': datetime.now().isoformat()
             }
     
+    def _format_executive_summary(self, key_points: List[str], recommendations: List[str],
+                                  key_metrics: Dict) -> str:
+        """Met en forme le résumé exécutif à partir des insights existants"""
+        summary = "SYNTHÈSE DE L'ANALYSE ÉNERGÉTIQUE\n\nPoints clés:\n"
+        summary += "\n".join(f"• {point}" for point in key_points) or "• Aucun point clé identifié"
+        
+        summary += "\n\nActions prioritaires:\n"
+        summary += "\n".join(f"• {rec}" for rec in recommendations) or "• Aucune recommandation disponible"
+        
+        if 'anomalies_count' in key_metrics:
+            summary += (f"\n\nQualité des données: {key_metrics['anomalies_count']} anomalies "
+                        f"(score {key_metrics['data_quality_score']}/100)")
+        if 'overall_confidence' in key_metrics:
+            summary += f"\nConfiance globale: {key_metrics['overall_confidence'] * 100:.0f}%"
+        
+        return summary
+    
     # =========================================================================
     # MÉTHODES UTILITAIRES D'ANALYSE
     # =========================================================================
     
+    def _build_overview_context(self, summary: Dict) -> str:
+        """Construit le contexte statistique de la vue d'ensemble"""
+        return f"""
+RÉSUMÉ DES DONNÉES MALAYSIA:
+- Période analysée: {summary.get('period', 'Non définie')}
+- Nombre total de bâtiments: {summary.get('total_buildings', 0):,}
+- Types de bâtiments: {', '.join(summary.get('building_types', []))}
+- Zones géographiques: {', '.join(summary.get('zones', []))}
+- Consommation totale: {summary.get('total_consumption', 0):,.0f} kWh
+- Consommation moyenne: {summary.get('avg_consumption', 0):.1f} kWh
+- Points de données: {summary.get('total_data_points', 0):,}
+
+DISPONIBILITÉ DES DONNÉES:
+- Bâtiments: {'✓' if summary.get('data_availability', {}).get('buildings') else '✗'}
+- Consommation: {'✓' if summary.get('data_availability', {}).get('consumption') else '✗'}
+- Météo: {'✓' if summary.get('data_availability', {}).get('weather') else '✗'}
+- Eau: {'✓' if summary.get('data_availability', {}).get('water') else '✗'}
+"""
+    
+    async def _build_consumption_context(self, consumption_df: pd.DataFrame,
+                                         buildings_df: pd.DataFrame = None) -> Tuple[str, str]:
+        """Construit le contexte d'analyse de consommation (contexte, statistiques)"""
+        # Statistiques, patterns temporels et corrélation bâtiments calculés
+        # en parallèle (les réductions numpy/pandas relâchent le GIL)
+        tasks = [
+            self._run_blocking(self._calculate_consumption_statistics, consumption_df),
+            self._run_blocking(self._analyze_temporal_patterns, consumption_df)
+        ]
+        if buildings_df is not None:
+            tasks.append(self._run_blocking(
+                self._analyze_building_consumption_correlation, consumption_df, buildings_df
+            ))
+        
+        results = await asyncio.gather(*tasks)
+        consumption_stats, temporal_analysis = results[0], results[1]
+        building_correlation = results[2] if len(results) > 2 else ""
+        
+        # Construction du contexte
+        analysis_context = f"""
+STATISTIQUES DE CONSOMMATION DÉTAILLÉES:
+{consumption_stats}
+
+ANALYSE TEMPORELLE:
+{temporal_analysis}
+
+{building_correlation}
+"""
+        
+        return analysis_context, consumption_stats
+    
+    async def _build_buildings_context(self, buildings_df: pd.DataFrame) -> Tuple[str, Tuple[str, str, str]]:
+        """Construit le contexte patrimoine (contexte, (types, géographie, surfaces))"""
+        # Réductions calculées une seule fois, puis simple mise en forme
+        stats = await self._run_blocking(self._precompute_buildings_stats, buildings_df)
+        type_analysis = self._analyze_building_types(buildings_df, stats)
+        geo_analysis = self._analyze_geographic_distribution(buildings_df, stats)
+        surface_analysis = self._analyze_surface_distribution(buildings_df, stats)
+        
+        buildings_context = f"""
+ANALYSE DU PATRIMOINE BÂTIMENTS:
+
+RÉPARTITION PAR TYPE:
+{type_analysis}
+
+DISTRIBUTION GÉOGRAPHIQUE:
+{geo_analysis}
+
+ANALYSE DES SURFACES:
+{surface_analysis}
+"""
+        
+        return buildings_context, (type_analysis, geo_analysis, surface_analysis)
+    
+    def _collect_anomalies(self, data: Dict) -> List[str]:
+        """Regroupe les anomalies détectées sur l'ensemble des datasets"""
+        anomalies_found = []
+        
+        # Anomalies de consommation
+        if data.get('consumption') is not None:
+            anomalies_found.extend(self._detect_consumption_anomalies(data['consumption']))
+        
+        # Anomalies de bâtiments
+        if data.get('buildings') is not None:
+            anomalies_found.extend(self._detect_building_anomalies(data['buildings']))
+        
+        # Incohérences entre datasets
+        anomalies_found.extend(self._detect_cross_dataset_anomalies(data))
+        
+        return anomalies_found
+    
+    def _format_anomalies_context(self, anomalies_found: List[str]) -> str:
+        """Formate la liste d'anomalies pour le LLM"""
+        return f"""
+ANOMALIES DÉTECTÉES:
+Nombre total d'anomalies: {len(anomalies_found)}
+
+DÉTAILS:
+""" + "\n".join([f"- {anomaly}" for anomaly in anomalies_found])
+    
     def _calculate_consumption_statistics(self, consumption_df: pd.DataFrame) -> str:
         """Calcule des statistiques avancées de consommation"""
         try:
             if 'y' not in consumption_df.columns:
                 return "Colonne de consommation 'y' manquante"
             
-            consumption = consumption_df['y']
+            # Une seule extraction numpy (NaN exclus comme avec pandas), dtype
+            # de stockage conservé et accumulation en float64
+            values = self._float_values(consumption_df['y'])
+            values = values[~np.isnan(values)]
+            count = values.size
+            
+            total = values.sum(dtype=np.float64)
+            mean = total / count
+            std = np.sqrt(np.var(values, dtype=np.float64, ddof=1)) if count > 1 else np.nan
+            median, p95 = np.quantile(values, [0.5, 0.95])
             
             stats = f"""
-• Consommation totale: {consumption.sum():,.0f} kWh
-• Consommation moyenne: {consumption.mean():.1f} kWh
-• Médiane: {consumption.median():.1f} kWh
-• Écart-type: {consumption.std():.1f} kWh
-• Coefficient de variation: {(consumption.std()/consumption.mean()*100):.1f}%
-• Minimum: {consumption.min():.1f} kWh
-• Maximum: {consumption.max():.1f} kWh
-• 95e percentile: {consumption.quantile(0.95):.1f} kWh"""
+• Consommation totale: {total:,.0f} kWh
+• Consommation moyenne: {mean:.1f} kWh
+• Médiane: {median:.1f} kWh
+• Écart-type: {std:.1f} kWh
+• Coefficient de variation: {(std/mean*100):.1f}%
+• Minimum: {values.min():.1f} kWh
+• Maximum: {values.max():.1f} kWh
+• 95e percentile: {p95:.1f} kWh"""
             
             return stats
             
@@ -600,26 +1331,37 @@ RECOMMANDATIONS PRIORITAIRES:
             if 'timestamp' not in consumption_df.columns:
                 return "Colonne timestamp manquante"
             
-            consumption_df['timestamp'] = pd.to_datetime(consumption_df['timestamp'])
-            consumption_df['hour'] = consumption_df['timestamp'].dt.hour
-            consumption_df['day_of_week'] = consumption_df['timestamp'].dt.dayofweek
+            # Lecture seule : aucune colonne n'est ajoutée au DataFrame partagé
+            timestamps = pd.to_datetime(consumption_df['timestamp'], cache=True)
+            if timestamps.dt.tz is not None:
+                timestamps = timestamps.dt.tz_localize(None)
+            timestamps = timestamps.to_numpy()
+            
+            values = self._float_values(consumption_df['y'])
+            valid = ~np.isnan(values) & ~np.isnat(timestamps)
+            values = values[valid]
+            timestamps = timestamps[valid]
+            
+            # Heure et jour de semaine par arithmétique datetime64 (1970-01-01 = jeudi)
+            hours = timestamps.astype('datetime64[h]').astype(np.int64) % 24
+            days = (timestamps.astype('datetime64[D]').astype(np.int64) + 3) % 7
             
-            # Patterns horaires
-            hourly_avg = consumption_df.groupby('hour')['y'].mean()
-            peak_hour = hourly_avg.idxmax()
-            low_hour = hourly_avg.idxmin()
+            # Patterns horaires (moyennes par heure via bincount)
+            hourly_avg = self._binned_mean(hours, values, 24)
+            peak_hour = int(np.nanargmax(hourly_avg))
+            low_hour = int(np.nanargmin(hourly_avg))
             
             # Patterns hebdomadaires
-            daily_avg = consumption_df.groupby('day_of_week')['y'].mean()
-            peak_day = daily_avg.idxmax()
-            low_day = daily_avg.idxmin()
+            daily_avg = self._binned_mean(days, values, 7)
+            peak_day = int(np.nanargmax(daily_avg))
+            low_day = int(np.nanargmin(daily_avg))
             
             day_names = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche']
             
             patterns = f"""
 • Pic horaire: {peak_hour}h ({hourly_avg[peak_hour]:.1f} kWh moyenne)
 • Creux horaire: {low_hour}h ({hourly_avg[low_hour]:.1f} kWh moyenne)
-• Variation journalière: {((hourly_avg.max() - hourly_avg.min()) / hourly_avg.mean() * 100):.1f}%
+• Variation journalière: {((np.nanmax(hourly_avg) - np.nanmin(hourly_avg)) / np.nanmean(hourly_avg) * 100):.1f}%
 • Jour le plus consommateur: {day_names[peak_day]} ({daily_avg[peak_day]:.1f} kWh)
 • Jour le moins consommateur: {day_names[low_day]} ({daily_avg[low_day]:.1f} kWh)"""
             
@@ -628,6 +1370,25 @@ RECOMMANDATIONS PRIORITAIRES:
         except Exception as e:
             return f"Erreur analyse temporelle: {e}"
     
+    def _float_values(self, series: pd.Series) -> np.ndarray:
+        """
+        Valeurs flottantes d'une colonne, sans copie si elle est déjà en float
+        
+        Les colonnes réduites sans perte en float32 par le DataService le
+        restent : les convertir en float64 ici doublerait la mémoire lue.
+        """
+        values = series.to_numpy()
+        if values.dtype.kind != 'f':
+            values = values.astype(np.float64)
+        return values
+    
+    def _binned_mean(self, bins: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+        """Moyenne de values par classe entière (NaN pour les classes vides)"""
+        sums = np.bincount(bins, weights=values, minlength=size)
+        counts = np.bincount(bins, minlength=size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return sums / counts
+    
     def _detect_consumption_anomalies(self, consumption_df: pd.DataFrame) -> List[str]:
         """Détecte les anomalies de consommation"""
         anomalies = []
@@ -636,29 +1397,34 @@ RECOMMANDATIONS PRIORITAIRES:
             if 'y' not in consumption_df.columns:
                 return ["Colonne consommation manquante"]
             
-            consumption = consumption_df['y']
+            # Une seule extraction numpy pour tous les contrôles
+            values = self._float_values(consumption_df['y'])
+            count = values.size
+            mean = np.nanmean(values, dtype=np.float64)
+            std = np.nanstd(values, dtype=np.float64, ddof=1)
             
             # Valeurs négatives
-            negative_count = (consumption < 0).sum()
+            negative_count = int((values < 0).sum())
             if negative_count > 0:
                 anomalies.append(f"{negative_count} valeurs de consommation négatives")
             
             # Valeurs nulles
-            zero_count = (consumption == 0).sum()
-            if zero_count > len(consumption) * 0.05:  # > 5%
-                anomalies.append(f"{zero_count} valeurs nulles ({zero_count/len(consumption)*100:.1f}%)")
+            zero_count = int((values == 0).sum())
+            if zero_count > count * 0.05:  # > 5%
+                anomalies.append(f"{zero_count} valeurs nulles ({zero_count/count*100:.1f}%)")
             
             # Outliers extrêmes (> 3 écarts-types)
-            z_scores = np.abs((consumption - consumption.mean()) / consumption.std())
-            extreme_outliers = (z_scores > 3).sum()
+            extreme_outliers = int((np.abs(values - mean) > 3 * std).sum())
             if extreme_outliers > 0:
                 anomalies.append(f"{extreme_outliers} valeurs extrêmes (>3σ)")
             
-            # Variations brutales (> 10x la moyenne)
+            # Variations brutales (> 10x la moyenne), tri seulement si nécessaire
             if 'timestamp' in consumption_df.columns:
-                consumption_sorted = consumption_df.sort_values('timestamp')
-                diffs = consumption_sorted['y'].diff().abs()
-                sudden_changes = (diffs > consumption.mean() * 10).sum()
+                timestamps = consumption_df['timestamp']
+                if not timestamps.is_monotonic_increasing:
+                    values = values[np.argsort(timestamps.to_numpy(), kind='stable')]
+                diffs = np.abs(np.diff(values))
+                sudden_changes = int((diffs > mean * 10).sum())
                 if sudden_changes > 0:
                     anomalies.append(f"{sudden_changes} variations brutales détectées")
             
@@ -672,36 +1438,37 @@ RECOMMANDATIONS PRIORITAIRES:
         anomalies = []
         
         try:
-            # Coordonnées invalides
+            # Coordonnées invalides (hors Malaysia ou manquantes), un seul masque numpy
             if 'latitude' in buildings_df.columns and 'longitude' in buildings_df.columns:
-                invalid_coords = buildings_df[
-                    (buildings_df['latitude'].isna()) | 
-                    (buildings_df['longitude'].isna()) |
-                    (buildings_df['latitude'] < 0.5) |
-                    (buildings_df['latitude'] > 7.5) |
-                    (buildings_df['longitude'] < 99.0) |
-                    (buildings_df['longitude'] > 120.0)
-                ]
-                if len(invalid_coords) > 0:
-                    anomalies.append(f"{len(invalid_coords)} bâtiments avec coordonnées invalides")
+                lat = buildings_df['latitude'].to_numpy(dtype=np.float64)
+                lon = buildings_df['longitude'].to_numpy(dtype=np.float64)
+                with np.errstate(invalid='ignore'):
+                    valid = (lat >= 0.5) & (lat <= 7.5) & (lon >= 99.0) & (lon <= 120.0)
+                invalid_coords = int(valid.size - np.count_nonzero(valid))
+                if invalid_coords > 0:
+                    anomalies.append(f"{invalid_coords} bâtiments avec coordonnées invalides")
             
             # Surfaces anormales
             if 'surface_area_m2' in buildings_df.columns:
-                surfaces = buildings_df['surface_area_m2']
+                surfaces = self._float_values(buildings_df['surface_area_m2'])
                 
                 # Surfaces nulles ou négatives
-                invalid_surfaces = (surfaces <= 0).sum()
+                invalid_surfaces = int(np.count_nonzero(surfaces <= 0))
                 if invalid_surfaces > 0:
                     anomalies.append(f"{invalid_surfaces} bâtiments avec surface invalide")
                 
                 # Surfaces extrêmes
-                very_large = (surfaces > 50000).sum()  # > 50,000 m²
+                very_large = int(np.count_nonzero(surfaces > 50000))  # > 50,000 m²
                 if very_large > 0:
                     anomalies.append(f"{very_large} bâtiments avec surface très importante (>50k m²)")
             
             # Doublons d'IDs
             if 'unique_id' in buildings_df.columns:
-                duplicates = buildings_df['unique_id'].duplicated().sum()
+                ids = buildings_df['unique_id']
+                if ids.dtype.kind in 'iu':
+                    duplicates = ids.size - np.unique(ids.to_numpy()).size
+                else:
+                    duplicates = ids.size - ids.nunique(dropna=False)
                 if duplicates > 0:
                     anomalies.append(f"{duplicates} IDs de bâtiments dupliqués")
             
@@ -786,6 +1553,24 @@ INSTRUCTIONS:
 
 Focus sur les implications pratiques pour la gestion énergétique."""
     
+    def _get_water_template(self) -> str:
+        return """Tu es un spécialiste de la gestion de l'eau dans les bâtiments.
+
+DONNÉES DE CONSOMMATION D'EAU:
+{water_context}
+
+CONTEXTE EXPERT:
+{rag_context}
+
+INSTRUCTIONS:
+1. Analyse les volumes et profils de consommation d'eau
+2. Identifie les fuites ou surconsommations probables
+3. Compare les usages par type de bâtiment
+4. Évalue le lien entre consommation d'eau et d'énergie
+5. Recommande des mesures d'économie d'eau
+
+Focus sur les économies réalisables rapidement."""
+    
     def _get_trends_template(self) -> str:
         return """Tu es un analyste en tendances énergétiques.
 
@@ -844,30 +1629,178 @@ Fournis des recommandations stratégiques actionnables avec ROI estimé."""
     # MÉTHODES UTILITAIRES SUPPLÉMENTAIRES
     # =========================================================================
     
-    def _calculate_data_hash(self, data: Dict) -> str:
-        """Calcule un hash unique des données pour éviter les re-analyses"""
-        import hashlib
+    def _calculate_data_hash(self, data: Dict, data_version: Optional[int] = None) -> str:
+        """
+        Calcule un hash du contenu des données pour éviter les re-analyses
         
-        hash_components = []
+        Les colonnes numériques et dates sont hachées directement depuis leur
+        buffer ; seules les colonnes objet/chaîne passent par pd.util.hash_array.
+        Le hash est mémorisé par version de données du DataService : tant
+        qu'aucun rechargement n'a eu lieu, il n'est pas recalculé.
+        """
+        if data_version is not None and data_version in self._version_to_hash:
+            return self._version_to_hash[data_version]
         
-        for key, df in data.items():
-            if df is not None and hasattr(df, 'shape'):
-                # Hash basé sur la forme et quelques valeurs
-                hash_components.append(f"{key}:{df.shape}")
-                if hasattr(df, 'columns'):
-                    hash_components.append(str(list(df.columns)))
+        hasher = xxhash.xxh3_64() if XXHASH_AVAILABLE else hashlib.blake2b(digest_size=16)
         
-        combined = "|".join(hash_components)
-        return hashlib.md5(combined.encode()).hexdigest()
+        for key in sorted(data):
+            df = data[key]
+            if df is None or not hasattr(df, 'columns'):
+                continue
+            
+            hasher.update(key.encode())
+            hasher.update(struct.pack('<QQ', *df.shape))
+            for column in df.columns:
+                # Séparateur : ('ab', 'c') et ('a', 'bc') donnent des hash distincts
+                hasher.update(str(column).encode() + b'\x00')
+                series = df[column]
+                if isinstance(series.dtype, pd.CategoricalDtype):
+                    # Codes entiers + catégories plutôt que les chaînes ligne par ligne
+                    categories = series.cat.categories.to_numpy().astype(object)
+                    hasher.update(pd.util.hash_array(categories).data)
+                    series = series.cat.codes
+                
+                values = series.to_numpy()
+                if values.dtype.kind in 'biufcmM':
+                    hasher.update(np.ascontiguousarray(values).view(np.uint8).data)
+                else:
+                    hasher.update(pd.util.hash_array(values.astype(object)).data)
+        
+        data_hash = hasher.hexdigest()
+        if data_version is not None:
+            self._version_to_hash[data_version] = data_hash
+        return data_hash
     
-    def _interpretation_exists(self, data_hash: str) -> bool:
-        """Vérifie si une interprétation existe déjà pour ce hash"""
+    def _fingerprint_vector(self, data: Dict) -> np.ndarray:
+        """
+        Empreinte numérique d'un ensemble de datasets pour le cache approximatif
+        
+        Par dataset: présence, nombre de lignes, signature des colonnes, nombre
+        d'identifiants distincts, effectifs des types de bâtiments (répartis
+        dans des classes par hash du libellé), puis moyenne, écart-type, min et
+        max des colonnes de _FINGERPRINT_COLUMNS (bornes lat/lon, surfaces,
+        consommation, météo). Les composantes sont comparées en relatif.
+        """
+        components = []
+        for key, columns in _FINGERPRINT_COLUMNS.items():
+            block = np.zeros(_FINGERPRINT_BLOCK, dtype=np.float64)
+            df = data.get(key)
+            if df is None or not hasattr(df, 'columns'):
+                components.append(block)
+                continue
+            
+            names = ",".join(sorted(str(col) for col in df.columns))
+            block[0] = 1.0
+            block[1] = len(df)
+            block[2] = zlib.crc32(names.encode('utf-8'))
+            if 'unique_id' in df.columns:
+                block[3] = df['unique_id'].nunique()
+            
+            if 'building_type' in df.columns:
+                codes, type_names = self._factorize(df['building_type'])
+                counts = np.bincount(codes[codes >= 0], minlength=len(type_names))
+                for name, count in zip(type_names, counts):
+                    bucket = zlib.crc32(str(name).encode('utf-8')) % _FINGERPRINT_TYPE_BUCKETS
+                    block[4 + bucket] += count
+            
+            offset = 4 + _FINGERPRINT_TYPE_BUCKETS
+            for position, column in enumerate(columns):
+                if column not in df.columns or not len(df):
+                    continue
+                values = self._float_values(df[column])
+                values = values[np.isfinite(values)]
+                if values.size:
+                    start = offset + 4 * position
+                    block[start:start + 4] = (
+                        np.mean(values, dtype=np.float64), np.std(values, dtype=np.float64),
+                        values.min(), values.max()
+                    )
+            components.append(block)
+        
+        return np.concatenate(components)
+    
+    def _find_similar_interpretation(self, fingerprint: np.ndarray) -> Optional[str]:
+        """
+        Hash de l'interprétation récente la plus proche
+        
+        Toutes les composantes doivent différer de moins de fingerprint_tolerance
+        en relatif ; parmi les candidates, l'écart relatif maximal le plus faible
+        l'emporte.
+        """
+        if not self._fingerprints or self.fingerprint_tolerance <= 0:
+            return None
+        
+        if self._fingerprint_matrix is None:
+            self._fingerprint_matrix = np.vstack(list(self._fingerprints.values()))
+        
+        matrix = self._fingerprint_matrix
+        scale = np.maximum(np.abs(matrix), np.abs(fingerprint))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            relative = np.where(scale > 0, np.abs(matrix - fingerprint) / scale, 0.0)
+        worst = relative.max(axis=1)
+        best = int(np.argmin(worst))
+        if worst[best] > self.fingerprint_tolerance:
+            return None
+        
+        data_hash = list(self._fingerprints)[best]
+        return data_hash if self._interpretation_exists(data_hash) else None
+    
+    def _load_fingerprints(self):
+        """Charge les empreintes les plus récemment utilisées"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute(
-                    "SELECT id FROM interpretations WHERE data_hash = ? AND created_at > datetime('now', '-24 hours')",
+            with self._db_lock:
+                rows = self._conn.execute("""
+                    SELECT data_hash, vector FROM interpretation_vectors
+                    ORDER BY last_used DESC LIMIT ?
+                """, (self.fingerprint_capacity,)).fetchall()
+            
+            # Du moins au plus récent pour conserver l'ordre LRU
+            # Les empreintes d'un autre format (anciennes versions) sont ignorées
+            for data_hash, vector in reversed(rows):
+                if vector is not None and len(vector) == _FINGERPRINT_SIZE * 8:
+                    self._fingerprints[data_hash] = np.frombuffer(vector, dtype=np.float64)
+            self._fingerprint_matrix = None
+            
+        except Exception as e:
+            logger.warning(f"⚠️ Empreintes d'interprétation non chargées: {e}")
+    
+    def _remember_fingerprint(self, data_hash: str, fingerprint: np.ndarray) -> List[str]:
+        """
+        Ajoute une empreinte au cache mémoire (éviction LRU au-delà de la capacité)
+        
+        Returns:
+            List[str]: Hash évincés, à supprimer de la table interpretation_vectors
+        """
+        self._fingerprints[data_hash] = fingerprint
+        self._fingerprints.move_to_end(data_hash)
+        
+        evicted = []
+        while len(self._fingerprints) > self.fingerprint_capacity:
+            evicted.append(self._fingerprints.popitem(last=False)[0])
+        self._fingerprint_matrix = None
+        return evicted
+    
+    def _touch_fingerprint(self, data_hash: str):
+        """Marque une empreinte comme récemment utilisée"""
+        if data_hash in self._fingerprints:
+            self._fingerprints.move_to_end(data_hash)
+            self._fingerprint_matrix = None
+        
+        try:
+            with self._db_lock:
+                self._conn.execute(
+                    "UPDATE interpretation_vectors SET last_used = CURRENT_TIMESTAMP WHERE data_hash = ?",
                     (data_hash,)
                 )
+        except Exception as e:
+            logger.debug(f"Erreur mise à jour empreinte: {e}")
+    
+    def _interpretation_exists(self, data_hash: str) -> bool:
+        """Vérifie si une interprétation existe déjà pour ce hash"""
+        try:
+            with self._db_lock:
+                conn = self._conn
+                cursor = conn.execute(_SQL_INTERPRETATION_EXISTS, (data_hash,))
                 return cursor.fetchone() is not None
         except:
             return False
@@ -875,14 +1808,9 @@ Fournis des recommandations stratégiques actionnables avec ROI estimé."""
     def _get_existing_interpretation(self, data_hash: str) -> Dict:
         """Récupère une interprétation existante"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("""
-                    SELECT interpretation_type, analysis_content, insights, 
-                           recommendations, confidence_score, created_at
-                    FROM interpretations 
-                    WHERE data_hash = ? 
-                    ORDER BY created_at DESC
-                """, (data_hash,))
+            with self._db_lock:
+                conn = self._conn
+                cursor = conn.execute(_SQL_FETCH_INTERPRETATION, (data_hash,))
                 
                 rows = cursor.fetchall()
                 
@@ -890,9 +1818,9 @@ Fournis des recommandations stratégiques actionnables avec ROI estimé."""
                 for row in rows:
                     interpretations[row[0]] = {
                         'type': row[0],
-                        'content': row[1],
-                        'insights': json.loads(row[2]) if row[2] else [],
-                        'recommendations': json.loads(row[3]) if row[3] else [],
+                        'content': _decompress_content(row[1], row[6]),
+                        'insights': _json_loads(row[2]) if row[2] else [],
+                        'recommendations': _json_loads(row[3]) if row[3] else [],
                         'confidence': row[4],
                         'timestamp': row[5]
                     }
@@ -908,29 +1836,43 @@ Fournis des recommandations stratégiques actionnables avec ROI estimé."""
             logger.error(f"Erreur récupération cache: {e}")
             return {'success': False, 'error': str(e)}
     
-    def _save_interpretation_results(self, data_hash: str, interpretations: Dict):
-        """Sauvegarde les résultats d'interprétation"""
+    def _save_interpretation_results(self, data_hash: str, interpretations: Dict,
+                                     fingerprint: Optional[np.ndarray] = None):
+        """Sauvegarde les résultats d'interprétation (et leur empreinte si fournie)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                for interp_type, result in interpretations.items():
-                    if isinstance(result, dict):
-                        conn.execute("""
-                            INSERT OR REPLACE INTO interpretations
-                            (interpretation_type, data_hash, analysis_content, 
-                             insights, recommendations, confidence_score, metadata)
-                            VALUES (?, ?, ?, ?, ?, ?, ?)
-                        """, (
-                            interp_type,
-                            data_hash,
-                            result.get('content', ''),
-                            json.dumps(result.get('insights', []), ensure_ascii=False),
-                            json.dumps(result.get('recommendations', []), ensure_ascii=False),
-                            result.get('confidence', 0.5),
-                            json.dumps(result.get('metadata', {}), ensure_ascii=False)
-                        ))
-                
-                conn.commit()
-                
+            rows = [
+                (
+                    interp_type,
+                    data_hash,
+                    *_compress_content(str(result.get('content', ''))),
+                    _json_dumps(result.get('insights', [])),
+                    _json_dumps(result.get('recommendations', [])),
+                    result.get('confidence', 0.5),
+                    _json_dumps(result.get('metadata', {}))
+                )
+                for interp_type, result in interpretations.items()
+                if isinstance(result, dict)
+            ]
+            
+            evicted = []
+            if fingerprint is not None:
+                evicted = self._remember_fingerprint(data_hash, fingerprint)
+            
+            # Une seule transaction (un seul fsync) pour toutes les écritures
+            with self._db_lock:
+                conn = self._conn
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany(_SQL_INSERT_INTERPRETATION, rows)
+                    if fingerprint is not None:
+                        conn.execute(_SQL_INSERT_FINGERPRINT, (data_hash, fingerprint.tobytes()))
+                    if evicted:
+                        conn.executemany(_SQL_DELETE_FINGERPRINT, [(h,) for h in evicted])
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+            
         except Exception as e:
             logger.error(f"Erreur sauvegarde interprétations: {e}")
     
@@ -939,12 +1881,83 @@ Fournis des recommandations stratégiques actionnables avec ROI estimé."""
         if not rag_context:
             return "Aucun contexte expert spécifique trouvé."
         
-        formatted = "CONNAISSANCES EXPERTES PERTINENTES:\n"
-        for i, item in enumerate(rag_context[:3], 1):
-            content = item.get('content', '')[:300]  # Limiter à 300 chars
-            formatted += f"{i}. {content}...\n"
-        
-        return formatted
+        # Limiter à 3 éléments de 300 caractères, assemblés en une fois
+        return "CONNAISSANCES EXPERTES PERTINENTES:\n" + "".join(
+            f"{i}. {item.get('content', '')[:300]}...\n"
+            for i, item in enumerate(rag_context[:3], 1)
+        )
+    
+    def _calculate_weather_correlations(self, weather_df: pd.DataFrame,
+                                        consumption_df: pd.DataFrame = None) -> str:
+        """Calcule les corrélations journalières entre variables météo et consommation"""
+        try:
+            weather_columns = [
+                col for col in weather_df.select_dtypes(include=[np.number]).columns
+                if col not in ['unique_id', 'timestamp']
+            ]
+            
+            analysis = "VARIABLES MÉTÉO:\n"
+            for col in weather_columns[:8]:
+                values = weather_df[col]
+                analysis += f"• {col}: moyenne {values.mean():.1f} (min {values.min():.1f}, max {values.max():.1f})\n"
+            
+            if (consumption_df is None or 'timestamp' not in weather_df.columns or
+                    'timestamp' not in consumption_df.columns or 'y' not in consumption_df.columns):
+                return analysis
+            
+            # Agrégation journalière des deux sources puis corrélation
+            weather_daily = weather_df[weather_columns].groupby(
+                pd.to_datetime(weather_df['timestamp']).dt.floor('D')
+            ).mean()
+            consumption_daily = consumption_df['y'].groupby(
+                pd.to_datetime(consumption_df['timestamp']).dt.floor('D')
+            ).sum()
+            
+            correlations = weather_daily.corrwith(consumption_daily).dropna()
+            if not correlations.empty:
+                analysis += "\nCORRÉLATIONS AVEC LA CONSOMMATION JOURNALIÈRE:\n"
+                for col, corr in correlations.sort_values(key=np.abs, ascending=False).items():
+                    analysis += f"• {col}: {corr:+.2f}\n"
+            
+            return analysis
+            
+        except Exception as e:
+            return f"Erreur analyse météo: {e}"
+    
+    def _calculate_consumption_trends(self, consumption_df: pd.DataFrame) -> str:
+        """Calcule la tendance de la consommation journalière"""
+        try:
+            if 'timestamp' not in consumption_df.columns or 'y' not in consumption_df.columns:
+                return "Colonnes timestamp/y manquantes"
+            
+            daily = consumption_df['y'].groupby(
+                pd.to_datetime(consumption_df['timestamp']).dt.floor('D')
+            ).sum()
+            
+            if len(daily) < 2:
+                return "Période trop courte pour une analyse de tendance"
+            
+            # Pente de la régression linéaire en kWh/jour
+            slope = np.polyfit(np.arange(len(daily)), daily.to_numpy(dtype=np.float64), 1)[0]
+            mean_daily = daily.mean()
+            
+            analysis = f"""TENDANCE JOURNALIÈRE:
+• Jours analysés: {len(daily)}
+• Consommation journalière moyenne: {mean_daily:,.1f} kWh
+• Pente: {slope:+,.1f} kWh/jour ({slope / mean_daily * 100 if mean_daily else 0:+.2f}%/jour)
+• Jour le plus élevé: {daily.idxmax():%Y-%m-%d} ({daily.max():,.1f} kWh)
+• Jour le plus faible: {daily.idxmin():%Y-%m-%d} ({daily.min():,.1f} kWh)"""
+            
+            if len(daily) >= 14:
+                last_week = daily.iloc[-7:].sum()
+                previous_week = daily.iloc[-14:-7].sum()
+                if previous_week > 0:
+                    analysis += f"\n• Évolution dernière semaine: {(last_week / previous_week - 1) * 100:+.1f}%"
+            
+            return analysis
+            
+        except Exception as e:
+            return f"Erreur analyse tendances: {e}"
     
     def _extract_consumption_insights(self, consumption_df: pd.DataFrame) -> List[str]:
         """Extrait des insights automatiques de consommation"""
@@ -954,24 +1967,32 @@ Fournis des recommandations stratégiques actionnables avec ROI estimé."""
             if 'y' not in consumption_df.columns:
                 return insights
             
-            consumption = consumption_df['y']
+            # Moments en un seul passage (NaN ignorés) ; mêmes estimateurs que
+            # pandas : écart-type ddof=1, asymétrie corrigée du biais
+            values = self._float_values(consumption_df['y'])
+            n, mean, m2, m3 = _central_moments(values)
+            if n < 3:
+                return insights
+            
+            std = np.sqrt(m2 / (n - 1))
             
             # Insight sur la variabilité
-            cv = consumption.std() / consumption.mean() * 100
+            cv = std / mean * 100
             if cv > 50:
                 insights.append(f"Forte variabilité de consommation ({cv:.1f}% de coefficient de variation)")
             elif cv < 20:
                 insights.append(f"Consommation stable ({cv:.1f}% de coefficient de variation)")
             
             # Insight sur la distribution
-            skewness = consumption.skew()
+            skewness = np.sqrt(n) * m3 / m2 ** 1.5 * np.sqrt(n * (n - 1)) / (n - 2) if m2 > 0 else 0.0
             if abs(skewness) > 1:
                 direction = "positive" if skewness > 0 else "négative"
                 insights.append(f"Distribution asymétrique {direction} des consommations")
             
-            # Insight sur les extremes
-            q95 = consumption.quantile(0.95)
-            q05 = consumption.quantile(0.05)
+            # Insight sur les extremes (np.quantile sélectionne par partition, sans tri)
+            if n < len(values):
+                values = values[~np.isnan(values)]
+            q05, q95 = np.quantile(values, [0.05, 0.95])
             ratio = q95 / q05 if q05 > 0 else float('inf')
             
             if ratio > 5:
@@ -982,78 +2003,193 @@ Fournis des recommandations stratégiques actionnables avec ROI estimé."""
         
         return insights
     
-    def _analyze_building_types(self, buildings_df: pd.DataFrame) -> str:
+    def _factorize(self, series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Codes entiers et libellés d'une colonne (-1 pour les valeurs manquantes)
+        
+        Les colonnes déjà catégorielles (building_type côté DataService)
+        réutilisent leurs codes sans nouvelle factorisation.
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return series.cat.codes.to_numpy(), series.cat.categories.to_numpy()
+        
+        codes, uniques = pd.factorize(series, sort=True)
+        return codes, np.asarray(uniques)
+    
+    def _precompute_buildings_stats(self, buildings_df: pd.DataFrame) -> Dict:
+        """
+        Réductions partagées par les analyses de types, géographie et surfaces
+        
+        Chaque colonne est lue une seule fois ; une entrée vaut None si la
+        colonne correspondante est absente.
+        """
+        stats = {'total': len(buildings_df), 'types': None, 'zones': None,
+                 'bounds': None, 'surfaces': None}
+        
+        if 'building_type' in buildings_df.columns:
+            codes, type_names = self._factorize(buildings_df['building_type'])
+            counts = np.bincount(codes[codes >= 0], minlength=len(type_names))
+            order = [i for i in np.argsort(-counts, kind='stable') if counts[i] > 0]
+            stats['types'] = [(type_names[i], int(counts[i])) for i in order]
+        
+        if 'zone_name' in buildings_df.columns:
+            # Codes entiers (zone catégorielle) ; zones sans bâtiment exclues
+            codes, zone_names = self._factorize(buildings_df['zone_name'])
+            counts = np.bincount(codes[codes >= 0], minlength=len(zone_names))
+            order = [i for i in np.argsort(-counts, kind='stable') if counts[i] > 0]
+            stats['zones'] = [(zone_names[i], int(counts[i])) for i in order]
+        
+        if 'latitude' in buildings_df.columns and 'longitude' in buildings_df.columns:
+            lat = self._float_values(buildings_df['latitude'])
+            lng = self._float_values(buildings_df['longitude'])
+            stats['bounds'] = (np.nanmin(lat), np.nanmax(lat), np.nanmin(lng), np.nanmax(lng))
+        
+        if 'surface_area_m2' in buildings_df.columns:
+            surfaces = self._float_values(buildings_df['surface_area_m2'])
+            valid = surfaces[~np.isnan(surfaces)]
+            stats['surfaces'] = {
+                'sum': valid.sum(dtype=np.float64),
+                'mean': valid.mean(dtype=np.float64),
+                'median': np.median(valid),
+                'max': valid.max(),
+                'min': valid.min(),
+                # Catégories de taille en un seul passage
+                'bins': _bin_surfaces(valid),
+                'count': len(surfaces)
+            }
+        
+        return stats
+    
+    def _analyze_building_types(self, buildings_df: pd.DataFrame,
+                                stats: Optional[Dict] = None) -> str:
         """Analyse la répartition par type de bâtiment"""
         try:
             if 'building_type' not in buildings_df.columns:
                 return "Colonne building_type manquante"
             
-            type_counts = buildings_df['building_type'].value_counts()
-            total = len(buildings_df)
+            stats = stats or self._precompute_buildings_stats(buildings_df)
+            type_counts = stats['types']
+            total = stats['total']
             
             analysis = "RÉPARTITION PAR TYPE:\n"
-            for btype, count in type_counts.items():
+            for type_name, count in type_counts:
                 percentage = count / total * 100
-                analysis += f"• {btype}: {count} bâtiments ({percentage:.1f}%)\n"
+                analysis += f"• {type_name}: {count} bâtiments ({percentage:.1f}%)\n"
             
             # Type dominant
-            dominant_type = type_counts.index[0]
-            analysis += f"\nType dominant: {dominant_type} ({type_counts.iloc[0]/total*100:.1f}%)"
+            dominant, dominant_count = type_counts[0]
+            analysis += f"\nType dominant: {dominant} ({dominant_count/total*100:.1f}%)"
             
             return analysis
             
         except Exception as e:
             return f"Erreur analyse types: {e}"
     
-    def _analyze_geographic_distribution(self, buildings_df: pd.DataFrame) -> str:
+    def _analyze_building_consumption_correlation(self, consumption_df: pd.DataFrame,
+                                                  buildings_df: pd.DataFrame) -> str:
+        """Croise la consommation avec le type (et la surface) des bâtiments"""
+        try:
+            required = {'unique_id', 'building_type'}
+            if not required.issubset(buildings_df.columns) or \
+                    not {'unique_id', 'y'}.issubset(consumption_df.columns):
+                return ""
+            
+            buildings = buildings_df.drop_duplicates('unique_id')
+            type_codes, type_names = self._factorize(buildings['building_type'])
+            n_types = len(type_names)
+            
+            # Type de bâtiment de chaque relevé via la position du bâtiment
+            positions = pd.Index(buildings['unique_id']).get_indexer(consumption_df['unique_id'])
+            values = self._float_values(consumption_df['y'])
+            matched = (positions >= 0) & ~np.isnan(values)
+            row_types = type_codes[positions[matched]]
+            known = row_types >= 0
+            row_types = row_types[known]
+            values = values[matched][known]
+            
+            if values.size == 0:
+                return "Aucune consommation rattachée aux bâtiments"
+            
+            totals = np.bincount(row_types, weights=values, minlength=n_types)
+            readings = np.bincount(row_types, minlength=n_types)
+            grand_total = totals.sum()
+            
+            surfaces = None
+            if 'surface_area_m2' in buildings.columns:
+                building_surfaces = buildings['surface_area_m2'].to_numpy(dtype=np.float64)
+                has_surface = (type_codes >= 0) & ~np.isnan(building_surfaces)
+                surfaces = np.bincount(
+                    type_codes[has_surface], weights=building_surfaces[has_surface],
+                    minlength=n_types
+                )
+            
+            analysis = "CONSOMMATION PAR TYPE DE BÂTIMENT:\n"
+            for i in np.argsort(-totals, kind='stable'):
+                if readings[i] == 0:
+                    continue
+                analysis += (f"• {type_names[i]}: {totals[i]:,.0f} kWh "
+                             f"({totals[i] / grand_total * 100:.1f}%), "
+                             f"{totals[i] / readings[i]:.1f} kWh/relevé")
+                if surfaces is not None and surfaces[i] > 0:
+                    analysis += f", {totals[i] / surfaces[i]:.2f} kWh/m²"
+                analysis += "\n"
+            
+            unmatched = int((positions < 0).sum())
+            if unmatched:
+                analysis += f"• {unmatched} relevés sans bâtiment correspondant\n"
+            
+            return analysis
+            
+        except Exception as e:
+            return f"Erreur corrélation bâtiments/consommation: {e}"
+    
+    def _analyze_geographic_distribution(self, buildings_df: pd.DataFrame,
+                                         stats: Optional[Dict] = None) -> str:
         """Analyse la distribution géographique"""
         try:
             analysis = ""
+            stats = stats or self._precompute_buildings_stats(buildings_df)
             
-            if 'zone_name' in buildings_df.columns:
-                zone_counts = buildings_df['zone_name'].value_counts()
+            if stats['zones'] is not None:
                 analysis += "RÉPARTITION PAR ZONE:\n"
-                for zone, count in zone_counts.head(5).items():
-                    percentage = count / len(buildings_df) * 100
+                for zone, count in stats['zones'][:5]:
+                    percentage = count / stats['total'] * 100
                     analysis += f"• {zone}: {count} bâtiments ({percentage:.1f}%)\n"
             
-            if 'latitude' in buildings_df.columns and 'longitude' in buildings_df.columns:
-                lat_range = buildings_df['latitude'].max() - buildings_df['latitude'].min()
-                lng_range = buildings_df['longitude'].max() - buildings_df['longitude'].min()
+            if stats['bounds'] is not None:
+                lat_min, lat_max, lng_min, lng_max = stats['bounds']
                 
                 analysis += f"\nÉTENDUE GÉOGRAPHIQUE:\n"
-                analysis += f"• Latitude: {lat_range:.3f}° ({buildings_df['latitude'].min():.3f} à {buildings_df['latitude'].max():.3f})\n"
-                analysis += f"• Longitude: {lng_range:.3f}° ({buildings_df['longitude'].min():.3f} à {buildings_df['longitude'].max():.3f})"
+                analysis += f"• Latitude: {lat_max - lat_min:.3f}° ({lat_min:.3f} à {lat_max:.3f})\n"
+                analysis += f"• Longitude: {lng_max - lng_min:.3f}° ({lng_min:.3f} à {lng_max:.3f})"
             
             return analysis
             
         except Exception as e:
             return f"Erreur analyse géographique: {e}"
     
-    def _analyze_surface_distribution(self, buildings_df: pd.DataFrame) -> str:
+    def _analyze_surface_distribution(self, buildings_df: pd.DataFrame,
+                                      stats: Optional[Dict] = None) -> str:
         """Analyse la distribution des surfaces"""
         try:
             if 'surface_area_m2' not in buildings_df.columns:
                 return "Colonne surface_area_m2 manquante"
             
-            surfaces = buildings_df['surface_area_m2']
+            stats = stats or self._precompute_buildings_stats(buildings_df)
+            surfaces = stats['surfaces']
             
             analysis = f"""DISTRIBUTION DES SURFACES:
-• Superficie totale: {surfaces.sum():,.0f} m²
-• Superficie moyenne: {surfaces.mean():.0f} m²
-• Superficie médiane: {surfaces.median():.0f} m²
-• Plus grand bâtiment: {surfaces.max():,.0f} m²
-• Plus petit bâtiment: {surfaces.min():.0f} m²
+• Superficie totale: {surfaces['sum']:,.0f} m²
+• Superficie moyenne: {surfaces['mean']:.0f} m²
+• Superficie médiane: {surfaces['median']:.0f} m²
+• Plus grand bâtiment: {surfaces['max']:,.0f} m²
+• Plus petit bâtiment: {surfaces['min']:.0f} m²
 
 RÉPARTITION PAR TAILLE:"""
             
-            # Catégories de taille
-            small = (surfaces < 200).sum()
-            medium = ((surfaces >= 200) & (surfaces < 1000)).sum()
-            large = ((surfaces >= 1000) & (surfaces < 5000)).sum()
-            very_large = (surfaces >= 5000).sum()
+            small, medium, large, very_large = surfaces['bins']
             
-            total = len(surfaces)
+            total = surfaces['count']
             analysis += f"""
 • Petits (<200 m²): {small} ({small/total*100:.1f}%)
 • Moyens (200-1000 m²): {medium} ({medium/total*100:.1f}%)
@@ -1076,17 +2212,29 @@ RÉPARTITION PAR TAILLE:"""
             if buildings_df is not None and consumption_df is not None:
                 # IDs de bâtiments incohérents
                 if 'unique_id' in buildings_df.columns and 'unique_id' in consumption_df.columns:
-                    building_ids = set(buildings_df['unique_id'].unique())
-                    consumption_ids = set(consumption_df['unique_id'].unique())
+                    # Codes entiers communs puis comparaison par tableaux de présence
+                    building_ids = buildings_df['unique_id']
+                    consumption_ids = consumption_df['unique_id']
+                    if isinstance(consumption_ids.dtype, pd.CategoricalDtype):
+                        # Seule la présence compte : une valeur par catégorie observée
+                        present = pd.unique(consumption_ids.cat.codes.to_numpy())
+                        consumption_ids = pd.Series(
+                            consumption_ids.cat.categories.take(present[present >= 0])
+                        )
+                    codes, uniques = pd.factorize(pd.concat(
+                        [building_ids, consumption_ids], ignore_index=True
+                    ))
+                    codes = codes.astype(np.int64, copy=False)
                     
-                    missing_in_consumption = building_ids - consumption_ids
-                    missing_in_buildings = consumption_ids - building_ids
+                    missing_in_consumption, missing_in_buildings = _id_presence_counts(
+                        codes[:len(building_ids)], codes[len(building_ids):], len(uniques)
+                    )
                     
                     if missing_in_consumption:
-                        anomalies.append(f"{len(missing_in_consumption)} bâtiments sans données de consommation")
+                        anomalies.append(f"{missing_in_consumption} bâtiments sans données de consommation")
                     
                     if missing_in_buildings:
-                        anomalies.append(f"{len(missing_in_buildings)} consommations sans bâtiment correspondant")
+                        anomalies.append(f"{missing_in_buildings} consommations sans bâtiment correspondant")
             
         except Exception as e:
             anomalies.append(f"Erreur vérification cohérence: {e}")
@@ -1098,32 +2246,20 @@ RÉPARTITION PAR TAILLE:"""
         recommendations = []
         
         try:
-            lines = llm_response.split('\n')
-            current_rec = ""
-            
-            for line in lines:
-                line = line.strip()
+            # Limiter à 10 recommandations
+            for match in _RECOMMENDATION_PATTERN.finditer(llm_response):
+                first, *rest = (line.strip() for line in match.group(1).split('\n'))
                 
-                # Détection d'une nouvelle recommandation
-                if (line.startswith('•') or line.startswith('-') or 
-                    line.startswith('*') or any(word in line.lower() for word in 
-                    ['recommande', 'suggère', 'devrait', 'pourrait', 'optimiser'])):
-                    
-                    if current_rec:
-                        recommendations.append(current_rec.strip())
-                    
-                    current_rec = line.lstrip('•-* ')
-                elif current_rec and line:
-                    current_rec += " " + line
-            
-            # Ajouter la dernière recommandation
-            if current_rec:
-                recommendations.append(current_rec.strip())
+                # Puce seule : ni elle ni ses lignes de continuation ne sont retenues
+                if first:
+                    recommendations.append(" ".join([first, *filter(None, rest)]))
+                    if len(recommendations) == 10:
+                        break
         
         except Exception as e:
             logger.debug(f"Erreur parsing recommandations: {e}")
         
-        return recommendations[:10]  # Limiter à 10 recommandations
+        return recommendations
     
     def _extract_key_metrics(self, interpretations: Dict) -> Dict:
         """Extrait les métriques clés de toutes les analyses"""
@@ -1206,10 +2342,11 @@ Relancez l'analyse une fois Ollama connecté.
     def get_interpretation_history(self, limit: int = 10) -> List[Dict]:
         """Récupère l'historique des interprétations"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._db_lock:
+                conn = self._conn
                 cursor = conn.execute("""
                     SELECT interpretation_type, created_at, confidence_score,
-                           substr(analysis_content, 1, 200) as preview
+                           substr(analysis_content, 1, 200) as preview, content_z
                     FROM interpretations
                     ORDER BY created_at DESC
                     LIMIT ?
@@ -1217,11 +2354,13 @@ Relancez l'analyse une fois Ollama connecté.
                 
                 history = []
                 for row in cursor.fetchall():
+                    # Seules les lignes retenues par LIMIT sont décompressées
+                    preview = _decompress_content(row[3], row[4])[:200]
                     history.append({
                         'type': row[0],
                         'timestamp': row[1],
                         'confidence': row[2],
-                        'preview': row[3] + "..." if len(row[3]) == 200 else row[3]
+                        'preview': preview + "..." if len(preview) == 200 else preview
                     })
                 
                 return history
@@ -1233,25 +2372,18 @@ Relancez l'analyse une fois Ollama connecté.
     def get_interpretation_stats(self) -> Dict:
         """Statistiques des interprétations"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                # Nombre total
-                cursor = conn.execute("SELECT COUNT(*) FROM interpretations")
-                total = cursor.fetchone()[0]
-                
-                # Par type
-                cursor = conn.execute("""
-                    SELECT interpretation_type, COUNT(*), AVG(confidence_score)
+            with self._db_lock:
+                conn = self._conn
+                # Un seul parcours : effectifs, confiance et dernières 24h par type
+                by_type = conn.execute("""
+                    SELECT interpretation_type, COUNT(*), AVG(confidence_score),
+                           SUM(created_at > datetime('now', '-24 hours'))
                     FROM interpretations
                     GROUP BY interpretation_type
-                """)
-                by_type = cursor.fetchall()
+                """).fetchall()
                 
-                # Dernières 24h
-                cursor = conn.execute("""
-                    SELECT COUNT(*) FROM interpretations
-                    WHERE created_at > datetime('now', '-24 hours')
-                """)
-                recent = cursor.fetchone()[0]
+                total = sum(row[1] for row in by_type)
+                recent = sum(row[3] for row in by_type)
                 
                 return {
                     'total_interpretations': total,
@@ -1271,14 +2403,15 @@ Relancez l'analyse une fois Ollama connecté.
     def clear_old_interpretations(self, days_old: int = 30) -> int:
         """Supprime les anciennes interprétations"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._db_lock:
+                conn = self._conn
+                # Décalage passé en paramètre : une seule requête préparée
                 cursor = conn.execute("""
                     DELETE FROM interpretations 
-                    WHERE created_at < datetime('now', '-{} days')
-                """.format(days_old))
+                    WHERE created_at < datetime('now', ?)
+                """, (f"-{int(days_old)} days",))
                 
                 deleted = cursor.rowcount
-                conn.commit()
                 
                 logger.info(f"🗑️ {deleted} anciennes interprétations supprimées")
                 return deleted
@@ -1286,6 +2419,13 @@ Relancez l'analyse une fois Ollama connecté.
         except Exception as e:
             logger.error(f"Erreur nettoyage interprétations: {e}")
             return 0
+    
+    def close(self):
+        """Ferme la connexion persistante à la base des interprétations"""
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
 
 
 # ==============================================================================
@@ -1303,10 +2443,13 @@ def create_interpreter_api_routes(app, data_interpreter):
             
             data = request.get_json() or {}
             force_refresh = data.get('force_refresh', False)
+            narrative = data.get('narrative', False)
             
             # Lancement asynchrone (simulation)
             import asyncio
-            result = asyncio.run(data_interpreter.interpret_loaded_data(force_refresh))
+            result = asyncio.run(
+                data_interpreter.interpret_loaded_data(force_refresh, narrative)
+            )
             
             return jsonify(result)
             
@@ -12,13 +12,70 @@ Version: 1.0.0
 
 import os
 import logging
+import tempfile
+import threading
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable, Hashable, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+try:
+    import pyarrow
+    import pyarrow.compute
+    import pyarrow.dataset
+    import pyarrow.fs
+    import pyarrow.parquet
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Copy-on-Write : toujours actif à partir de pandas 3.0, à activer en 2.x
+# pour que les copies superficielles du nettoyage ne dupliquent aucune donnée
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+
+def _quantile_keep_mask(values: np.ndarray, q: float) -> np.ndarray:
+    """
+    Masque des valeurs inférieures ou égales au quantile q (interpolation linéaire)
+    
+    Sélection par partition puis comparaison, compilée par numba si disponible
+    (séquentielle : appelée depuis les threads de chargement). Les valeurs ne
+    doivent pas contenir de NaN.
+    """
+    n = values.size
+    position = (n - 1) * q
+    lower = int(np.floor(position))
+    upper = min(lower + 1, n - 1)
+    
+    # Après partition, les éléments avant `upper` sont tous <= partitioned[upper]
+    partitioned = np.partition(values, upper)
+    high = partitioned[upper]
+    low = partitioned[:upper].max() if upper > lower else high
+    
+    # Même interpolation que numpy (_lerp)
+    fraction = position - lower
+    limit = low + (high - low) * fraction
+    if fraction >= 0.5:
+        limit = high - (high - low) * (1.0 - fraction)
+    
+    return values <= limit
+
+
+if NUMBA_AVAILABLE:
+    _quantile_keep_mask = njit(cache=True, nogil=True)(_quantile_keep_mask)
+
 
 class DataService:
     """Service de gestion des données pour le dashboard"""
@@ -42,6 +99,31 @@ class DataService:
             'last_loaded': None
         }
         
+        # Types chargés, un bit par type (test de chargement en une comparaison)
+        self._loaded_mask = 0
+        self._loaded_bits = {'buildings': 1, 'consumption': 2, 'weather': 4, 'water': 8}
+        
+        # Nombre de lignes nettoyées par type (renseigné au chargement)
+        self._row_counts: Dict[str, int] = {}
+        
+        # Copies Arrow des données nettoyées (réductions pyarrow.compute, export sans copie)
+        self.arrow_cache: Dict[str, Any] = {}
+        
+        # Positions des bâtiments par type (construit au chargement)
+        self._buildings_by_type: Dict[str, np.ndarray] = {}
+        
+        # Horodatages de consommation triés et positions d'origine (construit au chargement)
+        self._consumption_time_index: Optional[Tuple[pd.DatetimeIndex, np.ndarray]] = None
+        
+        # Incrémenté à chaque chargement (invalidation des caches clients)
+        self.data_version = 0
+        
+        # Résultats dérivés des données (résumé, zones, santé, filtres),
+        # valables pour une version des données
+        self._memo: OrderedDict = OrderedDict()
+        self._memo_capacity = 64
+        self._memo_lock = threading.Lock()
+        
         # Mapping des fichiers attendus
         self.file_mapping = {
             'buildings': 'buildings_metadata.csv',
@@ -61,6 +143,8 @@ class DataService:
         """
         try:
             logger.info("📂 Chargement des données Malaysia...")
+            with self._memo_lock:
+                self._memo.clear()
             
             loaded_files = {}
             data_info = {
@@ -71,46 +155,44 @@ class DataService:
                 'load_time': datetime.now().isoformat()
             }
             
-            # Chargement de chaque type de données
-            for data_type, filename in self.file_mapping.items():
-                file_path = self.exports_dir / filename
-                
-                try:
-                    if file_path.exists():
-                        df = pd.read_csv(file_path)
-                        
-                        # Validation et nettoyage des données
-                        df_cleaned = self._clean_and_validate_data(df, data_type)
-                        
-                        self.data_cache[data_type] = df_cleaned
-                        loaded_files[data_type] = {
-                            'filename': filename,
-                            'records': len(df_cleaned),
-                            'columns': list(df_cleaned.columns),
-                            'file_size_mb': file_path.stat().st_size / (1024 * 1024)
-                        }
-                        
-                        data_info['loaded_files'].append(filename)
-                        data_info['total_records'] += len(df_cleaned)
-                        
-                        logger.info(f"✅ {filename}: {len(df_cleaned)} enregistrements")
-                    else:
-                        logger.warning(f"⚠️ Fichier manquant: {filename}")
-                        data_info['failed_files'].append(filename)
-                        
-                except Exception as e:
-                    logger.error(f"❌ Erreur chargement {filename}: {e}")
+            # Chargement parallèle des fichiers (lecture et nettoyage indépendants,
+            # le GIL est relâché dans pyarrow/pandas) ; le cache est mis à jour
+            # ensuite, dans l'ordre du mapping, depuis ce thread
+            with ThreadPoolExecutor(max_workers=len(self.file_mapping)) as executor:
+                results = list(executor.map(
+                    lambda item: self._load_one(*item), self.file_mapping.items()
+                ))
+            
+            for data_type, filename, df_cleaned, table, file_info in results:
+                if df_cleaned is None:
                     data_info['failed_files'].append(filename)
+                    continue
+                
+                self.data_cache[data_type] = df_cleaned
+                self._loaded_mask |= self._loaded_bits[data_type]
+                self._row_counts[data_type] = file_info['records']
+                if table is not None:
+                    self.arrow_cache[data_type] = table
+                else:
+                    self.arrow_cache.pop(data_type, None)
+                loaded_files[data_type] = file_info
+                data_info['loaded_files'].append(filename)
+                data_info['total_records'] += file_info['records']
             
             # Mise à jour du cache
             self.data_cache['last_loaded'] = datetime.now()
+            self._build_buildings_type_index()
+            self._build_consumption_time_index()
+            self.data_version += 1
+            with self._memo_lock:
+                self._memo.clear()
             
             # Informations complémentaires
             data_info['cache_info'] = {
-                'buildings_count': len(self.data_cache['buildings']) if self.data_cache['buildings'] is not None else 0,
-                'consumption_points': len(self.data_cache['consumption']) if self.data_cache['consumption'] is not None else 0,
-                'weather_points': len(self.data_cache['weather']) if self.data_cache['weather'] is not None else 0,
-                'water_points': len(self.data_cache['water']) if self.data_cache['water'] is not None else 0
+                'buildings_count': self._row_counts.get('buildings', 0),
+                'consumption_points': self._row_counts.get('consumption', 0),
+                'weather_points': self._row_counts.get('weather', 0),
+                'water_points': self._row_counts.get('water', 0)
             }
             
             logger.info(f"✅ Chargement terminé: {len(data_info['loaded_files'])} fichiers")
@@ -125,10 +207,242 @@ class DataService:
                 'failed_files': list(self.file_mapping.values())
             }
     
+    def _load_one(self, data_type: str, filename: str) -> Tuple[str, str, Optional[pd.DataFrame], Any, Dict]:
+        """
+        Lit, nettoie et réduit un fichier de données
+        
+        Returns:
+            Tuple: (type, nom du fichier, DataFrame nettoyé ou None, table Arrow ou None,
+                informations fichier)
+        """
+        file_path = self.exports_dir / filename
+        parquet_path = file_path.with_suffix('.parquet')
+        
+        try:
+            if not (file_path.exists() or parquet_path.exists()):
+                logger.warning(f"⚠️ Fichier manquant: {filename}")
+                return data_type, filename, None, None, {}
+            
+            df, file_path = self._read_dataset(file_path, data_type)
+            
+            # Validation et nettoyage des données
+            df_cleaned = self._clean_and_validate_data(df, data_type)
+            df_cleaned = self._downcast_numeric(df_cleaned, data_type)
+            self._freeze_dataframe(df_cleaned)
+            table = self._to_arrow_table(df_cleaned, filename)
+            
+            records = len(df_cleaned)
+            file_info = {
+                'filename': filename,
+                'records': records,
+                'columns': df_cleaned.columns.tolist(),
+                'file_size_mb': file_path.stat().st_size / (1024 * 1024)
+            }
+            
+            logger.info(f"✅ {filename}: {records} enregistrements")
+            return data_type, filename, df_cleaned, table, file_info
+            
+        except Exception as e:
+            logger.error(f"❌ Erreur chargement {filename}: {e}")
+            return data_type, filename, None, None, {}
+    
+    def _to_arrow_table(self, df: pd.DataFrame, filename: str):
+        """Convertit un DataFrame nettoyé en table Arrow (colonnes numériques sans copie)"""
+        if not PYARROW_AVAILABLE:
+            return None
+        
+        try:
+            return pyarrow.Table.from_pandas(df, preserve_index=False)
+        except Exception as e:
+            logger.debug(f"Conversion Arrow impossible pour {filename}: {e}")
+            return None
+    
+    def to_arrow(self, data_type: str):
+        """
+        Table Arrow des données nettoyées d'un type
+        
+        Args:
+            data_type: 'buildings', 'consumption', 'weather' ou 'water'
+            
+        Returns:
+            pyarrow.Table: Table partagée (lecture seule), None si indisponible
+        """
+        return self.arrow_cache.get(data_type)
+    
+    def _column_reductions(self, data_type: str, column: str, bounds: bool = True) -> Dict[str, float]:
+        """
+        Somme, moyenne et, si demandé, minimum et maximum d'une colonne numérique
+        
+        Utilise pyarrow.compute (multithread, accumulation en float64) sur la
+        table Arrow lorsqu'elle existe, sinon numpy avec le même accumulateur.
+        La moyenne est déduite de la somme et du nombre de valeurs non nulles,
+        sans nouveau parcours.
+        """
+        table = self.arrow_cache.get(data_type)
+        if table is not None and column in table.column_names:
+            values = table[column]
+            total = pyarrow.compute.sum(values).as_py()
+            count = len(values) - values.null_count
+            reductions = {
+                'sum': total,
+                'mean': total / count if count and total is not None else None
+            }
+            if bounds:
+                reductions.update(pyarrow.compute.min_max(values).as_py())
+            return {key: float('nan') if value is None else float(value) for key, value in reductions.items()}
+        
+        values = self.data_cache[data_type][column].to_numpy()
+        if values.dtype.kind == 'f':
+            missing = np.isnan(values)
+            if missing.any():
+                values = values[~missing]
+        
+        count = values.size
+        total = float(values.sum(dtype=np.float64))
+        reductions = {
+            'sum': total,
+            'mean': total / count if count else float('nan')
+        }
+        if bounds:
+            reductions['min'] = float(values.min()) if count else float('nan')
+            reductions['max'] = float(values.max()) if count else float('nan')
+        return reductions
+    
+    @staticmethod
+    def _unique_values(series: pd.Series) -> List:
+        """
+        Valeurs distinctes dans l'ordre d'apparition (équivalent de unique().tolist())
+        
+        Pour une colonne catégorielle, seuls les codes entiers sont parcourus.
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            return [
+                categories[code] if code >= 0 else np.nan
+                for code in pd.unique(series.cat.codes.to_numpy())
+            ]
+        return series.unique().tolist()
+    
+    def _needed_columns(self, data_type: str) -> Optional[List[str]]:
+        """
+        Colonnes utilisées par le dashboard pour un type de données
+        
+        Les séries temporelles ne sont lues que par identifiant, horodatage et
+        valeur ; None conserve toutes les colonnes (bâtiments, météo).
+        """
+        if data_type in ('consumption', 'water'):
+            return ['unique_id', 'timestamp', 'y']
+        return None
+    
+    def _read_dataset(self, csv_path: Path, data_type: Optional[str] = None):
+        """
+        Lit un fichier de données, en privilégiant sa version Parquet
+        
+        Le CSV complet est converti en Parquet (zstd) au premier chargement ;
+        les chargements suivants lisent le fichier colonnaire mappé en mémoire.
+        Seules les colonnes utiles au type de données sont retournées. Un
+        Parquet illisible est ignoré au profit du CSV, puis régénéré.
+        
+        Returns:
+            Tuple: (DataFrame brut, chemin du fichier lu)
+        """
+        parquet_path = csv_path.with_suffix('.parquet')
+        needed = self._needed_columns(data_type)
+        
+        if PYARROW_AVAILABLE and parquet_path.exists() and (
+            not csv_path.exists() or parquet_path.stat().st_mtime >= csv_path.stat().st_mtime
+        ):
+            try:
+                return self._read_parquet(parquet_path, needed), parquet_path
+            except Exception as e:
+                if not csv_path.exists():
+                    raise
+                logger.warning(f"⚠️ Cache Parquet illisible, relecture du CSV {csv_path.name}: {e}")
+        
+        if not PYARROW_AVAILABLE:
+            usecols = None
+            if needed is not None:
+                header = pd.read_csv(csv_path, nrows=0).columns
+                usecols = [col for col in header if col in needed] or None
+            return self._read_csv(csv_path, usecols), csv_path
+        
+        # Le cache contient toutes les colonnes du CSV : la projection reste
+        # valable si les colonnes utilisées changent
+        df = self._read_csv(csv_path)
+        self._write_parquet(df, parquet_path)
+        
+        if needed is not None:
+            columns = [col for col in df.columns if col in needed]
+            if columns:
+                df = df[columns]
+        
+        return df, csv_path
+    
+    def _read_parquet(self, parquet_path: Path, needed: Optional[List[str]]) -> pd.DataFrame:
+        """Lit un Parquet mappé en mémoire, limité aux colonnes utiles"""
+        # Un seul accès au pied de page : schéma et projection des colonnes
+        dataset = pyarrow.dataset.dataset(
+            str(parquet_path.resolve()), format='parquet',
+            filesystem=pyarrow.fs.LocalFileSystem(use_mmap=True)
+        )
+        columns = None
+        if needed is not None:
+            columns = [col for col in dataset.schema.names if col in needed] or None
+        
+        table = dataset.to_table(columns=columns, use_threads=True)
+        # Conversion colonne par colonne, les tampons Arrow sont libérés au fur et à mesure
+        df = table.to_pandas(split_blocks=True, self_destruct=True)
+        del table
+        return df
+    
+    def _write_parquet(self, df: pd.DataFrame, parquet_path: Path):
+        """
+        Écrit le cache Parquet de façon atomique
+        
+        Le fichier est écrit à côté sous un nom temporaire unique puis renommé :
+        un lecteur ne voit jamais de fichier partiel et deux chargements
+        simultanés ne s'écrivent pas l'un sur l'autre.
+        """
+        fd, tmp_name = tempfile.mkstemp(
+            dir=parquet_path.parent, prefix=f".{parquet_path.name}.", suffix='.tmp'
+        )
+        os.close(fd)
+        try:
+            df.to_parquet(tmp_name, engine='pyarrow', compression='zstd', index=False)
+            os.replace(tmp_name, parquet_path)
+            logger.info(f"📦 Cache Parquet créé: {parquet_path.name}")
+        except Exception as e:
+            logger.warning(f"⚠️ Conversion Parquet impossible pour {parquet_path.stem}: {e}")
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+    
+    def _read_csv(self, csv_path: Path, usecols: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Lit un CSV avec le lecteur multithread de pyarrow, repli sur le moteur C
+        
+        Les colonnes restent en types numpy (pas de dtype_backend pyarrow) :
+        le nettoyage et les analyses travaillent directement sur les tableaux.
+        """
+        if PYARROW_AVAILABLE:
+            try:
+                return pd.read_csv(csv_path, engine='pyarrow', usecols=usecols)
+            except Exception as e:
+                logger.debug(f"Lecture pyarrow impossible pour {csv_path.name}, moteur C: {e}")
+        
+        return pd.read_csv(
+            csv_path, engine='c', usecols=usecols, low_memory=False, cache_dates=True
+        )
+    
     def get_current_data(self) -> Dict[str, pd.DataFrame]:
         """
         Retourne les données actuellement en cache
         
+        Les DataFrames sont partagés (aucune copie) entre toutes les requêtes :
+        les appelants doivent les traiter en lecture seule et travailler sur des
+        séries locales ou des copies explicites.
+        
         Returns:
             Dict: Données en cache
         """
@@ -139,13 +453,40 @@ class DataService:
             'water': self.data_cache['water']
         }
     
+    def _memoize(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Retourne le résultat mis en cache pour la version courante des données
+        
+        Les entrées sont invalidées à chaque chargement ; au-delà de la
+        capacité, les moins récemment utilisées sont évincées. Le calcul se
+        fait hors du verrou (deux requêtes peuvent le faire en parallèle).
+        """
+        version = self.data_version
+        with self._memo_lock:
+            entry = self._memo.get(key)
+            if entry is not None and entry[0] == version:
+                self._memo.move_to_end(key)
+                return entry[1]
+        
+        value = compute()
+        with self._memo_lock:
+            self._memo[key] = (version, value)
+            self._memo.move_to_end(key)
+            if len(self._memo) > self._memo_capacity:
+                self._memo.popitem(last=False)
+        return value
+    
     def get_data_summary(self) -> Dict:
         """
         Génère un résumé statistique des données
         
         Returns:
-            Dict: Résumé des données
+            Dict: Résumé des données (partagé, à ne pas modifier)
         """
+        return self._memoize('summary', self._compute_data_summary)
+    
+    def _compute_data_summary(self) -> Dict:
+        """Calcule le résumé statistique des données"""
         try:
             summary = {
                 'last_update': self.data_cache['last_loaded'].isoformat() if self.data_cache['last_loaded'] else None,
@@ -157,11 +498,15 @@ class DataService:
             if buildings_df is not None and not buildings_df.empty:
                 summary.update({
                     'total_buildings': len(buildings_df),
-                    'building_types': buildings_df['building_type'].unique().tolist() if 'building_type' in buildings_df.columns else [],
-                    'zones': buildings_df['zone_name'].unique().tolist() if 'zone_name' in buildings_df.columns else [],
-                    'total_surface_m2': float(buildings_df['surface_area_m2'].sum()) if 'surface_area_m2' in buildings_df.columns else 0,
-                    'avg_surface_m2': float(buildings_df['surface_area_m2'].mean()) if 'surface_area_m2' in buildings_df.columns else 0
+                    'building_types': self._unique_values(buildings_df['building_type']) if 'building_type' in buildings_df.columns else [],
+                    'zones': self._unique_values(buildings_df['zone_name']) if 'zone_name' in buildings_df.columns else [],
+                    'total_surface_m2': 0,
+                    'avg_surface_m2': 0
                 })
+                if 'surface_area_m2' in buildings_df.columns:
+                    surfaces = self._column_reductions('buildings', 'surface_area_m2', bounds=False)
+                    summary['total_surface_m2'] = surfaces['sum']
+                    summary['avg_surface_m2'] = surfaces['mean']
                 summary['data_availability']['buildings'] = True
             else:
                 summary.update({
@@ -177,11 +522,12 @@ class DataService:
             consumption_df = self.data_cache['consumption']
             if consumption_df is not None and not consumption_df.empty:
                 if 'y' in consumption_df.columns:
+                    consumption = self._column_reductions('consumption', 'y')
                     summary.update({
-                        'total_consumption': float(consumption_df['y'].sum()),
-                        'avg_consumption': float(consumption_df['y'].mean()),
-                        'max_consumption': float(consumption_df['y'].max()),
-                        'min_consumption': float(consumption_df['y'].min()),
+                        'total_consumption': consumption['sum'],
+                        'avg_consumption': consumption['mean'],
+                        'max_consumption': consumption['max'],
+                        'min_consumption': consumption['min'],
                         'consumption_points': len(consumption_df)
                     })
                 
@@ -224,9 +570,10 @@ class DataService:
             water_df = self.data_cache['water']
             if water_df is not None and not water_df.empty:
                 if 'y' in water_df.columns:
+                    water = self._column_reductions('water', 'y', bounds=False)
                     summary.update({
-                        'total_water_consumption': float(water_df['y'].sum()),
-                        'avg_water_consumption': float(water_df['y'].mean()),
+                        'total_water_consumption': water['sum'],
+                        'avg_water_consumption': water['mean'],
                         'water_points': len(water_df)
                     })
                 summary['data_availability']['water'] = True
@@ -264,6 +611,51 @@ class DataService:
                 'total_data_points': 0
             }
     
+    def _downcast_numeric(self, df: pd.DataFrame, data_type: str) -> pd.DataFrame:
+        """
+        Réduit les colonnes numériques en float32/int32 pour diviser la mémoire par deux
+        
+        Les flottants ne passent en float32 que si la conversion est exacte :
+        les valeurs (consommations, météo) sont agrégées et sérialisées telles
+        quelles en JSON. Les flottants des bâtiments (coordonnées, surfaces)
+        restent en float64 : le DataFrame est petit et ils alimentent
+        directement les distances, la carte et les statistiques de zone.
+        """
+        int32_info = np.iinfo(np.int32)
+        
+        float_columns = [] if data_type == 'buildings' else df.select_dtypes(include=['float64']).columns
+        for col in float_columns:
+            values = df[col].to_numpy()
+            downcast = values.astype(np.float32)
+            if np.array_equal(downcast, values, equal_nan=True):
+                df[col] = downcast
+        
+        for col in df.select_dtypes(include=['int64']).columns:
+            if df.empty or (df[col].min() >= int32_info.min and df[col].max() <= int32_info.max):
+                df[col] = df[col].astype(np.int32)
+        
+        # Nombre d'étages : entier court lorsque toutes les valeurs sont entières
+        if data_type == 'buildings' and 'floors_count' in df.columns:
+            floors = df['floors_count'].to_numpy()
+            int16_info = np.iinfo(np.int16)
+            if floors.dtype.kind == 'f' and (floors.size == 0 or (
+                np.all(np.mod(floors, 1) == 0) and
+                floors.min() >= int16_info.min and floors.max() <= int16_info.max
+            )):
+                df['floors_count'] = df['floors_count'].astype(np.int16)
+        
+        return df
+    
+    def _freeze_dataframe(self, df: pd.DataFrame):
+        """Passe les blocs numériques en lecture seule pour détecter les écritures en place"""
+        try:
+            for block in df._mgr.blocks:
+                values = getattr(block.values, '_ndarray', block.values)
+                if isinstance(values, np.ndarray) and values.dtype.kind in 'biufcmM':
+                    values.setflags(write=False)
+        except (AttributeError, ValueError) as e:
+            logger.debug(f"Protection lecture seule indisponible: {e}")
+    
     def _clean_and_validate_data(self, df: pd.DataFrame, data_type: str) -> pd.DataFrame:
         """
         Nettoie et valide les données selon leur type
@@ -276,7 +668,9 @@ class DataService:
             pd.DataFrame: DataFrame nettoyé
         """
         try:
-            df_cleaned = df.copy()
+            # Copie superficielle : les colonnes ne sont dupliquées qu'à leur
+            # modification (Copy-on-Write), le DataFrame brut reste intact
+            df_cleaned = df.copy(deep=False)
             
             if data_type == 'buildings':
                 df_cleaned = self._clean_buildings_data(df_cleaned)
@@ -295,30 +689,37 @@ class DataService:
     
     def _clean_buildings_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Nettoie les données de bâtiments"""
-        # Suppression des doublons
-        if 'unique_id' in df.columns:
+        # Suppression des doublons (sans copie du DataFrame si les IDs sont déjà uniques)
+        if 'unique_id' in df.columns and not df['unique_id'].is_unique:
             df = df.drop_duplicates(subset=['unique_id'])
         
         # Validation des coordonnées
         if 'latitude' in df.columns and 'longitude' in df.columns:
-            # Limites Malaysia
-            df = df[
-                (df['latitude'].between(0.5, 7.5)) &
-                (df['longitude'].between(99.0, 120.0)) &
-                (df['latitude'].notna()) &
-                (df['longitude'].notna())
-            ]
+            # Limites Malaysia, un seul masque numpy (NaN exclus par les comparaisons)
+            coords = df[['latitude', 'longitude']].to_numpy(dtype=np.float64)
+            lat, lon = coords[:, 0], coords[:, 1]
+            with np.errstate(invalid='ignore'):
+                in_bounds = (lat >= 0.5) & (lat <= 7.5) & (lon >= 99.0) & (lon <= 120.0)
+            df = df[in_bounds]
         
         # Conversion des types
-        numeric_columns = ['surface_area_m2', 'polygon_area_m2', 'floors_count']
-        for col in numeric_columns:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        numeric_columns = [
+            col for col in ('surface_area_m2', 'polygon_area_m2', 'floors_count')
+            if col in df.columns
+        ]
+        if numeric_columns:
+            df[numeric_columns] = df[numeric_columns].apply(pd.to_numeric, errors='coerce').fillna(0)
         
         # Validation surface minimum
         if 'surface_area_m2' in df.columns:
             df = df[df['surface_area_m2'] > 0]
         
+        # Type et zone en catégories (quelques dizaines de valeurs distinctes) :
+        # value_counts/groupby travaillent ensuite sur des codes entiers
+        for col in ('building_type', 'zone_name'):
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        
         return df
     
     def _clean_timeseries_data(self, df: pd.DataFrame, data_type: str) -> pd.DataFrame:
@@ -337,12 +738,23 @@ class DataService:
             
             # Suppression des outliers extrêmes (> 99.9e percentile)
             if len(df) > 100:
-                upper_limit = df['y'].quantile(0.999)
-                df = df[df['y'] <= upper_limit]
+                values = df['y'].to_numpy(dtype=np.float64)
+                df = df[_quantile_keep_mask(values, 0.999)]
         
-        # Tri par timestamp
-        if 'timestamp' in df.columns:
-            df = df.sort_values(['unique_id', 'timestamp'] if 'unique_id' in df.columns else ['timestamp'])
+        # Identifiants de bâtiments en catégories (codes entiers pour tri, groupby, filtres)
+        if 'unique_id' in df.columns:
+            df['unique_id'] = df['unique_id'].astype('category')
+        
+        # Tri par bâtiment puis timestamp : tri lexicographique stable sur les codes
+        # de catégories (ordre alphabétique, valeurs manquantes en dernier) et les
+        # horodatages entiers
+        if 'timestamp' in df.columns and 'unique_id' in df.columns:
+            codes = df['unique_id'].cat.codes.to_numpy().astype(np.int64)
+            codes[codes < 0] = len(df['unique_id'].cat.categories)
+            stamps = df['timestamp'].to_numpy().view(np.int64)
+            df = df.take(np.lexsort((stamps, codes)))
+        elif 'timestamp' in df.columns:
+            df = df.sort_values('timestamp', kind='stable')
         
         return df
     
@@ -356,13 +768,16 @@ class DataService:
         # Validation des colonnes météo numériques
         weather_columns = [col for col in df.columns if col not in ['unique_id', 'timestamp']]
         
-        for col in weather_columns:
-            if df[col].dtype in ['object']:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+        # Conversion limitée aux colonnes texte (aucun passage si le lecteur
+        # pyarrow a déjà produit des colonnes numériques)
+        text_columns = [col for col in weather_columns if pd.api.types.is_string_dtype(df[col])]
+        if text_columns:
+            df[text_columns] = df[text_columns].apply(pd.to_numeric, errors='coerce')
         
         # Suppression des lignes avec trop de valeurs manquantes
         threshold = len(weather_columns) * 0.5  # Au moins 50% des colonnes valides
-        df = df.dropna(thresh=threshold + 2)  # +2 pour unique_id et timestamp
+        valid_counts = np.count_nonzero(df.notna().to_numpy(), axis=1)
+        df = df[valid_counts >= threshold + 2]  # +2 pour unique_id et timestamp
         
         return df
     
@@ -378,13 +793,47 @@ class DataService:
         """
         buildings_df = self.data_cache['buildings']
         
-        if buildings_df is None or 'building_type' not in buildings_df.columns:
+        if buildings_df is None:
             return None
         
         if building_type == 'all':
             return buildings_df
         
-        return buildings_df[buildings_df['building_type'] == building_type]
+        if 'building_type' not in buildings_df.columns:
+            return None
+        
+        positions = self._buildings_by_type.get(building_type)
+        if positions is None:
+            # Type inconnu : DataFrame vide avec les mêmes colonnes
+            return buildings_df.iloc[0:0]
+        
+        return self._memoize(
+            ('buildings_type', building_type),
+            lambda: self._take_buildings(buildings_df, positions)
+        )
+    
+    @staticmethod
+    def _take_buildings(buildings_df: pd.DataFrame, positions: np.ndarray) -> pd.DataFrame:
+        """Extrait les bâtiments aux positions données (catégories réduites au type)"""
+        subset = buildings_df.take(positions)
+        return subset.assign(
+            building_type=subset['building_type'].cat.remove_unused_categories()
+        )
+    
+    def _build_buildings_type_index(self):
+        """Précalcule les positions des bâtiments par type"""
+        buildings_df = self.data_cache['buildings']
+        self._buildings_by_type = {}
+        
+        if buildings_df is None or 'building_type' not in buildings_df.columns:
+            return
+        
+        # Une seule passe de factorisation ; seules les positions sont conservées,
+        # les sous-ensembles sont extraits à la demande
+        groups = buildings_df.groupby('building_type', observed=True).indices
+        self._buildings_by_type = {
+            str(building_type): positions for building_type, positions in groups.items()
+        }
     
     def get_consumption_by_timerange(self, start_date: str, end_date: str) -> Optional[pd.DataFrame]:
         """
@@ -406,43 +855,88 @@ class DataService:
             start_dt = pd.to_datetime(start_date)
             end_dt = pd.to_datetime(end_date)
             
-            mask = (
-                (consumption_df['timestamp'] >= start_dt) &
-                (consumption_df['timestamp'] <= end_dt)
-            )
+            time_index = self._consumption_time_index
+            if time_index is None or len(time_index[0]) != len(consumption_df):
+                mask = (
+                    (consumption_df['timestamp'] >= start_dt) &
+                    (consumption_df['timestamp'] <= end_dt)
+                )
+                return consumption_df[mask]
             
-            return consumption_df[mask]
+            # Recherche dichotomique des bornes, puis ordre d'origine des lignes
+            sorted_times, order = time_index
+            start = sorted_times.searchsorted(start_dt, side='left')
+            end = sorted_times.searchsorted(end_dt, side='right')
+            positions = np.sort(order[start:end]) if end > start else order[:0]
+            return consumption_df.take(positions)
             
         except Exception as e:
             logger.error(f"Erreur filtrage temporel: {e}")
             return consumption_df
     
+    def _build_consumption_time_index(self):
+        """
+        Précalcule l'ordre chronologique des relevés de consommation
+        
+        Les données restent triées par bâtiment puis horodatage ; seul un
+        index trié des horodatages est conservé pour les filtres par période.
+        """
+        consumption_df = self.data_cache['consumption']
+        self._consumption_time_index = None
+        
+        if consumption_df is None or 'timestamp' not in consumption_df.columns:
+            return
+        
+        timestamps = consumption_df['timestamp'].to_numpy()
+        order = np.argsort(timestamps, kind='stable')
+        self._consumption_time_index = (pd.DatetimeIndex(timestamps[order]), order)
+    
     def get_zone_statistics(self) -> Dict:
         """Statistiques par zone géographique"""
+        return self._memoize('zones', self._compute_zone_statistics)
+    
+    def _compute_zone_statistics(self) -> Dict:
+        """Calcule les statistiques par zone géographique"""
         buildings_df = self.data_cache['buildings']
         
         if buildings_df is None or 'zone_name' not in buildings_df.columns:
             return {}
         
         try:
-            zone_stats = buildings_df.groupby('zone_name').agg({
-                'unique_id': 'count',
-                'surface_area_m2': ['sum', 'mean'],
-                'building_type': lambda x: x.value_counts().to_dict(),
-                'latitude': 'mean',
-                'longitude': 'mean'
-            }).round(2)
+            # Surfaces agrégées en float64 : sommes exactes et arrondi effectif
+            grouped = buildings_df.astype({'surface_area_m2': np.float64}).groupby(
+                'zone_name', observed=True
+            )
+            
+            zone_stats = grouped.agg(
+                total_surface=('surface_area_m2', 'sum'),
+                avg_surface=('surface_area_m2', 'mean'),
+                center_lat=('latitude', 'mean'),
+                center_lng=('longitude', 'mean')
+            )
+            zone_stats = zone_stats.astype(np.float64).round(2)
+            zone_stats.insert(0, 'building_count', grouped['unique_id'].count())
+            
+            # Répartition des types par zone en un seul tableau croisé
+            types_by_zone = {}
+            if 'building_type' in buildings_df.columns:
+                type_counts = buildings_df.groupby(
+                    ['zone_name', 'building_type'], observed=True
+                ).size().unstack(fill_value=0)
+                types_by_zone = {
+                    zone: {building_type: int(count) for building_type, count in counts.items() if count}
+                    for zone, counts in type_counts.to_dict(orient='index').items()
+                }
             
             zone_dict = {}
-            for zone in zone_stats.index:
-                stats = zone_stats.loc[zone]
+            for zone, count, total, avg, lat, lng in zone_stats.itertuples(name=None):
                 zone_dict[zone] = {
-                    'building_count': int(stats[('unique_id', 'count')]),
-                    'total_surface': float(stats[('surface_area_m2', 'sum')]),
-                    'avg_surface': float(stats[('surface_area_m2', 'mean')]),
-                    'building_types': stats[('building_type', '<lambda>')],
-                    'center_lat': float(stats[('latitude', 'mean')]),
-                    'center_lng': float(stats[('longitude', 'mean')])
+                    'building_count': int(count),
+                    'total_surface': float(total),
+                    'avg_surface': float(avg),
+                    'building_types': types_by_zone.get(zone, {}),
+                    'center_lat': float(lat),
+                    'center_lng': float(lng)
                 }
             
             return zone_dict
@@ -459,19 +953,66 @@ class DataService:
         for key in self.data_cache:
             if key != 'last_loaded':
                 self.data_cache[key] = None
+        self._loaded_mask = 0
+        self._row_counts.clear()
+        self.arrow_cache.clear()
+        with self._memo_lock:
+            self._memo.clear()
         
         # Recharger
         return self.load_malaysia_data()
     
     def is_data_loaded(self) -> bool:
         """Vérifie si des données sont chargées"""
-        return any(
-            self.data_cache[key] is not None 
-            for key in ['buildings', 'consumption', 'weather', 'water']
-        )
+        return self._loaded_mask != 0
+    
+    def _count_matching(self, data_type: str, column: str, comparison: str, value: float) -> int:
+        """
+        Nombre de valeurs d'une colonne vérifiant une comparaison ('less', 'less_equal'...)
+        
+        Compté sur la table Arrow (pyarrow.compute) lorsqu'elle existe, sinon
+        avec numpy ; les valeurs manquantes ne sont jamais comptées.
+        """
+        table = self.arrow_cache.get(data_type)
+        if table is not None and column in table.column_names:
+            matches = getattr(pyarrow.compute, comparison)(table[column], value)
+            return int(pyarrow.compute.sum(matches).as_py() or 0)
+        
+        values = self.data_cache[data_type][column].to_numpy()
+        return int(np.count_nonzero(getattr(np, comparison)(values, value)))
+    
+    @staticmethod
+    def _count_timestamp_duplicates(df: pd.DataFrame) -> int:
+        """
+        Nombre de lignes répétant un couple (unique_id, timestamp) déjà vu
+        
+        Équivalent de df.duplicated(['unique_id', 'timestamp']).sum() sur des
+        clés entières : les données nettoyées étant triées par bâtiment puis
+        horodatage, les doublons sont adjacents ; sinon un tri lexicographique
+        est effectué au préalable.
+        """
+        if len(df) < 2:
+            return 0
+        
+        codes, _ = pd.factorize(df['unique_id'])
+        codes = codes.astype(np.int64, copy=False)
+        stamps = df['timestamp'].to_numpy().view(np.int64)
+        
+        same_id = codes[1:] == codes[:-1]
+        ordered = np.all((codes[1:] > codes[:-1]) | (same_id & (stamps[1:] >= stamps[:-1])))
+        if not ordered:
+            order = np.lexsort((stamps, codes))
+            codes, stamps = codes[order], stamps[order]
+            same_id = codes[1:] == codes[:-1]
+        
+        return int(np.count_nonzero(same_id & (stamps[1:] == stamps[:-1])))
     
     def get_data_health(self) -> Dict:
         """État de santé des données"""
+        return self._memoize('health', self._compute_data_health)
+    
+    def _compute_data_health(self) -> Dict:
+        """Évalue l'état de santé des données"""
         health = {
             'overall_status': 'healthy',
             'issues': [],
@@ -485,17 +1026,17 @@ class DataService:
             if buildings_df is not None:
                 buildings_issues = []
                 
-                # Coordonnées manquantes
-                missing_coords = buildings_df[
-                    buildings_df['latitude'].isna() | buildings_df['longitude'].isna()
-                ]
-                if len(missing_coords) > 0:
-                    buildings_issues.append(f"{len(missing_coords)} bâtiments sans coordonnées")
+                # Coordonnées manquantes (comptage direct, sans extraire les lignes)
+                missing_coords = int(np.count_nonzero(
+                    buildings_df['latitude'].isna().to_numpy() | buildings_df['longitude'].isna().to_numpy()
+                ))
+                if missing_coords > 0:
+                    buildings_issues.append(f"{missing_coords} bâtiments sans coordonnées")
                 
                 # Surfaces nulles
-                zero_surface = buildings_df[buildings_df['surface_area_m2'] <= 0]
-                if len(zero_surface) > 0:
-                    buildings_issues.append(f"{len(zero_surface)} bâtiments avec surface nulle")
+                zero_surface = self._count_matching('buildings', 'surface_area_m2', 'less_equal', 0)
+                if zero_surface > 0:
+                    buildings_issues.append(f"{zero_surface} bâtiments avec surface nulle")
                 
                 health['data_quality']['buildings'] = {
                     'total_records': len(buildings_df),
@@ -510,15 +1051,15 @@ class DataService:
                 consumption_issues = []
                 
                 # Valeurs négatives
-                negative_values = consumption_df[consumption_df['y'] < 0]
-                if len(negative_values) > 0:
-                    consumption_issues.append(f"{len(negative_values)} valeurs négatives")
+                negative_count = self._count_matching('consumption', 'y', 'less', 0)
+                if negative_count > 0:
+                    consumption_issues.append(f"{negative_count} valeurs négatives")
                 
                 # Doublons temporels
                 if 'timestamp' in consumption_df.columns and 'unique_id' in consumption_df.columns:
-                    duplicates = consumption_df.duplicated(subset=['unique_id', 'timestamp'])
-                    if duplicates.sum() > 0:
-                        consumption_issues.append(f"{duplicates.sum()} doublons temporels")
+                    duplicate_count = self._count_timestamp_duplicates(consumption_df)
+                    if duplicate_count > 0:
+                        consumption_issues.append(f"{duplicate_count} doublons temporels")
                 
                 health['data_quality']['consumption'] = {
                     'total_records': len(consumption_df),
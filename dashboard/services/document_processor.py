@@ -11,14 +11,20 @@ Version: 1.0.0
 """
 
 import os
+import re
+import atexit
 import logging
 import hashlib
 import mimetypes
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
+from itertools import chain, islice
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import sqlite3
 import json
+import threading
 
 import pandas as pd
 import numpy as np
@@ -43,8 +49,209 @@ try:
 except ImportError:
     EXCEL_AVAILABLE = False
 
+# Hachage des fichiers (BLAKE3 vectorisé, sinon SHA-256 d'OpenSSL)
+try:
+    from blake3 import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+# Détection d'encodage des fichiers texte
+try:
+    from charset_normalizer import from_bytes as detect_encoding
+    CHARSET_NORMALIZER_AVAILABLE = True
+except ImportError:
+    CHARSET_NORMALIZER_AVAILABLE = False
+
+# Lecture JSON incrémentale (événements, mémoire bornée)
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Découpage natif (Rust, recherche SIMD des délimiteurs)
+try:
+    import chonkie_core
+    CHONKIE_AVAILABLE = True
+except ImportError:
+    CHONKIE_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Fin de phrase : ponctuation suivie d'espaces
+_SENTENCE_PATTERN = re.compile(r'[.!?]+\s+')
+
+# Threads d'extraction des pages PDF (chacun ouvre son propre lecteur)
+_PDF_PAGE_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def _pdfplumber_page_texts(file_path: Path, pages: range) -> List[str]:
+    """Texte d'une plage de pages via pdfplumber"""
+    with pdfplumber.open(file_path) as pdf:
+        return [pdf.pages[i].extract_text() or "" for i in pages]
+
+
+def _pypdf2_page_texts(file_path: Path, pages: range) -> List[str]:
+    """Texte d'une plage de pages via PyPDF2"""
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [pdf_reader.pages[i].extract_text() or "" for i in pages]
+
+
+def _extract_page_texts(extract, file_path: Path, page_count: int) -> List[str]:
+    """
+    Extrait le texte de toutes les pages, réparties en plages contiguës sur un pool de threads
+    
+    Les lecteurs PDF ne sont pas sûrs entre threads (position de fichier
+    partagée) : chaque plage est lue par un lecteur distinct.
+    """
+    workers = min(_PDF_PAGE_WORKERS, page_count)
+    if workers <= 1:
+        return extract(file_path, range(page_count))
+    
+    step = -(-page_count // workers)
+    ranges = [range(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+    with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+        return list(chain.from_iterable(
+            executor.map(lambda pages: extract(file_path, pages), ranges)
+        ))
+
+
+def _join_page_texts(page_texts: List[str]) -> str:
+    """Assemble le texte des pages non vides avec leurs séparateurs"""
+    return "".join([
+        f"\n\n--- Page {i+1} ---\n{page_text}"
+        for i, page_text in enumerate(page_texts) if page_text
+    ])
+
+
+# Octets analysés pour détecter l'encodage d'un fichier texte non UTF-8
+_ENCODING_SAMPLE_BYTES = 65536
+
+# Au-delà, describe(include='all') (comptages des colonnes texte) est
+# limité aux colonnes numériques
+_DESCRIBE_ALL_MAX_ROWS = 100_000
+
+# Longueur maximale de l'extrait JSON inclus dans le contenu
+_JSON_SNIPPET_CHARS = 5000
+
+
+def _frame_to_text(df: pd.DataFrame, index: bool = False) -> str:
+    """Tableau en texte tabulé (sans l'alignement coûteux de to_string)"""
+    return df.to_csv(sep='\t', index=index, lineterminator='\n', float_format='%.6g')
+
+# Nom de type Python correspondant à chaque événement de valeur JSON
+_JSON_EVENT_TYPES = {
+    'start_map': 'dict',
+    'start_array': 'list',
+    'string': 'str',
+    'boolean': 'bool',
+    'null': 'NoneType'
+}
+
+
+def _iter_json_events(obj, prefix: str = ''):
+    """Événements (prefix, event, value) au format ijson.parse pour un objet déjà chargé"""
+    if isinstance(obj, dict):
+        yield prefix, 'start_map', None
+        for key, value in obj.items():
+            yield prefix, 'map_key', key
+            yield from _iter_json_events(value, f"{prefix}.{key}" if prefix else str(key))
+        yield prefix, 'end_map', None
+    elif isinstance(obj, list):
+        yield prefix, 'start_array', None
+        item_prefix = f"{prefix}.item" if prefix else 'item'
+        for item in obj:
+            yield from _iter_json_events(item, item_prefix)
+        yield prefix, 'end_array', None
+    elif obj is None:
+        yield prefix, 'null', None
+    elif isinstance(obj, bool):
+        yield prefix, 'boolean', obj
+    elif isinstance(obj, str):
+        yield prefix, 'string', obj
+    else:
+        yield prefix, 'number', obj
+
+
+def _scan_json_events(events) -> Tuple[str, Optional[Dict], int]:
+    """
+    Parcourt les événements JSON en une passe
+    
+    Seuls les conteneurs décrits dans le résumé (niveaux 0 à 2, premier
+    élément des listes) sont conservés en mémoire.
+    
+    Returns:
+        Tuple: (type de la racine, arbre du résumé, profondeur maximale)
+    """
+    root_type = 'NoneType'
+    root_node = None
+    max_depth = 0
+    # Pile des conteneurs ouverts : [noeud décrit ou None, niveau, clé en attente]
+    stack = []
+    
+    for _, event, value in events:
+        if event == 'map_key':
+            stack[-1][2] = value
+            continue
+        if event in ('end_map', 'end_array'):
+            stack.pop()
+            continue
+        
+        type_name = _JSON_EVENT_TYPES.get(event) or type(value).__name__
+        depth = len(stack)
+        if depth > max_depth:
+            max_depth = depth
+        
+        # Valeur décrite : racine, valeur d'un objet décrit ou premier
+        # élément d'une liste décrite
+        item = None
+        if not stack:
+            root_type = type_name
+        else:
+            parent, parent_level, key = stack[-1]
+            if parent is not None:
+                parent['len'] += 1
+                if parent['kind'] == 'dict' or parent['len'] == 1:
+                    item = [key if parent['kind'] == 'dict' else None, type_name, None]
+                    parent['items'].append(item)
+        
+        if event in ('start_map', 'start_array'):
+            # Contenu détaillé seulement jusqu'au niveau 2
+            node = None
+            if not stack or (item is not None and parent_level < 2):
+                node = {'kind': 'dict' if event == 'start_map' else 'list', 'len': 0, 'items': []}
+                if item is None:
+                    root_node = node
+                else:
+                    item[2] = node
+            stack.append([node, depth, None])
+    
+    return root_type, root_node, max_depth
+
+
+def _render_json_structure(node: Optional[Dict], level: int = 0) -> str:
+    """Résumé textuel de la structure (clés et types jusqu'au niveau 2)"""
+    if node is None:
+        return ""
+    
+    indent = "  " * level
+    if node['kind'] == 'dict':
+        lines = [f"{indent}Objet ({node['len']} clés):\n"]
+        for key, type_name, child in node['items']:
+            lines.append(f"{indent}  {key}: {type_name}\n")
+            if level < 2:
+                lines.append(_render_json_structure(child, level + 1))
+        return "".join(lines)
+    
+    result = f"{indent}Liste ({node['len']} éléments)\n"
+    if node['items'] and level < 2:
+        _, type_name, child = node['items'][0]
+        result += f"{indent}  Type d'éléments: {type_name}\n"
+        result += _render_json_structure(child, level + 1)
+    return result
+
 
 class DocumentProcessor:
     """Processeur de documents pour l'alimentation RAG"""
@@ -87,6 +294,13 @@ class DocumentProcessor:
             'min_chunk_size': 50     # Taille minimale d'un chunk
         }
         
+        # Lecture des classeurs Excel (échantillon lu en flux)
+        self.excel_config = {
+            'sample_rows': 10,          # Lignes d'échantillon par feuille
+            'numeric_stats': False,     # Statistiques numériques (relit la feuille)
+            'stats_max_rows': 100_000   # Lignes lues pour ces statistiques
+        }
+        
         # Base de données des documents traités
         self._init_documents_db()
         
@@ -94,9 +308,21 @@ class DocumentProcessor:
     
     def _init_documents_db(self):
         """Initialise la base de données des documents"""
-        db_path = self.documents_dir / "documents_index.db"
+        self.db_path = self.documents_dir / "documents_index.db"
         
-        with sqlite3.connect(db_path) as conn:
+        # Connexion persistante partagée entre threads (WAL, autocommit)
+        self._conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None
+        )
+        # Journal WAL (persistant) : pas de fsync ordonné à chaque commit
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._db_lock = threading.Lock()
+        atexit.register(self.close)
+        
+        with self._db_lock:
+            conn = self._conn
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS processed_documents (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -126,9 +352,27 @@ class DocumentProcessor:
                 )
             """)
             
-            conn.commit()
-        
-        self.db_path = db_path
+            # Hash des fichiers déjà lus, valable tant que date et taille sont inchangées
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS file_hash_cache (
+                    path TEXT PRIMARY KEY,
+                    mtime REAL,
+                    size INTEGER,
+                    hash TEXT
+                )
+            """)
+            
+            # Recherche des documents par hash de contenu
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_pd_hash
+                ON processed_documents (file_hash)
+            """)
+            
+            # Chunks d'un document, dans l'ordre
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_dc_doc
+                ON document_chunks (document_id, chunk_index)
+            """)
     
     def process_documents_directory(self) -> Dict:
         """
@@ -143,7 +387,8 @@ class DocumentProcessor:
             # Recherche de tous les fichiers
             all_files = []
             for file_path in self.documents_dir.rglob('*'):
-                if file_path.is_file() and not file_path.name.startswith('.'):
+                # L'index SQLite et ses fichiers WAL (-wal, -shm) ne sont pas des documents
+                if file_path.is_file() and not file_path.name.startswith(('.', self.db_path.name)):
                     # Éviter les dossiers de traitement
                     if 'processed' not in str(file_path) and 'failed' not in str(file_path):
                         all_files.append(file_path)
@@ -160,34 +405,21 @@ class DocumentProcessor:
                 'processing_details': []
             }
             
-            for file_path in all_files:
-                try:
-                    result = self.process_single_document(file_path)
-                    
-                    if result['success']:
-                        results['processed'] += 1
-                        results['new_chunks'] += result.get('chunks_created', 0)
-                    elif result.get('skipped'):
-                        results['skipped'] += 1
-                    else:
-                        results['failed'] += 1
-                    
-                    results['processing_details'].append({
-                        'file': str(file_path.name),
-                        'status': 'success' if result['success'] else 'failed',
-                        'chunks': result.get('chunks_created', 0),
-                        'message': result.get('message', '')
-                    })
-                    
-                except Exception as e:
-                    logger.error(f"❌ Erreur traitement {file_path.name}: {e}")
+            for file_path, result in self._process_files(all_files):
+                if result['success']:
+                    results['processed'] += 1
+                    results['new_chunks'] += result.get('chunks_created', 0)
+                elif result.get('skipped'):
+                    results['skipped'] += 1
+                else:
                     results['failed'] += 1
-                    results['processing_details'].append({
-                        'file': str(file_path.name),
-                        'status': 'error',
-                        'chunks': 0,
-                        'message': str(e)
-                    })
+                
+                results['processing_details'].append({
+                    'file': str(file_path.name),
+                    'status': 'success' if result['success'] else 'failed',
+                    'chunks': result.get('chunks_created', 0),
+                    'message': result.get('message', '')
+                })
             
             logger.info(f"✅ Traitement terminé: {results['processed']} réussis, {results['failed']} échecs")
             return results
@@ -201,6 +433,73 @@ class DocumentProcessor:
                 'error': str(e)
             }
     
+    def _process_files(self, files: List[Path]):
+        """
+        Traite une liste de fichiers, l'extraction et le découpage en parallèle
+        
+        La vérification des doublons, l'indexation RAG et les écritures SQLite
+        restent dans le processus principal ; seuls la lecture des documents
+        (PDF, Word, Excel...) et le découpage en chunks sont répartis sur un
+        ProcessPoolExecutor.
+        
+        Yields:
+            Tuple: (chemin du fichier, résultat du traitement), dans l'ordre des fichiers
+        """
+        prepared = []
+        for file_path in files:
+            try:
+                prepared.append((file_path, self._prepare_document(file_path)))
+            except Exception as e:
+                prepared.append((file_path, self._fail_document(file_path, e)))
+        
+        pending = [item for item in prepared if isinstance(item[1], str)]
+        max_workers = min(os.cpu_count() or 1, len(pending))
+        
+        executor = None
+        futures = {}
+        if max_workers > 1:
+            try:
+                executor = ProcessPoolExecutor(max_workers=max_workers)
+                for file_path, _ in pending:
+                    logger.info(f"📄 Traitement: {file_path.name}")
+                    futures[file_path] = executor.submit(self._extract_and_chunk, file_path)
+            except Exception as e:
+                logger.warning(f"⚠️ Traitement parallèle indisponible, mode séquentiel: {e}")
+                futures = {}
+        
+        try:
+            for file_path, state in prepared:
+                if isinstance(state, dict):
+                    yield file_path, state
+                    continue
+                
+                try:
+                    extracted = None
+                    if file_path in futures:
+                        try:
+                            extracted = futures[file_path].result()
+                        except BrokenProcessPool as e:
+                            # Processus d'extraction interrompu : nouvel essai ici
+                            logger.warning(f"⚠️ Extraction parallèle interrompue pour {file_path.name}: {e}")
+                    if extracted is None:
+                        logger.info(f"📄 Traitement: {file_path.name}")
+                        extracted = self._extract_and_chunk(file_path)
+                    yield file_path, self._index_document(file_path, state, *extracted)
+                except Exception as e:
+                    yield file_path, self._fail_document(file_path, e)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+    
+    def __getstate__(self):
+        """État transmis aux processus d'extraction (sans le service RAG)"""
+        state = self.__dict__.copy()
+        state['rag_service'] = None
+        # Connexion SQLite et verrou non transmissibles (inutiles à l'extraction)
+        state['_conn'] = None
+        state['_db_lock'] = None
+        return state
+    
     def process_single_document(self, file_path: Path) -> Dict:
         """
         Traite un document unique
@@ -212,116 +511,200 @@ class DocumentProcessor:
             Dict: Résultat du traitement
         """
         try:
-            # Vérification de l'existence
-            if not file_path.exists():
-                return {'success': False, 'message': 'Fichier introuvable'}
-            
-            # Calcul du hash pour détecter les doublons
-            file_hash = self._calculate_file_hash(file_path)
-            
-            # Vérification si déjà traité
-            if self._is_document_processed(file_path.name, file_hash):
-                return {
-                    'success': True, 
-                    'skipped': True, 
-                    'message': 'Document déjà traité (hash identique)'
-                }
-            
-            # Détection du type de fichier
-            file_extension = file_path.suffix.lower()
-            
-            if file_extension not in self.supported_types:
-                return {
-                    'success': False, 
-                    'message': f'Type de fichier non supporté: {file_extension}'
-                }
+            state = self._prepare_document(file_path)
+            if isinstance(state, dict):
+                return state
             
             logger.info(f"📄 Traitement: {file_path.name}")
+            metadata, chunks = self._extract_and_chunk(file_path)
+            return self._index_document(file_path, state, metadata, chunks)
             
-            # Extraction du contenu
-            processor_func = self.supported_types[file_extension]
-            content, metadata = processor_func(file_path)
-            
-            if not content or len(content.strip()) < 10:
-                return {'success': False, 'message': 'Contenu vide ou trop court'}
-            
-            # Découpage en chunks
-            chunks = self._create_chunks(content, metadata)
-            
-            # Enregistrement en base
-            document_id = self._save_document_record(
-                file_path, file_hash, len(chunks), metadata
-            )
-            
-            # Indexation dans le RAG
-            chunks_created = 0
-            for i, chunk in enumerate(chunks):
-                try:
-                    # Ajout du contexte document dans les métadonnées du chunk
-                    chunk_metadata = {
-                        'source_document': file_path.name,
-                        'document_type': file_extension[1:],  # Sans le point
-                        'chunk_index': i,
-                        'total_chunks': len(chunks),
-                        'document_metadata': metadata,
-                        'processing_date': datetime.now().isoformat()
-                    }
-                    
-                    # Ajout au RAG
-                    self.rag_service.add_knowledge_item(
-                        content=chunk,
-                        metadata=chunk_metadata
-                    )
-                    
-                    # Sauvegarde du chunk en base
-                    self._save_chunk_record(document_id, i, chunk, chunk_metadata)
-                    chunks_created += 1
-                    
-                except Exception as e:
-                    logger.warning(f"⚠️ Erreur indexation chunk {i}: {e}")
-            
-            # Déplacement vers le dossier processed
-            processed_path = self.processed_dir / file_path.name
-            if not processed_path.exists():
-                file_path.rename(processed_path)
-            
-            result = {
-                'success': True,
-                'chunks_created': chunks_created,
-                'message': f'Document traité: {chunks_created} chunks créés'
+        except Exception as e:
+            return self._fail_document(file_path, e)
+    
+    def _prepare_document(self, file_path: Path):
+        """
+        Vérifications préalables au traitement d'un document
+        
+        Returns:
+            str: Hash du fichier à traiter, ou Dict: résultat final (ignoré, non supporté...)
+        """
+        # Vérification de l'existence
+        if not file_path.exists():
+            return {'success': False, 'message': 'Fichier introuvable'}
+        
+        # Calcul du hash pour détecter les doublons
+        file_hash = self._get_file_hash(file_path)
+        
+        # Vérification si déjà traité
+        if self._is_document_processed(file_path.name, file_hash):
+            return {
+                'success': True, 
+                'skipped': True, 
+                'message': 'Document déjà traité (hash identique)'
             }
-            
-            logger.info(f"✅ {file_path.name}: {chunks_created} chunks indexés")
-            return result
-            
+        
+        # Détection du type de fichier
+        file_extension = file_path.suffix.lower()
+        
+        if file_extension not in self.supported_types:
+            return {
+                'success': False, 
+                'message': f'Type de fichier non supporté: {file_extension}'
+            }
+        
+        return file_hash
+    
+    def _extract_and_chunk(self, file_path: Path) -> Tuple[Dict, Optional[List[str]]]:
+        """
+        Extrait le contenu d'un document et le découpe en chunks
+        
+        Sans accès à la base ni au RAG : exécutable dans un processus séparé.
+        
+        Returns:
+            Tuple: (métadonnées, chunks ou None si le contenu est vide ou trop court)
+        """
+        processor_func = self.supported_types[file_path.suffix.lower()]
+        content, metadata = processor_func(file_path)
+        
+        if not content or len(content.strip()) < 10:
+            return metadata, None
+        
+        return metadata, self._create_chunks(content, metadata)
+    
+    def _index_document(self, file_path: Path, file_hash: str, metadata: Dict,
+                        chunks: Optional[List[str]]) -> Dict:
+        """Enregistre un document découpé et indexe ses chunks dans le RAG"""
+        if chunks is None:
+            return {'success': False, 'message': 'Contenu vide ou trop court'}
+        
+        file_extension = file_path.suffix.lower()
+        
+        # Enregistrement en base
+        document_id = self._save_document_record(
+            file_path, file_hash, len(chunks), metadata
+        )
+        
+        # Indexation dans le RAG
+        chunk_records = []
+        for i, chunk in enumerate(chunks):
+            try:
+                # Ajout du contexte document dans les métadonnées du chunk
+                chunk_metadata = {
+                    'source_document': file_path.name,
+                    'document_type': file_extension[1:],  # Sans le point
+                    'chunk_index': i,
+                    'total_chunks': len(chunks),
+                    'document_metadata': metadata,
+                    'processing_date': datetime.now().isoformat()
+                }
+                
+                # Ajout au RAG
+                self.rag_service.add_knowledge_item(
+                    content=chunk,
+                    metadata=chunk_metadata
+                )
+                
+                chunk_records.append((i, chunk, chunk_metadata))
+                
+            except Exception as e:
+                logger.warning(f"⚠️ Erreur indexation chunk {i}: {e}")
+        
+        # Sauvegarde des chunks en base (une seule transaction)
+        self._save_chunk_records(document_id, chunk_records)
+        chunks_created = len(chunk_records)
+        
+        # Déplacement vers le dossier processed
+        processed_path = self.processed_dir / file_path.name
+        if not processed_path.exists():
+            file_path.rename(processed_path)
+        
+        result = {
+            'success': True,
+            'chunks_created': chunks_created,
+            'message': f'Document traité: {chunks_created} chunks créés'
+        }
+        
+        logger.info(f"✅ {file_path.name}: {chunks_created} chunks indexés")
+        return result
+    
+    def _fail_document(self, file_path: Path, error: Exception) -> Dict:
+        """Journalise l'échec d'un document et le déplace vers le dossier failed"""
+        logger.error(f"❌ Erreur traitement {file_path.name}: {error}")
+        
+        # Déplacement vers le dossier failed
+        try:
+            failed_path = self.failed_dir / file_path.name
+            if not failed_path.exists():
+                file_path.rename(failed_path)
+        except:
+            pass
+        
+        return {'success': False, 'message': str(error)}
+    
+    def _get_file_hash(self, file_path: Path) -> str:
+        """
+        Hash d'un fichier, relu depuis le cache si chemin, date de modification
+        et taille n'ont pas changé (un seul stat() par fichier déjà vu)
+        """
+        try:
+            stat = file_path.stat()
+            key = (str(file_path.resolve()), stat.st_mtime, stat.st_size)
+            with self._db_lock:
+                conn = self._conn
+                row = conn.execute(
+                    "SELECT hash FROM file_hash_cache WHERE path = ? AND mtime = ? AND size = ?",
+                    key
+                ).fetchone()
+            if row:
+                return row[0]
         except Exception as e:
-            logger.error(f"❌ Erreur traitement {file_path.name}: {e}")
-            
-            # Déplacement vers le dossier failed
+            logger.debug(f"Cache de hash indisponible pour {file_path.name}: {e}")
+            return self._calculate_file_hash(file_path)
+        
+        file_hash = self._calculate_file_hash(file_path)
+        if file_hash:
             try:
-                failed_path = self.failed_dir / file_path.name
-                if not failed_path.exists():
-                    file_path.rename(failed_path)
-            except:
-                pass
-            
-            return {'success': False, 'message': str(e)}
+                with self._db_lock:
+                    conn = self._conn
+                    conn.execute(
+                        "INSERT OR REPLACE INTO file_hash_cache (path, mtime, size, hash) VALUES (?, ?, ?, ?)",
+                        (*key, file_hash)
+                    )
+            except Exception as e:
+                logger.debug(f"Mise en cache du hash impossible pour {file_path.name}: {e}")
+        
+        return file_hash
     
     def _calculate_file_hash(self, file_path: Path) -> str:
-        """Calcule le hash MD5 d'un fichier"""
-        hash_md5 = hashlib.md5()
+        """
+        Calcule le hash d'un fichier, préfixé par son algorithme ('b3:...', 'sha256:...')
+        
+        La lecture se fait en C via hashlib.file_digest (Python 3.11+),
+        sinon par blocs de 1 Mio.
+        """
+        if BLAKE3_AVAILABLE:
+            hasher, prefix = blake3, 'b3'
+        else:
+            hasher, prefix = hashlib.sha256, 'sha256'
+        
         try:
             with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
+                if hasattr(hashlib, 'file_digest'):
+                    digest = hashlib.file_digest(f, hasher)
+                else:
+                    digest = hasher()
+                    for block in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(block)
+            return f"{prefix}:{digest.hexdigest()}"
         except Exception:
             return ""
     
     def _is_document_processed(self, filename: str, file_hash: str) -> bool:
         """Vérifie si un document a déjà été traité"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._db_lock:
+                conn = self._conn
                 cursor = conn.execute(
                     "SELECT id FROM processed_documents WHERE filename = ? AND file_hash = ?",
                     (filename, file_hash)
@@ -334,7 +717,8 @@ class DocumentProcessor:
                             chunks_count: int, metadata: Dict) -> int:
         """Sauvegarde l'enregistrement du document"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._db_lock:
+                conn = self._conn
                 cursor = conn.execute("""
                     INSERT OR REPLACE INTO processed_documents 
                     (filename, file_path, file_hash, file_size, file_type, 
@@ -350,81 +734,157 @@ class DocumentProcessor:
                     'success',
                     json.dumps(metadata, ensure_ascii=False)
                 ))
-                conn.commit()
                 return cursor.lastrowid
         except Exception as e:
             logger.error(f"Erreur sauvegarde document: {e}")
             return 0
     
-    def _save_chunk_record(self, document_id: int, chunk_index: int, 
-                          content: str, metadata: Dict):
-        """Sauvegarde l'enregistrement d'un chunk"""
+    def _save_chunk_records(self, document_id: int, records: List[Tuple[int, str, Dict]]):
+        """
+        Sauvegarde les chunks d'un document en une seule transaction
+        
+        Args:
+            document_id: Identifiant du document
+            records: Liste de (index du chunk, contenu, métadonnées)
+        """
+        if not records:
+            return
+        
         try:
-            content_hash = hashlib.md5(content.encode()).hexdigest()
-            
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    INSERT OR IGNORE INTO document_chunks 
-                    (document_id, chunk_index, content, content_hash, metadata)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
+            rows = [
+                (
                     document_id,
                     chunk_index,
                     content,
-                    content_hash,
+                    hashlib.md5(content.encode()).hexdigest(),
                     json.dumps(metadata, ensure_ascii=False)
-                ))
-                conn.commit()
+                )
+                for chunk_index, content, metadata in records
+            ]
+            
+            with self._db_lock:
+                conn = self._conn
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany("""
+                        INSERT OR IGNORE INTO document_chunks 
+                        (document_id, chunk_index, content, content_hash, metadata)
+                        VALUES (?, ?, ?, ?, ?)
+                    """, rows)
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
         except Exception as e:
-            logger.warning(f"Erreur sauvegarde chunk: {e}")
+            logger.warning(f"Erreur sauvegarde chunks: {e}")
     
     def _create_chunks(self, content: str, metadata: Dict) -> List[str]:
         """Découpe le contenu en chunks optimaux pour le RAG"""
         if len(content) <= self.chunk_config['max_chunk_size']:
             return [content.strip()]
         
-        chunks = []
-        sentences = self._split_into_sentences(content)
+        if CHONKIE_AVAILABLE:
+            try:
+                return self._create_native_chunks(content)
+            except Exception as e:
+                logger.debug(f"Découpage natif indisponible, repli Python: {e}")
+        
+        max_size = self.chunk_config['max_chunk_size']
+        min_size = self.chunk_config['min_chunk_size']
         
-        current_chunk = ""
+        # Phrases accumulées dans une liste (longueur tenue à jour), jointes
+        # une seule fois à la fermeture du chunk
+        chunks = []
+        buffer: List[str] = []
+        buffer_length = 0
         
-        for sentence in sentences:
+        for sentence in self._split_into_sentences(content):
+            added = len(sentence) + (1 if buffer else 0)
+            
             # Si ajouter cette phrase dépasse la taille max
-            if len(current_chunk) + len(sentence) > self.chunk_config['max_chunk_size']:
-                if len(current_chunk) >= self.chunk_config['min_chunk_size']:
-                    chunks.append(current_chunk.strip())
-                    
-                    # Overlap: garder les derniers mots pour le contexte
-                    words = current_chunk.split()
-                    overlap_words = words[-self.chunk_config['overlap_size']//10:]
-                    current_chunk = " ".join(overlap_words) + " " + sentence
-                else:
-                    current_chunk += " " + sentence
-            else:
-                current_chunk += " " + sentence
+            if buffer_length + added > max_size and buffer_length >= min_size:
+                chunk = " ".join(buffer)
+                chunks.append(chunk)
+                
+                # Overlap: reprendre la fin du chunk pour le contexte
+                tail = self._overlap_tail(chunk)
+                buffer = [tail] if tail else []
+                buffer_length = len(tail)
+                added = len(sentence) + (1 if buffer else 0)
+            
+            buffer.append(sentence)
+            buffer_length += added
         
         # Ajouter le dernier chunk
-        if len(current_chunk.strip()) >= self.chunk_config['min_chunk_size']:
-            chunks.append(current_chunk.strip())
+        if buffer_length >= min_size:
+            chunks.append(" ".join(buffer))
         
-        return [chunk for chunk in chunks if chunk.strip()]
+        return chunks
     
-    def _split_into_sentences(self, text: str) -> List[str]:
-        """Découpe le texte en phrases"""
-        import re
+    def _create_native_chunks(self, content: str) -> List[str]:
+        """
+        Découpe le contenu avec chonkie-core (limites de chunks en octets)
+        
+        Les coupures se font après les fins de phrases et de lignes ; un chunk
+        trop court est fusionné avec le suivant et chaque chunk reprend la fin
+        du précédent, comme le découpage Python.
+        """
+        data = content.encode('utf-8')
+        max_size = self.chunk_config['max_chunk_size']
+        min_size = self.chunk_config['min_chunk_size']
         
-        # Pattern pour détecter la fin des phrases
-        sentence_endings = re.compile(r'[.!?]+\s+')
-        sentences = sentence_endings.split(text)
+        # Place réservée au chevauchement et à un reste trop court fusionné
+        # (chacun suivi d'un espace) pour respecter max_chunk_size
+        target_size = max(1, max_size - self.chunk_config['overlap_size'] - min_size - 2)
         
-        # Nettoyer et filtrer
-        clean_sentences = []
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if len(sentence) > 10:  # Phrases minimales
-                clean_sentences.append(sentence)
+        chunks = []
+        pending = ""
+        previous = ""
+        position = 0
+        
+        for _, end in chonkie_core.chunk_offsets(data, size=target_size, delimiters="\n.!?"):
+            # Une coupure forcée ne doit pas tomber au milieu d'un caractère UTF-8
+            while end < len(data) and end > position and (data[end] & 0xC0) == 0x80:
+                end -= 1
+            text = data[position:end].decode('utf-8').strip()
+            position = end
+            
+            if pending:
+                text = f"{pending} {text}".strip()
+            if len(text) < min_size:
+                pending = text
+                continue
+            pending = ""
+            
+            chunks.append(f"{self._overlap_tail(previous)} {text}".strip() if previous else text)
+            previous = text
         
-        return clean_sentences
+        if len(pending) >= min_size:
+            chunks.append(pending)
+        
+        return chunks
+    
+    def _overlap_tail(self, text: str) -> str:
+        """
+        Fin d'un chunk reprise en tête du suivant pour le contexte
+        
+        Mots entiers tenant dans overlap_size caractères.
+        """
+        overlap_size = self.chunk_config['overlap_size']
+        if overlap_size <= 0:
+            return ""
+        if len(text) <= overlap_size:
+            return text
+        
+        space = text.find(' ', len(text) - overlap_size - 1)
+        return text[space + 1:] if space != -1 else ""
+    
+    def _split_into_sentences(self, text: str) -> List[str]:
+        """Découpe le texte en phrases (phrases de plus de 10 caractères)"""
+        return [
+            sentence for sentence in map(str.strip, _SENTENCE_PATTERN.split(text))
+            if len(sentence) > 10
+        ]
     
     # =======================================================================
     # PROCESSEURS PAR TYPE DE FICHIER
@@ -447,12 +907,10 @@ class DocumentProcessor:
             # Essai avec pdfplumber (meilleur pour la mise en forme)
             with pdfplumber.open(file_path) as pdf:
                 metadata['pages'] = len(pdf.pages)
-                
-                for i, page in enumerate(pdf.pages):
-                    page_text = page.extract_text()
-                    if page_text:
-                        content += f"\n\n--- Page {i+1} ---\n"
-                        content += page_text
+            
+            content = _join_page_texts(
+                _extract_page_texts(_pdfplumber_page_texts, file_path, metadata['pages'])
+            )
         
         except Exception as e:
             logger.warning(f"Erreur pdfplumber, essai PyPDF2: {e}")
@@ -468,12 +926,10 @@ class DocumentProcessor:
                     if pdf_reader.metadata:
                         metadata['title'] = str(pdf_reader.metadata.get('/Title', ''))
                         metadata['author'] = str(pdf_reader.metadata.get('/Author', ''))
-                    
-                    for i, page in enumerate(pdf_reader.pages):
-                        page_text = page.extract_text()
-                        if page_text:
-                            content += f"\n\n--- Page {i+1} ---\n"
-                            content += page_text
+                
+                content = _join_page_texts(
+                    _extract_page_texts(_pypdf2_page_texts, file_path, metadata['pages'])
+                )
             
             except Exception as e2:
                 raise Exception(f"Erreur extraction PDF: {e2}")
@@ -483,19 +939,13 @@ class DocumentProcessor:
     def _process_text(self, file_path: Path) -> Tuple[str, Dict]:
         """Traite un fichier texte (TXT, MD)"""
         try:
-            # Détection de l'encodage
-            encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-            content = ""
-            used_encoding = 'utf-8'
-            
-            for encoding in encodings:
-                try:
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        content = f.read()
-                    used_encoding = encoding
-                    break
-                except UnicodeDecodeError:
-                    continue
+            # Lecture unique ; l'encodage n'est détecté que si l'UTF-8 échoue
+            raw = file_path.read_bytes()
+            try:
+                content = raw.decode('utf-8')
+                used_encoding = 'utf-8'
+            except UnicodeDecodeError:
+                content, used_encoding = self._decode_text(raw)
             
             if not content:
                 raise Exception("Impossible de décoder le fichier texte")
@@ -512,6 +962,21 @@ class DocumentProcessor:
         except Exception as e:
             raise Exception(f"Erreur lecture fichier texte: {e}")
     
+    @staticmethod
+    def _decode_text(raw: bytes) -> Tuple[str, str]:
+        """
+        Décode un contenu non UTF-8 avec l'encodage détecté sur ses 64 premiers Ko
+        
+        Returns:
+            Tuple: (texte, encodage utilisé) ; latin-1 si la détection échoue
+        """
+        if CHARSET_NORMALIZER_AVAILABLE:
+            best = detect_encoding(raw[:_ENCODING_SAMPLE_BYTES]).best()
+            if best is not None:
+                return raw.decode(best.encoding, errors='replace'), best.encoding
+        
+        return raw.decode('latin-1'), 'latin-1'
+    
     def _process_docx(self, file_path: Path) -> Tuple[str, Dict]:
         """Traite un fichier Word (DOCX)"""
         if not DOCX_AVAILABLE:
@@ -566,6 +1031,10 @@ class DocumentProcessor:
     
     def _process_excel(self, file_path: Path) -> Tuple[str, Dict]:
         """Traite un fichier Excel"""
+        # Les .xlsx sont lus en flux ; les .xls (non gérés par openpyxl) via pandas
+        if EXCEL_AVAILABLE and file_path.suffix.lower() != '.xls':
+            return self._process_xlsx(file_path)
+        
         try:
             # Lecture avec pandas
             excel_data = pd.read_excel(file_path, sheet_name=None)  # Toutes les feuilles
@@ -595,22 +1064,87 @@ class DocumentProcessor:
                 content += "Colonnes: " + ", ".join(df.columns.astype(str)) + "\n\n"
                 
                 # Échantillon de données (premières lignes)
-                sample_size = min(10, len(df))
+                sample_size = min(self.excel_config['sample_rows'], len(df))
                 if sample_size > 0:
                     content += "Échantillon de données:\n"
-                    content += df.head(sample_size).to_string(index=False) + "\n"
+                    content += _frame_to_text(df.head(sample_size))
                 
                 # Statistiques descriptives pour les colonnes numériques
                 numeric_cols = df.select_dtypes(include=[np.number]).columns
                 if len(numeric_cols) > 0:
                     content += "\nStatistiques numériques:\n"
-                    content += df[numeric_cols].describe().to_string() + "\n"
+                    content += _frame_to_text(df[numeric_cols].describe(), index=True)
             
             return content.strip(), metadata
             
         except Exception as e:
             raise Exception(f"Erreur traitement Excel: {e}")
     
+    def _process_xlsx(self, file_path: Path) -> Tuple[str, Dict]:
+        """
+        Traite un classeur .xlsx en lecture seule (openpyxl, read_only)
+        
+        Seules la ligne d'en-tête et les premières lignes de chaque feuille
+        sont lues ; les dimensions viennent de la feuille elle-même. Les
+        statistiques numériques ne sont calculées que si excel_config le demande.
+        """
+        try:
+            workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        except Exception as e:
+            raise Exception(f"Erreur traitement Excel: {e}")
+        
+        try:
+            parts = []
+            metadata = {
+                'sheets': list(workbook.sheetnames),
+                'total_sheets': len(workbook.sheetnames),
+                'total_rows': 0,
+                'total_columns': 0
+            }
+            
+            for worksheet in workbook.worksheets:
+                rows_iter = worksheet.iter_rows(values_only=True)
+                header = next(rows_iter, None)
+                sample = list(islice(rows_iter, self.excel_config['sample_rows']))
+                if not header or not sample:
+                    continue
+                
+                # Dimensions déclarées (calculées en flux si absentes du fichier)
+                worksheet.calculate_dimension(force=True)
+                rows = worksheet.max_row - worksheet.min_row
+                cols = len(header)
+                metadata['total_rows'] += rows
+                metadata['total_columns'] = max(metadata['total_columns'], cols)
+                
+                columns = [
+                    f"Unnamed: {i}" if value is None else str(value)
+                    for i, value in enumerate(header)
+                ]
+                
+                parts.append(f"\n\n--- Feuille: {worksheet.title} ---\n")
+                parts.append(f"Dimensions: {rows} lignes × {cols} colonnes\n\n")
+                parts.append("Colonnes: " + ", ".join(columns) + "\n\n")
+                parts.append("Échantillon de données:\n")
+                parts.append(_frame_to_text(pd.DataFrame(sample, columns=columns)))
+                
+                # Statistiques numériques : relecture bornée de la feuille
+                if self.excel_config['numeric_stats']:
+                    df = pd.read_excel(
+                        file_path, sheet_name=worksheet.title,
+                        nrows=self.excel_config['stats_max_rows']
+                    )
+                    numeric_cols = df.select_dtypes(include=[np.number]).columns
+                    if len(numeric_cols) > 0:
+                        parts.append("\nStatistiques numériques:\n")
+                        parts.append(_frame_to_text(df[numeric_cols].describe(), index=True))
+            
+            return "".join(parts).strip(), metadata
+            
+        except Exception as e:
+            raise Exception(f"Erreur traitement Excel: {e}")
+        finally:
+            workbook.close()
+    
     def _process_csv(self, file_path: Path) -> Tuple[str, Dict]:
         """Traite un fichier CSV"""
         try:
@@ -638,11 +1172,14 @@ class DocumentProcessor:
             sample_size = min(20, len(df))
             if sample_size > 0:
                 content += f"\nÉchantillon ({sample_size} premières lignes):\n"
-                content += df.head(sample_size).to_string(index=False) + "\n"
+                content += _frame_to_text(df.head(sample_size))
             
             # Statistiques descriptives
             content += "\nStatistiques descriptives:\n"
-            content += df.describe(include='all').to_string() + "\n"
+            if rows < _DESCRIBE_ALL_MAX_ROWS:
+                content += _frame_to_text(df.describe(include='all'), index=True)
+            elif len(df.select_dtypes(include=[np.number]).columns) > 0:
+                content += _frame_to_text(df.describe(), index=True)
             
             metadata = {
                 'rows': rows,
@@ -659,46 +1196,40 @@ class DocumentProcessor:
             raise Exception(f"Erreur traitement CSV: {e}")
     
     def _process_json(self, file_path: Path) -> Tuple[str, Dict]:
-        """Traite un fichier JSON"""
+        """
+        Traite un fichier JSON
+        
+        Structure et profondeur sont calculées en une seule lecture en flux
+        (ijson), sans charger le document ; seul un extrait est inclus.
+        """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            content = f"Fichier JSON: {file_path.name}\n\n"
-            
-            # Analyse de la structure
-            def analyze_json_structure(obj, level=0):
-                indent = "  " * level
-                result = ""
-                
-                if isinstance(obj, dict):
-                    result += f"{indent}Objet ({len(obj)} clés):\n"
-                    for key, value in obj.items():
-                        result += f"{indent}  {key}: {type(value).__name__}\n"
-                        if level < 2:  # Limiter la profondeur
-                            result += analyze_json_structure(value, level + 1)
-                elif isinstance(obj, list):
-                    result += f"{indent}Liste ({len(obj)} éléments)\n"
-                    if obj and level < 2:
-                        result += f"{indent}  Type d'éléments: {type(obj[0]).__name__}\n"
-                        result += analyze_json_structure(obj[0], level + 1)
-                
-                return result
-            
-            content += "Structure:\n"
-            content += analyze_json_structure(data)
-            
-            # Contenu sérialisé (limité)
-            json_str = json.dumps(data, indent=2, ensure_ascii=False)
-            if len(json_str) > 5000:
-                json_str = json_str[:5000] + "\n... (contenu tronqué)"
+            if IJSON_AVAILABLE:
+                with open(file_path, 'rb') as f:
+                    root_type, root_node, depth = _scan_json_events(
+                        ijson.parse(f, use_float=True)
+                    )
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    root_type, root_node, depth = _scan_json_events(
+                        _iter_json_events(json.load(f))
+                    )
             
-            content += f"\nContenu:\n{json_str}"
+            # Extrait brut (limité) lu directement depuis le fichier
+            with open(file_path, 'r', encoding='utf-8') as f:
+                json_str = f.read(_JSON_SNIPPET_CHARS)
+                if f.read(1):
+                    json_str += "\n... (contenu tronqué)"
+            
+            content = (
+                f"Fichier JSON: {file_path.name}\n\n"
+                f"Structure:\n{_render_json_structure(root_node)}"
+                f"\nContenu:\n{json_str}"
+            )
             
             metadata = {
-                'json_type': type(data).__name__,
+                'json_type': root_type,
                 'size_chars': len(json_str),
-                'structure_depth': self._calculate_json_depth(data)
+                'structure_depth': depth
             }
             
             return content, metadata
@@ -706,17 +1237,6 @@ class DocumentProcessor:
         except Exception as e:
             raise Exception(f"Erreur traitement JSON: {e}")
     
-    def _calculate_json_depth(self, obj, current_depth=0):
-        """Calcule la profondeur d'un objet JSON"""
-        if isinstance(obj, dict):
-            return max([self._calculate_json_depth(value, current_depth + 1) 
-                       for value in obj.values()] + [current_depth])
-        elif isinstance(obj, list) and obj:
-            return max([self._calculate_json_depth(item, current_depth + 1) 
-                       for item in obj] + [current_depth])
-        else:
-            return current_depth
-    
     # =======================================================================
     # GESTION ET STATISTIQUES
     # =======================================================================
@@ -724,7 +1244,8 @@ class DocumentProcessor:
     def get_processing_stats(self) -> Dict:
         """Retourne les statistiques de traitement"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._db_lock:
+                conn = self._conn
                 # Documents traités
                 cursor = conn.execute("""
                     SELECT COUNT(*) as total,
@@ -771,7 +1292,8 @@ class DocumentProcessor:
     def list_processed_documents(self) -> List[Dict]:
         """Liste des documents traités"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._db_lock:
+                conn = self._conn
                 cursor = conn.execute("""
                     SELECT filename, file_type, processing_date, chunks_created, 
                            file_size, processing_status
@@ -801,12 +1323,12 @@ class DocumentProcessor:
         try:
             # TODO: Implémenter la suppression dans le RAG service
             # En attendant, marquer comme supprimé en base
-            with sqlite3.connect(self.db_path) as conn:
+            with self._db_lock:
+                conn = self._conn
                 conn.execute(
                     "UPDATE processed_documents SET processing_status = 'deleted' WHERE filename = ?",
                     (filename,)
                 )
-                conn.commit()
                 return True
                 
         except Exception as e:
@@ -816,10 +1338,16 @@ class DocumentProcessor:
     def clear_all_documents(self) -> bool:
         """Vide toute la base de documents"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("DELETE FROM document_chunks")
-                conn.execute("DELETE FROM processed_documents")
-                conn.commit()
+            with self._db_lock:
+                conn = self._conn
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.execute("DELETE FROM document_chunks")
+                    conn.execute("DELETE FROM processed_documents")
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
                 
             logger.info("🗑️ Base de documents vidée")
             return True
@@ -827,6 +1355,13 @@ class DocumentProcessor:
         except Exception as e:
             logger.error(f"Erreur vidage base: {e}")
             return False
+    
+    def close(self):
+        """Ferme la connexion persistante à la base des documents"""
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
 
 
 # ==============================================================================
@@ -119,87 +119,90 @@ class MapService:
             logger.error(f"Erreur création carte: {e}")
             return self._create_empty_map_data()
     
-    def create_consumption_heatmap_data(self, consumption_df: pd.DataFrame,
-                                      buildings_df: pd.DataFrame) -> Dict:
+    def precompute_heatmap_grid(self, consumption_df: pd.DataFrame,
+                                buildings_df: pd.DataFrame,
+                                bins: Tuple[int, int] = (256, 256)) -> Dict:
         """
-        Crée une heatmap de consommation
+        Agrège la consommation sur une grille lat/lng (une fois par jeu de données)
+        
+        Seules les cellules non vides sont conservées, sous forme de tableaux
+        numpy (centres des cellules, intensité normalisée, consommation).
         
         Args:
             consumption_df: Données de consommation
             buildings_df: Données des bâtiments
+            bins: Nombre de cellules (latitude, longitude)
             
         Returns:
-            Dict: Données heatmap
+            Dict: Grille heatmap, statistiques, centre et zoom
         """
+        empty_result = {'grid': None, 'statistics': {}}
+        
         try:
             if consumption_df is None or buildings_df is None:
-                return {'heatmap_points': [], 'statistics': {}}
-            
-            # Agrégation de la consommation par bâtiment
-            consumption_agg = consumption_df.groupby('unique_id')['y'].agg([
-                'sum', 'mean', 'max', 'count'
-            ]).reset_index()
-            
-            # Jointure avec les coordonnées des bâtiments
-            merged_data = buildings_df.merge(
-                consumption_agg, 
-                on='unique_id', 
-                how='inner'
+                return empty_result
+            
+            # Consommation par bâtiment, alignée sur les coordonnées valides
+            consumption_agg = consumption_df.groupby('unique_id', observed=True)['y'].agg(['sum', 'mean'])
+            valid_buildings = self._filter_valid_coordinates(
+                buildings_df[['unique_id', 'latitude', 'longitude']]
             )
+            consumption_agg = consumption_agg.reindex(valid_buildings['unique_id'].to_numpy())
+            has_consumption = consumption_agg['sum'].notna().to_numpy()
             
-            # Filtrage des coordonnées valides
-            valid_data = self._filter_valid_coordinates(merged_data)
+            if not has_consumption.any():
+                return empty_result
             
-            if valid_data.empty:
-                return {'heatmap_points': [], 'statistics': {}}
+            lats = valid_buildings['latitude'].to_numpy(dtype=np.float64)[has_consumption]
+            lngs = valid_buildings['longitude'].to_numpy(dtype=np.float64)[has_consumption]
+            sums = consumption_agg['sum'].to_numpy(dtype=np.float64)[has_consumption]
+            means = consumption_agg['mean'].to_numpy(dtype=np.float64)[has_consumption]
             
-            # Normalisation de l'intensité (0-1)
-            max_consumption = valid_data['sum'].max()
-            min_consumption = valid_data['sum'].min()
+            # Binning pondéré par la consommation
+            grid, lat_edges, lng_edges = np.histogram2d(lats, lngs, bins=bins, weights=sums)
+            rows, cols = np.nonzero(grid)
+            values = grid[rows, cols]
+            max_value = values.max() if len(values) else 0.0
+            
+            lat_centers = (lat_edges[:-1] + lat_edges[1:]) / 2
+            lng_centers = (lng_edges[:-1] + lng_edges[1:]) / 2
             
-            if max_consumption > min_consumption:
-                valid_data['intensity'] = (
-                    (valid_data['sum'] - min_consumption) / 
-                    (max_consumption - min_consumption)
-                )
-            else:
-                valid_data['intensity'] = 0.5
-            
-            # Création des points heatmap
-            heatmap_points = []
-            for _, row in valid_data.iterrows():
-                heatmap_points.append({
-                    'lat': float(row['latitude']),
-                    'lng': float(row['longitude']),
-                    'intensity': float(row['intensity']),
-                    'consumption_sum': float(row['sum']),
-                    'consumption_avg': float(row['mean']),
-                    'building_id': row['unique_id'],
-                    'building_type': row.get('building_type', 'unknown')
-                })
-            
-            # Statistiques
             statistics = {
-                'total_points': len(heatmap_points),
-                'max_consumption': float(max_consumption),
-                'min_consumption': float(min_consumption),
-                'avg_consumption': float(valid_data['mean'].mean()),
-                'total_consumption': float(valid_data['sum'].sum()),
-                'consumption_range': float(max_consumption - min_consumption)
+                'total_points': int(len(sums)),
+                'grid_cells': int(len(values)),
+                'max_consumption': float(sums.max()),
+                'min_consumption': float(sums.min()),
+                'avg_consumption': float(means.mean()),
+                'total_consumption': float(sums.sum()),
+                'consumption_range': float(sums.max() - sums.min())
             }
             
-            logger.info(f"✅ Heatmap créée: {len(heatmap_points)} points")
+            center_lat, center_lng = float(lats.mean()), float(lngs.mean())
+            
+            logger.info(f"✅ Grille heatmap précalculée: {len(values)} cellules")
             
             return {
-                'heatmap_points': heatmap_points,
+                'grid': {
+                    'lat': lat_centers[rows].astype(np.float32),
+                    'lng': lng_centers[cols].astype(np.float32),
+                    'intensity': (values / max_value if max_value > 0 else values).astype(np.float32),
+                    'consumption': values.astype(np.float32),
+                    'shape': list(grid.shape),
+                    'bounds': {
+                        'north': float(lat_edges[-1]),
+                        'south': float(lat_edges[0]),
+                        'east': float(lng_edges[-1]),
+                        'west': float(lng_edges[0])
+                    }
+                },
                 'statistics': statistics,
-                'center': self._calculate_optimal_view(valid_data)[0],
+                'center': [center_lat, center_lng],
                 'zoom': 7
             }
             
         except Exception as e:
-            logger.error(f"Erreur création heatmap: {e}")
-            return {'heatmap_points': [], 'statistics': {}}
+            logger.error(f"Erreur précalcul grille heatmap: {e}")
+            return empty_result
     
     def create_zone_analysis_data(self, buildings_df: pd.DataFrame) -> Dict:
         """
@@ -219,33 +222,44 @@ class MapService:
             if 'zone_name' not in buildings_df.columns:
                 return {'zones': [], 'statistics': {}}
             
-            zone_analysis = buildings_df.groupby('zone_name').agg({
-                'latitude': ['mean', 'count'],
-                'longitude': 'mean',
-                'surface_area_m2': ['sum', 'mean'],
-                'building_type': lambda x: x.value_counts().to_dict()
-            }).round(4)
-            
-            zones_data = []
-            for zone_name in zone_analysis.index:
-                zone_stats = zone_analysis.loc[zone_name]
-                
-                zone_info = {
+            # Surfaces agrégées en float64 (sommes exactes, arrondi effectif)
+            zone_analysis = buildings_df.astype({'surface_area_m2': np.float64}).groupby(
+                'zone_name', observed=True
+            ).agg(
+                center_lat=('latitude', 'mean'),
+                center_lng=('longitude', 'mean'),
+                building_count=('latitude', 'count'),
+                total_surface=('surface_area_m2', 'sum'),
+                avg_surface=('surface_area_m2', 'mean')
+            ).round(4)
+            
+            # Répartition des types par zone (colonne catégorielle)
+            types_by_zone = {}
+            if 'building_type' in buildings_df.columns:
+                type_counts = buildings_df.groupby(['zone_name', 'building_type'], observed=True).size()
+                for (zone, building_type), count in type_counts.items():
+                    types_by_zone.setdefault(zone, {})[building_type] = int(count)
+            
+            # Construction des zones à partir des colonnes agrégées
+            zones_data = [
+                {
                     'name': zone_name,
-                    'center': [
-                        float(zone_stats[('latitude', 'mean')]),
-                        float(zone_stats[('longitude', 'mean')])
-                    ],
-                    'building_count': int(zone_stats[('latitude', 'count')]),
-                    'total_surface': float(zone_stats[('surface_area_m2', 'sum')]),
-                    'avg_surface': float(zone_stats[('surface_area_m2', 'mean')]),
-                    'building_types': zone_stats[('building_type', '<lambda>')],
-                    'density_level': self._calculate_zone_density_level(
-                        int(zone_stats[('latitude', 'count')])
-                    )
+                    'center': [center_lat, center_lng],
+                    'building_count': building_count,
+                    'total_surface': total_surface,
+                    'avg_surface': avg_surface,
+                    'building_types': types_by_zone.get(zone_name, {}),
+                    'density_level': self._calculate_zone_density_level(building_count)
                 }
-                
-                zones_data.append(zone_info)
+                for zone_name, center_lat, center_lng, building_count, total_surface, avg_surface in zip(
+                    zone_analysis.index.tolist(),
+                    zone_analysis['center_lat'].tolist(),
+                    zone_analysis['center_lng'].tolist(),
+                    zone_analysis['building_count'].astype(int).tolist(),
+                    zone_analysis['total_surface'].astype(float).tolist(),
+                    zone_analysis['avg_surface'].astype(float).tolist()
+                )
+            ]
             
             # Tri par nombre de bâtiments
             zones_data.sort(key=lambda x: x['building_count'], reverse=True)
@@ -418,36 +432,29 @@ class MapService:
         lat_min, lat_max = buildings_df['latitude'].min(), buildings_df['latitude'].max()
         lng_min, lng_max = buildings_df['longitude'].min(), buildings_df['longitude'].max()
         
-        # Création d'une grille 10x10
-        lat_step = (lat_max - lat_min) / 10
-        lng_step = (lng_max - lng_min) / 10
+        if lat_max == lat_min or lng_max == lng_min:
+            return []
+        
+        # Création d'une grille 10x10 : comptage en une passe (histogramme 2D)
+        counts, lat_edges, lng_edges = np.histogram2d(
+            buildings_df['latitude'].to_numpy(dtype=np.float64),
+            buildings_df['longitude'].to_numpy(dtype=np.float64),
+            bins=10,
+            range=[[lat_min, lat_max], [lng_min, lng_max]]
+        )
         
         density_zones = []
         
-        for i in range(10):
-            for j in range(10):
-                lat_start = lat_min + i * lat_step
-                lat_end = lat_min + (i + 1) * lat_step
-                lng_start = lng_min + j * lng_step
-                lng_end = lng_min + (j + 1) * lng_step
-                
-                # Compter les bâtiments dans cette zone
-                in_zone = buildings_df[
-                    (buildings_df['latitude'] >= lat_start) &
-                    (buildings_df['latitude'] < lat_end) &
-                    (buildings_df['longitude'] >= lng_start) &
-                    (buildings_df['longitude'] < lng_end)
-                ]
-                
-                if len(in_zone) > 0:
-                    density_zones.append({
-                        'bounds': [
-                            [lat_start, lng_start],
-                            [lat_end, lng_end]
-                        ],
-                        'count': len(in_zone),
-                        'density_level': self._get_density_level(len(in_zone))
-                    })
+        for i, j in zip(*np.nonzero(counts)):
+            count = int(counts[i, j])
+            density_zones.append({
+                'bounds': [
+                    [float(lat_edges[i]), float(lng_edges[j])],
+                    [float(lat_edges[i + 1]), float(lng_edges[j + 1])]
+                ],
+                'count': count,
+                'density_level': self._get_density_level(count)
+            })
         
         return density_zones
     
@@ -541,27 +548,28 @@ class MapService:
 # UTILITAIRES CARTOGRAPHIQUES
 # ==============================================================================
 
-def calculate_distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+def calculate_distance_km(lat1, lon1, lat2, lon2):
     """
-    Calcule la distance entre deux points géographiques (formule haversine)
+    Calcule la distance entre points géographiques (formule haversine)
+    
+    Accepte des scalaires ou des tableaux numpy (calcul vectorisé avec
+    broadcasting, ex : N bâtiments contre M centres de zones).
     
     Args:
         lat1, lon1: Coordonnées du premier point
         lat2, lon2: Coordonnées du second point
         
     Returns:
-        float: Distance en kilomètres
+        float ou np.ndarray: Distance en kilomètres
     """
-    from math import radians, cos, sin, asin, sqrt
-    
     # Conversion en radians
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+    lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
     
     # Formule haversine
     dlat = lat2 - lat1
     dlon = lon2 - lon1
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * asin(sqrt(a))
+    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
+    c = 2 * np.arcsin(np.sqrt(a))
     
     # Rayon de la Terre en km
     r = 6371
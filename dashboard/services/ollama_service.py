@@ -12,11 +12,32 @@ Version: 1.0.0
 
 import json
 import logging
+import os
 import requests
 import time
 from typing import Dict, List, Optional, Any, Generator
 from datetime import datetime
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Décodage des réponses Ollama (bytes acceptés par les deux implémentations)
+json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+
+def summary_dumps(obj: Any) -> str:
+    """Sérialise le résumé des données inséré dans les prompts (JSON indenté, UTF-8)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            obj,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ).decode('utf-8')
+    return json.dumps(obj, indent=2, ensure_ascii=False, default=str)
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,27 +56,16 @@ class OllamaService:
         self.session = requests.Session()
         self.session.timeout = 120
         
-        self._check_ollama_availability()
+        # Modèle gardé en mémoire entre les requêtes et fenêtre de contexte
+        # fixe : un num_ctx variable forcerait un rechargement du modèle et
+        # invaliderait le cache du préfixe commun des prompts
+        self.keep_alive = os.getenv('OLLAMA_KEEP_ALIVE', '10m')
+        self.num_ctx = int(os.getenv('OLLAMA_NUM_CTX', 4096))
+        
+        # La disponibilité d'Ollama est vérifiée en tâche de fond par
+        # l'application (health_check) pour ne pas retarder le démarrage
         logger.info("✅ OllamaService initialisé")
     
-    def _check_ollama_availability(self):
-        """Vérifie la disponibilité d'Ollama"""
-        try:
-            response = self.session.get(f"{self.base_url}/api/tags")
-            if response.status_code == 200:
-                models = response.json().get('models', [])
-                model_names = [m['name'] for m in models]
-                
-                if self.model in model_names:
-                    logger.info(f"✅ Modèle {self.model} disponible")
-                else:
-                    logger.warning(f"⚠️ Modèle {self.model} non trouvé")
-                    logger.info(f"Modèles disponibles: {model_names}")
-            else:
-                logger.error("❌ Ollama non accessible")
-        except Exception as e:
-            logger.error(f"❌ Erreur connexion Ollama: {e}")
-    
     def analyze_data(
         self, 
         question: str, 
@@ -143,8 +153,22 @@ class OllamaService:
         """Construit un prompt intelligent pour l'analyse"""
         
         # Template de prompt spécialisé pour l'analyse énergétique
+        # Partie stable (persona, contexte RAG, consignes) en tête : des appels
+        # successifs avec le même contexte RAG partagent ce préfixe, dont le
+        # cache KV est réutilisé par le serveur Ollama
         prompt_template = """Tu es un expert en analyse de données énergétiques pour la Malaisie.
 
+CONTEXTE RAG PERTINENT:
+{rag_context}
+
+INSTRUCTIONS:
+1. Analyse les données de manière précise et factuelle
+2. Utilise le contexte RAG pour enrichir ta réponse
+3. Fournis des insights actionnables
+4. Inclus des métriques spécifiques quand possible
+5. Suggère des visualisations pertinentes
+6. Format ta réponse en sections claires
+
 CONTEXTE DES DONNÉES:
 - Dataset: Consommation électrique et métadonnées de bâtiments Malaysia
 - Période: {period}
@@ -155,20 +179,9 @@ CONTEXTE DES DONNÉES:
 RÉSUMÉ STATISTIQUE:
 {data_summary}
 
-CONTEXTE RAG PERTINENT:
-{rag_context}
-
 QUESTION DE L'UTILISATEUR:
 {question}
 
-INSTRUCTIONS:
-1. Analyse les données de manière précise et factuelle
-2. Utilise le contexte RAG pour enrichir ta réponse
-3. Fournis des insights actionnables
-4. Inclus des métriques spécifiques quand possible
-5. Suggère des visualisations pertinentes
-6. Format ta réponse en sections claires
-
 RÉPONSE STRUCTURÉE:"""
 
         # Extraction des informations clés
@@ -183,7 +196,7 @@ RÉPONSE STRUCTURÉE:"""
         ]) if context else "Aucun contexte spécifique trouvé"
         
         # Formatage du résumé
-        summary_text = json.dumps(data_summary, indent=2, ensure_ascii=False)
+        summary_text = summary_dumps(data_summary)
         
         return prompt_template.format(
             period=period,
@@ -202,7 +215,9 @@ RÉPONSE STRUCTURÉE:"""
                 "model": self.model,
                 "prompt": prompt,
                 "stream": False,
+                "keep_alive": self.keep_alive,
                 "options": {
+                    "num_ctx": self.num_ctx,
                     "temperature": 0.1,  # Réponses plus factuelles
                     "top_p": 0.9,
                     "top_k": 40,
@@ -216,7 +231,7 @@ RÉPONSE STRUCTURÉE:"""
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = json_loads(response.content)
                 return result.get('response', '')
             else:
                 raise Exception(f"Erreur Ollama: {response.status_code}")
@@ -232,7 +247,9 @@ RÉPONSE STRUCTURÉE:"""
                 "model": self.model,
                 "prompt": prompt,
                 "stream": True,
+                "keep_alive": self.keep_alive,
                 "options": {
+                    "num_ctx": self.num_ctx,
                     "temperature": 0.1,
                     "top_p": 0.9,
                     "top_k": 40
@@ -248,7 +265,7 @@ RÉPONSE STRUCTURÉE:"""
             for line in response.iter_lines():
                 if line:
                     try:
-                        chunk = json.loads(line.decode('utf-8'))
+                        chunk = json_loads(line)
                         if 'response' in chunk:
                             yield chunk['response']
                         if chunk.get('done', False):
@@ -401,11 +418,11 @@ Pour une analyse complète, vérifiez la connexion à Ollama.
         except Exception as e:
             return {"error": str(e)}
     
-    def health_check(self) -> Dict:
+    def health_check(self, timeout: Optional[float] = None) -> Dict:
         """Vérification de santé du service"""
         try:
             start_time = time.time()
-            response = self.session.get(f"{self.base_url}/api/tags")
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=timeout)
             response_time = time.time() - start_time
             
             if response.status_code == 200:
@@ -63,6 +63,9 @@ class RAGService:
         self.text_corpus = []
         self.knowledge_items = []
         
+        # Incrémenté à chaque modification de la base (invalidation des caches clients)
+        self.version = 0
+        
         self._init_database()
         self._load_existing_knowledge()
         
@@ -301,6 +304,7 @@ class RAGService:
                 'content': content,
                 'metadata': metadata
             })
+            self.version += 1
             
         except Exception as e:
             logger.error(f"Erreur ajout knowledge item: {e}")
@@ -401,7 +405,7 @@ class RAGService:
         summaries = []
         
         try:
-            type_stats = buildings_df.groupby('building_type').agg({
+            type_stats = buildings_df.groupby('building_type', observed=True).agg({
                 'surface_area_m2': ['count', 'mean', 'sum'],
                 'latitude': 'count'
             }).round(2)
@@ -440,20 +444,16 @@ Représente {count/len(buildings_df)*100:.1f}% du total des bâtiments"""
         
         try:
             if 'zone_name' in buildings_df.columns:
-                zone_stats = buildings_df.groupby('zone_name').agg({
-                    'building_type': lambda x: x.value_counts().to_dict(),
-                    'surface_area_m2': ['count', 'mean', 'sum'],
-                    'latitude': ['mean'],
-                    'longitude': ['mean']
-                })
+                # La répartition des types n'est pas utilisée dans le résumé :
+                # agrégations numériques uniquement (chemin cython, sans lambda)
+                zone_stats = buildings_df.groupby('zone_name', observed=True).agg(
+                    count=('surface_area_m2', 'count'),
+                    avg_surface=('surface_area_m2', 'mean'),
+                    center_lat=('latitude', 'mean'),
+                    center_lon=('longitude', 'mean')
+                )
                 
-                for zone in zone_stats.index:
-                    stats = zone_stats.loc[zone]
-                    count = stats[('surface_area_m2', 'count')]
-                    avg_surface = stats[('surface_area_m2', 'mean')]
-                    center_lat = stats[('latitude', 'mean')]
-                    center_lon = stats[('longitude', 'mean')]
-                    
+                for zone, count, avg_surface, center_lat, center_lon in zone_stats.itertuples(name=None):
                     content = f"""Zone géographique: {zone}
 Nombre de bâtiments: {count}
 Surface moyenne: {avg_surface:.1f} m²
@@ -483,12 +483,10 @@ Densité de bâtiments dans cette zone de Malaysia"""
         try:
             if 'timestamp' in consumption_df.columns and 'y' in consumption_df.columns:
                 # Conversion timestamp
-                consumption_df['datetime'] = pd.to_datetime(consumption_df['timestamp'])
-                consumption_df['hour'] = consumption_df['datetime'].dt.hour
-                consumption_df['day_of_week'] = consumption_df['datetime'].dt.day_name()
+                hours = pd.to_datetime(consumption_df['timestamp']).dt.hour
                 
                 # Patterns horaires
-                hourly_avg = consumption_df.groupby('hour')['y'].mean()
+                hourly_avg = consumption_df.groupby(hours)['y'].mean()
                 peak_hour = hourly_avg.idxmax()
                 min_hour = hourly_avg.idxmin()
                 
@@ -699,6 +697,7 @@ Consommation minimale: {water_df['y'].min():.2f} L"""
             self.knowledge_items = []
             self.text_corpus = []
             self.embeddings_cache = {}
+            self.version += 1
             
             logger.info("✅ Base de connaissances vidée")
             
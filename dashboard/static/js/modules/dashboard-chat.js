@@ -262,12 +262,58 @@ const DashboardChat = {
         input.value = '';
 
         if (Dashboard.state.isConnected && Dashboard.state.socket) {
+            this.bindSocketEvents();
             Dashboard.state.socket.emit('request_analysis', { question: question });
         } else {
             this.addMessage('assistant', 'Connexion WebSocket non disponible. Vérifiez la connexion au serveur.');
         }
     },
 
+    /**
+     * Abonnement aux événements d'analyse en streaming
+     */
+    bindSocketEvents() {
+        const socket = Dashboard.state.socket;
+        if (!socket || this.socketBound) return;
+        this.socketBound = true;
+
+        socket.on('analysis_started', () => {
+            this.streamingMessage = null;
+            this.addMessage('assistant', '🤔 Analyse en cours...', true);
+        });
+
+        socket.on('analysis_token', (data) => this.appendStreamToken(data.text));
+
+        socket.on('analysis_complete', () => {
+            this.removeThinkingMessages();
+            this.streamingMessage = null;
+        });
+
+        socket.on('analysis_error', (data) => {
+            this.removeThinkingMessages();
+            this.streamingMessage = null;
+            this.addMessage('assistant', `❌ Erreur analyse: ${data.error}`);
+        });
+    },
+
+    /**
+     * Ajout d'un token à la réponse en cours de génération
+     */
+    appendStreamToken(text) {
+        const messagesContainer = document.getElementById('chat-messages');
+
+        if (!this.streamingMessage) {
+            this.removeThinkingMessages();
+            this.addMessage('assistant', '');
+            const lastMessage = messagesContainer.lastElementChild;
+            this.streamingMessage = lastMessage.querySelector('.mt-1');
+            this.streamingMessage.style.whiteSpace = 'pre-wrap';
+        }
+
+        this.streamingMessage.textContent += text;
+        messagesContainer.scrollTop = messagesContainer.scrollHeight;
+    },
+
     /**
      * Question suggérée
      */
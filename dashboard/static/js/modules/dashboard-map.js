@@ -270,7 +270,7 @@ const DashboardMaps = {
             const typeFilter = document.getElementById('map-type-filter')?.value || 'all';
 
             const response = await fetch(`/api/map/buildings?density=${density}&type=${typeFilter}`);
-            const result = await response.json();
+            const result = this.unpackTypedArrays(await response.json());
 
             if (result.success) {
                 this.renderBuildingsOnMap(result.map_data);
@@ -280,6 +280,35 @@ const DashboardMaps = {
         }
     },
 
+    /**
+     * Décodage des tableaux typés base64 ({dtype, bdata}) envoyés par l'API
+     */
+    unpackTypedArrays(value) {
+        const arrayTypes = {
+            f8: Float64Array, f4: Float32Array,
+            i4: Int32Array, i2: Int16Array, i1: Int8Array,
+            u4: Uint32Array, u2: Uint16Array, u1: Uint8Array, b1: Uint8Array
+        };
+
+        if (Array.isArray(value)) {
+            return value.map(item => this.unpackTypedArrays(item));
+        }
+        if (value && typeof value === 'object') {
+            if (typeof value.bdata === 'string' && arrayTypes[value.dtype]) {
+                const binary = atob(value.bdata);
+                const bytes = new Uint8Array(binary.length);
+                for (let i = 0; i < binary.length; i++) {
+                    bytes[i] = binary.charCodeAt(i);
+                }
+                return new arrayTypes[value.dtype](bytes.buffer);
+            }
+            Object.keys(value).forEach(key => {
+                value[key] = this.unpackTypedArrays(value[key]);
+            });
+        }
+        return value;
+    },
+
     /**
      * Rendu des bâtiments sur la carte
      */
@@ -324,7 +353,7 @@ const DashboardMaps = {
             Dashboard.showToast('🌡️ Chargement de la heatmap...', 'info');
             
             const response = await fetch('/api/map/consumption-heatmap');
-            const result = await response.json();
+            const result = this.unpackTypedArrays(await response.json());
 
             if (result.success) {
                 this.renderConsumptionHeatmap(result.heatmap_data);
@@ -338,7 +367,16 @@ const DashboardMaps = {
      * Rendu de la heatmap de consommation
      */
     renderConsumptionHeatmap(heatmapData) {
-        if (!Dashboard.state.map || !heatmapData.heatmap_points) return;
+        if (!Dashboard.state.map) return;
+
+        // Points de la heatmap : centres des cellules de la grille précalculée
+        const heatPoints = [];
+        if (heatmapData.grid) {
+            const grid = heatmapData.grid;
+            for (let i = 0; i < grid.intensity.length; i++) {
+                heatPoints.push([grid.lat[i], grid.lng[i], grid.intensity[i]]);
+            }
+        }
 
         // Clear existing layers
         Dashboard.state.map.eachLayer(layer => {
@@ -347,14 +385,7 @@ const DashboardMaps = {
             }
         });
 
-        if (heatmapData.heatmap_points.length > 0) {
-            // Prepare heatmap data
-            const heatPoints = heatmapData.heatmap_points.map(point => [
-                point.lat,
-                point.lng,
-                point.intensity
-            ]);
-
+        if (heatPoints.length > 0) {
             // Create heat layer
             const heatLayer = L.heatLayer(heatPoints, {
                 radius: 25,
@@ -376,7 +407,7 @@ const DashboardMaps = {
                 Dashboard.state.map.setView(heatmapData.center, heatmapData.zoom || 7);
             }
 
-            console.log(`✅ Heatmap avec ${heatmapData.heatmap_points.length} points`);
+            console.log(`✅ Heatmap avec ${heatPoints.length} points`);
         }
     },
 
@@ -390,8 +421,8 @@ const DashboardMaps = {
                 fetch('/api/map/zones')
             ]);
 
-            const statsResult = await statsResponse.json();
-            const zonesResult = await zonesResponse.json();
+            const statsResult = this.unpackTypedArrays(await statsResponse.json());
+            const zonesResult = this.unpackTypedArrays(await zonesResponse.json());
 
             if (statsResult.success) {
                 this.updateMapStatsDisplay(statsResult.statistics);
@@ -15,10 +15,23 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
 from plotly.utils import PlotlyJSONEncoder
 from typing import Dict, List, Optional, Any
 import json
 
+from dashboard.utils.downsample import lttb_indices
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Moteur de sérialisation Plotly : orjson évite le parcours Python de PlotlyJSONEncoder
+PLOTLY_JSON_ENGINE = 'orjson' if ORJSON_AVAILABLE else 'json'
+pio.json.config.default_engine = PLOTLY_JSON_ENGINE
+
 logger = logging.getLogger(__name__)
 
 
@@ -74,6 +87,12 @@ class ChartGenerator:
             }
         }
         
+        # Nombre maximum de points par trace temporelle (sous-échantillonnage LTTB)
+        self.max_trace_points = 2000
+        
+        # Template Plotly par défaut, extrait une fois pour les figures brutes
+        self._plotly_template = json.loads(go.Figure().to_json())['layout'].get('template', {})
+        
         logger.info("✅ ChartGenerator initialisé")
     
     def create_overview_charts(self, data: Dict) -> Dict:
@@ -114,7 +133,7 @@ class ChartGenerator:
             return {}
     
     def create_consumption_charts(self, data: Dict, time_range: str = '7d', 
-                                building_type: str = 'all') -> Dict:
+                                building_type: str = 'all', raw: bool = False) -> Dict:
         """
         Crée les graphiques de consommation détaillés
         
@@ -122,6 +141,7 @@ class ChartGenerator:
             data: Données
             time_range: Période (7d, 30d, 90d)
             building_type: Type de bâtiment
+            raw: Envoie toutes les valeurs sans sous-échantillonnage
             
         Returns:
             Dict: Graphiques de consommation
@@ -148,7 +168,7 @@ class ChartGenerator:
             
             # Graphique détaillé de consommation
             charts['detailed_consumption'] = self._create_detailed_consumption_chart(
-                filtered_consumption
+                filtered_consumption, downsample=not raw
             )
             
             # Patterns horaires
@@ -173,36 +193,35 @@ class ChartGenerator:
             if 'timestamp' not in consumption_df.columns or 'y' not in consumption_df.columns:
                 return self._create_empty_chart("Timeline de Consommation")
             
-            # Agrégation par heure
-            consumption_df['timestamp'] = pd.to_datetime(consumption_df['timestamp'])
+            # Agrégation par heure (sans modifier le DataFrame partagé)
+            timestamps = pd.to_datetime(consumption_df['timestamp'])
             hourly_data = consumption_df.groupby(
-                consumption_df['timestamp'].dt.floor('h')
+                timestamps.dt.floor('h')
             )['y'].sum().reset_index()
+            hourly_data = self._downsample_series(hourly_data, 'y')
             
             # Création du graphique
-            fig = go.Figure()
-            
-            fig.add_trace(go.Scatter(
-                x=hourly_data['timestamp'],
-                y=hourly_data['y'],
-                mode='lines',
-                name='Consommation Totale',
-                line=dict(color=self.color_palette['primary'], width=2),
-                fill='tonexty' if len(hourly_data) > 1 else None,
-                fillcolor=f"rgba(37, 99, 235, 0.1)"
-            ))
+            trace = {
+                'type': 'scatter',
+                'x': self._trace_values(hourly_data['timestamp']),
+                'y': self._trace_values(hourly_data['y']),
+                'mode': 'lines',
+                'name': 'Consommation Totale',
+                'line': {'color': self.color_palette['primary'], 'width': 2},
+                'fillcolor': "rgba(37, 99, 235, 0.1)"
+            }
+            if len(hourly_data) > 1:
+                trace['fill'] = 'tonexty'
             
             # Mise en forme
-            fig.update_layout(
-                title='Évolution de la Consommation Électrique',
-                xaxis_title='Temps',
-                yaxis_title='Consommation (kWh)',
-                hovermode='x unified',
-                **self.dark_template['layout']
+            return self._raw_figure(
+                [trace],
+                title={'text': 'Évolution de la Consommation Électrique'},
+                xaxis=self._axis_layout('xaxis', 'Temps'),
+                yaxis=self._axis_layout('yaxis', 'Consommation (kWh)'),
+                hovermode='x unified'
             )
             
-            return json.loads(fig.to_json())
-            
         except Exception as e:
             logger.error(f"Erreur timeline consommation: {e}")
             return self._create_empty_chart("Timeline de Consommation")
@@ -215,6 +234,7 @@ class ChartGenerator:
             
             # Comptage par type
             type_counts = buildings_df['building_type'].value_counts()
+            type_counts = type_counts[type_counts > 0]
             
             # Couleurs pour chaque type
             colors = [
@@ -223,50 +243,55 @@ class ChartGenerator:
             ]
             
             # Création du graphique en secteurs
-            fig = go.Figure(data=[go.Pie(
-                labels=[btype.replace('_', ' ').title() for btype in type_counts.index],
-                values=type_counts.values,
-                hole=0.4,
-                marker=dict(colors=colors),
-                textinfo='label+percent',
-                textposition='inside',
-                hovertemplate='<b>%{label}</b><br>Bâtiments: %{value}<br>Pourcentage: %{percent}<extra></extra>'
-            )])
+            trace = {
+                'type': 'pie',
+                'labels': [btype.replace('_', ' ').title() for btype in type_counts.index],
+                'values': self._trace_values(type_counts.values),
+                'hole': 0.4,
+                'marker': {'colors': colors},
+                'textinfo': 'label+percent',
+                'textposition': 'inside',
+                'hovertemplate': '<b>%{label}</b><br>Bâtiments: %{value}<br>Pourcentage: %{percent}<extra></extra>'
+            }
             
-            fig.update_layout(
-                title='Répartition par Type de Bâtiment',
+            return self._raw_figure(
+                [trace],
+                title={'text': 'Répartition par Type de Bâtiment'},
                 showlegend=True,
-                legend=dict(
-                    orientation="v",
-                    yanchor="middle",
-                    y=0.5,
-                    xanchor="left",
-                    x=1.01
-                ),
-                **self.dark_template['layout']
+                legend={
+                    'orientation': "v",
+                    'yanchor': "middle",
+                    'y': 0.5,
+                    'xanchor': "left",
+                    'x': 1.01
+                }
             )
             
-            return json.loads(fig.to_json())
-            
         except Exception as e:
             logger.error(f"Erreur graphique types bâtiments: {e}")
             return self._create_empty_chart("Types de Bâtiments")
     
-    def _create_detailed_consumption_chart(self, consumption_df: pd.DataFrame) -> Dict:
+    def _create_detailed_consumption_chart(self, consumption_df: pd.DataFrame,
+                                           downsample: bool = True) -> Dict:
         """Graphique détaillé de consommation avec moyennes mobiles"""
         try:
             if consumption_df.empty or 'timestamp' not in consumption_df.columns:
                 return self._create_empty_chart("Consommation Détaillée")
             
             # Préparation des données
-            consumption_df['timestamp'] = pd.to_datetime(consumption_df['timestamp'])
+            timestamps = pd.to_datetime(consumption_df['timestamp'])
             hourly_data = consumption_df.groupby(
-                consumption_df['timestamp'].dt.floor('h')
+                timestamps.dt.floor('h')
             )['y'].agg(['sum', 'mean', 'count']).reset_index()
             
             # Moyennes mobiles
             hourly_data['ma_24h'] = hourly_data['sum'].rolling(window=24, center=True).mean()
             hourly_data['ma_7d'] = hourly_data['sum'].rolling(window=168, center=True).mean()  # 7*24h
+            has_weekly_average = len(hourly_data) > 168
+            
+            # Réduction après le calcul des moyennes pour ne pas les fausser
+            if downsample:
+                hourly_data = self._downsample_series(hourly_data, 'sum')
             
             fig = go.Figure()
             
@@ -290,7 +315,7 @@ class ChartGenerator:
             ))
             
             # Moyenne mobile 7j
-            if len(hourly_data) > 168:
+            if has_weekly_average:
                 fig.add_trace(go.Scatter(
                     x=hourly_data['timestamp'],
                     y=hourly_data['ma_7d'],
@@ -307,7 +332,7 @@ class ChartGenerator:
                 **self.dark_template['layout']
             )
             
-            return json.loads(fig.to_json())
+            return self._figure_to_dict(fig)
             
         except Exception as e:
             logger.error(f"Erreur graphique consommation détaillée: {e}")
@@ -320,13 +345,11 @@ class ChartGenerator:
                 return self._create_empty_chart("Patterns Horaires")
             
             # Extraction de l'heure
-            consumption_df['timestamp'] = pd.to_datetime(consumption_df['timestamp'])
-            consumption_df['hour'] = consumption_df['timestamp'].dt.hour
-            consumption_df['day_of_week'] = consumption_df['timestamp'].dt.day_name()
+            hours = pd.to_datetime(consumption_df['timestamp']).dt.hour.rename('hour')
             
             # Agrégation par heure
-            hourly_avg = consumption_df.groupby('hour')['y'].mean()
-            hourly_std = consumption_df.groupby('hour')['y'].std()
+            hourly_avg = consumption_df.groupby(hours)['y'].mean()
+            hourly_std = consumption_df.groupby(hours)['y'].std()
             
             fig = go.Figure()
             
@@ -367,7 +390,7 @@ class ChartGenerator:
                 ticktext=[f"{h}h" for h in range(0, 24, 2)]
             )
             
-            return json.loads(fig.to_json())
+            return self._figure_to_dict(fig)
             
         except Exception as e:
             logger.error(f"Erreur patterns horaires: {e}")
@@ -382,14 +405,13 @@ class ChartGenerator:
             print(f"🔍 DEBUG Heatmap - Données initiales: {len(consumption_df)} lignes")
             
             # Préparation des données
-            consumption_df['timestamp'] = pd.to_datetime(consumption_df['timestamp'])
-            consumption_df['hour'] = consumption_df['timestamp'].dt.hour
-            consumption_df['day_of_week'] = consumption_df['timestamp'].dt.dayofweek
-            consumption_df['day_name'] = consumption_df['timestamp'].dt.day_name()
+            timestamps = pd.to_datetime(consumption_df['timestamp'])
+            hours = timestamps.dt.hour.rename('hour')
+            days = timestamps.dt.dayofweek.rename('day_of_week')
             
-            print(f"🔍 Période: {consumption_df['timestamp'].min()} à {consumption_df['timestamp'].max()}")
-            print(f"🔍 Heures uniques: {sorted(consumption_df['hour'].unique())}")
-            print(f"🔍 Jours uniques: {sorted(consumption_df['day_of_week'].unique())}")
+            print(f"🔍 Période: {timestamps.min()} à {timestamps.max()}")
+            print(f"🔍 Heures uniques: {sorted(hours.unique())}")
+            print(f"🔍 Jours uniques: {sorted(days.unique())}")
             
             # Vérifier qu'on a la colonne 'y'
             if 'y' not in consumption_df.columns:
@@ -397,7 +419,7 @@ class ChartGenerator:
                 return self._create_empty_chart("Heatmap Consommation")
             
             # Agrégation par jour et heure - MOYENNE des consommations
-            grouped_data = consumption_df.groupby(['day_of_week', 'hour'])['y'].mean().reset_index()
+            grouped_data = consumption_df.groupby([days, hours])['y'].mean().reset_index()
             print(f"🔍 Données groupées: {len(grouped_data)} combinaisons jour/heure")
             
             if grouped_data.empty:
@@ -478,7 +500,7 @@ class ChartGenerator:
                 side='left'
             )
             
-            return json.loads(fig.to_json())
+            return self._figure_to_dict(fig)
             
         except Exception as e:
             logger.error(f"Erreur heatmap consommation: {e}")
@@ -500,56 +522,57 @@ class ChartGenerator:
             consumption_daily.columns = ['date', 'total_consumption']
             
             # Météo quotidienne (moyenne)
-            weather_df['date'] = pd.to_datetime(weather_df['timestamp']).dt.date
+            weather_dates = pd.to_datetime(weather_df['timestamp']).dt.date.rename('date')
             weather_cols = [col for col in weather_df.columns if col not in ['unique_id', 'timestamp', 'date']]
             
             if weather_cols:
                 # Prendre la première colonne météo (probablement température)
                 temp_col = weather_cols[0]
-                weather_daily = weather_df.groupby('date')[temp_col].mean().reset_index()
+                weather_daily = weather_df.groupby(weather_dates)[temp_col].mean().reset_index()
                 weather_daily.columns = ['date', 'temperature']
                 
                 # Jointure des données
                 merged_data = pd.merge(consumption_daily, weather_daily, on='date', how='inner')
                 
                 if not merged_data.empty:
-                    fig = go.Figure()
+                    temperature = merged_data['temperature'].to_numpy(dtype=np.float64)
+                    consumption = merged_data['total_consumption'].to_numpy(dtype=np.float64)
                     
-                    fig.add_trace(go.Scatter(
-                        x=merged_data['temperature'],
-                        y=merged_data['total_consumption'],
-                        mode='markers',
-                        name='Consommation vs Température',
-                        marker=dict(
-                            color=merged_data['total_consumption'],
-                            colorscale='Viridis',
-                            showscale=True,
-                            size=8,
-                            colorbar=dict(title="Consommation (kWh)")
-                        ),
-                        hovertemplate='<b>Température:</b> %{x:.1f}°C<br><b>Consommation:</b> %{y:.1f} kWh<extra></extra>'
-                    ))
+                    scatter = {
+                        'type': 'scatter',
+                        'x': self._trace_values(temperature),
+                        'y': self._trace_values(consumption),
+                        'mode': 'markers',
+                        'name': 'Consommation vs Température',
+                        'marker': {
+                            'color': self._trace_values(consumption),
+                            'colorscale': 'Viridis',
+                            'showscale': True,
+                            'size': 8,
+                            'colorbar': {'title': {'text': "Consommation (kWh)"}}
+                        },
+                        'hovertemplate': '<b>Température:</b> %{x:.1f}°C<br><b>Consommation:</b> %{y:.1f} kWh<extra></extra>'
+                    }
                     
                     # Ligne de tendance
-                    z = np.polyfit(merged_data['temperature'], merged_data['total_consumption'], 1)
+                    z = np.polyfit(temperature, consumption, 1)
                     p = np.poly1d(z)
                     
-                    fig.add_trace(go.Scatter(
-                        x=merged_data['temperature'],
-                        y=p(merged_data['temperature']),
-                        mode='lines',
-                        name='Tendance',
-                        line=dict(color=self.color_palette['danger'], width=2, dash='dash')
-                    ))
+                    trend = {
+                        'type': 'scatter',
+                        'x': self._trace_values(temperature),
+                        'y': self._trace_values(p(temperature)),
+                        'mode': 'lines',
+                        'name': 'Tendance',
+                        'line': {'color': self.color_palette['danger'], 'width': 2, 'dash': 'dash'}
+                    }
                     
-                    fig.update_layout(
-                        title='Corrélation Température vs Consommation',
-                        xaxis_title='Température (°C)',
-                        yaxis_title='Consommation Totale (kWh)',
-                        **self.dark_template['layout']
+                    return self._raw_figure(
+                        [scatter, trend],
+                        title={'text': 'Corrélation Température vs Consommation'},
+                        xaxis=self._axis_layout('xaxis', 'Température (°C)'),
+                        yaxis=self._axis_layout('yaxis', 'Consommation Totale (kWh)')
                     )
-                    
-                    return json.loads(fig.to_json())
             
             return self._create_empty_chart("Corrélation Météo")
             
@@ -565,7 +588,7 @@ class ChartGenerator:
                 return self._create_empty_chart("Analyse par Zone")
             
             # Statistiques par zone
-            zone_stats = buildings_df.groupby('zone_name').agg({
+            zone_stats = buildings_df.groupby('zone_name', observed=True).agg({
                 'unique_id': 'count',
                 'surface_area_m2': 'sum'
             }).reset_index()
@@ -573,14 +596,14 @@ class ChartGenerator:
             
             # Ajout de la consommation si disponible
             if consumption_df is not None and not consumption_df.empty:
-                consumption_by_zone = consumption_df.groupby('unique_id')['y'].sum().reset_index()
+                consumption_by_zone = consumption_df.groupby('unique_id', observed=True)['y'].sum().reset_index()
                 
                 # Jointure avec les bâtiments pour obtenir les zones
                 buildings_consumption = buildings_df[['unique_id', 'zone_name']].merge(
                     consumption_by_zone, on='unique_id', how='inner'
                 )
                 
-                zone_consumption = buildings_consumption.groupby('zone_name')['y'].sum().reset_index()
+                zone_consumption = buildings_consumption.groupby('zone_name', observed=True)['y'].sum().reset_index()
                 zone_consumption.columns = ['zone', 'total_consumption']
                 
                 zone_stats = zone_stats.merge(zone_consumption, on='zone', how='left')
@@ -608,7 +631,7 @@ class ChartGenerator:
                 **self.dark_template['layout']
             )
             
-            return json.loads(fig.to_json())
+            return self._figure_to_dict(fig)
             
         except Exception as e:
             logger.error(f"Erreur analyse zones: {e}")
@@ -647,7 +670,7 @@ class ChartGenerator:
                 **self.dark_template['layout']
             )
             
-            return json.loads(fig.to_json())
+            return self._figure_to_dict(fig)
             
         except Exception as e:
             logger.error(f"Erreur distribution surfaces: {e}")
@@ -661,7 +684,7 @@ class ChartGenerator:
                 return self._create_empty_chart("Consommation par Type")
             
             # Jointure des données
-            consumption_by_building = consumption_df.groupby('unique_id')['y'].sum().reset_index()
+            consumption_by_building = consumption_df.groupby('unique_id', observed=True)['y'].sum().reset_index()
             consumption_by_building.columns = ['unique_id', 'total_consumption']
             
             merged_data = buildings_df[['unique_id', 'building_type']].merge(
@@ -669,7 +692,7 @@ class ChartGenerator:
             )
             
             # Agrégation par type
-            type_consumption = merged_data.groupby('building_type').agg({
+            type_consumption = merged_data.groupby('building_type', observed=True).agg({
                 'total_consumption': ['sum', 'mean', 'count']
             }).round(2)
             
@@ -704,7 +727,7 @@ class ChartGenerator:
                 **self.dark_template['layout']
             )
             
-            return json.loads(fig.to_json())
+            return self._figure_to_dict(fig)
             
         except Exception as e:
             logger.error(f"Erreur consommation par type: {e}")
@@ -716,8 +739,8 @@ class ChartGenerator:
             return df
         
         try:
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            end_date = df['timestamp'].max()
+            timestamps = pd.to_datetime(df['timestamp'])
+            end_date = timestamps.max()
             
             if time_range == '7d':
                 start_date = end_date - pd.Timedelta(days=7)
@@ -728,12 +751,21 @@ class ChartGenerator:
             else:
                 return df
             
-            return df[df['timestamp'] >= start_date]
+            return df[timestamps >= start_date]
             
         except Exception as e:
             logger.error(f"Erreur filtrage temporel: {e}")
             return df
     
+    def _downsample_series(self, df: pd.DataFrame, value_column: str) -> pd.DataFrame:
+        """Réduit une série horaire à max_trace_points lignes (LTTB sur value_column)"""
+        if len(df) <= self.max_trace_points:
+            return df
+        
+        x = df['timestamp'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        y = df[value_column].to_numpy(dtype=np.float64)
+        return df.iloc[lttb_indices(x, y, self.max_trace_points)]
+    
     def _create_empty_chart(self, title: str) -> Dict:
         """Crée un graphique vide avec message"""
         fig = go.Figure()
@@ -754,8 +786,41 @@ class ChartGenerator:
             **self.dark_template['layout']
         )
         
-        return json.loads(fig.to_json())
+        return self._figure_to_dict(fig)
+
+    def _raw_figure(self, traces: List[Dict], **layout) -> Dict:
+        """
+        Construit une figure brute {'data', 'layout'} sans passer par go.Figure
+        
+        Les tableaux numpy sont conservés tels quels et encodés directement
+        par orjson, sans validation ni copie profonde par Plotly.
+        """
+        full_layout = {'template': self._plotly_template}
+        full_layout.update(self.dark_template['layout'])
+        full_layout.update(layout)
+        return {'data': traces, 'layout': full_layout}
+    
+    def _axis_layout(self, axis: str, title: str) -> Dict:
+        """Axe du thème sombre complété par son titre"""
+        return {**self.dark_template['layout'][axis], 'title': {'text': title}}
     
+    def _trace_values(self, values: Any) -> Any:
+        """Valeurs de trace : tableau numpy si orjson est actif, liste JSON sinon"""
+        values = np.asarray(values)
+        if ORJSON_AVAILABLE:
+            return values
+        
+        if values.dtype.kind == 'M':
+            return np.datetime_as_string(values, unit='s').tolist()
+        if values.dtype.kind == 'f':
+            return np.where(np.isnan(values), None, values).tolist()
+        return values.tolist()
+    
+    def _figure_to_dict(self, fig: go.Figure) -> Dict:
+        """Convertit une figure Plotly en dictionnaire (moteur orjson, sans revalidation)"""
+        raw = pio.to_json(fig, validate=False, engine=PLOTLY_JSON_ENGINE)
+        return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+
     def create_kpi_metrics(self, data: Dict) -> Dict:
         """Crée les métriques KPI pour le dashboard"""
         try:
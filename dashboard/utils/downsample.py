@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SOUS-ÉCHANTILLONNAGE - DASHBOARD MALAYSIA
+========================================
+
+Réduction des séries temporelles avant envoi à Plotly via l'algorithme
+LTTB (Largest-Triangle-Three-Buckets), qui conserve l'allure visuelle
+de la courbe avec quelques milliers de points
+
+Version: 1.0.0
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices des points retenus par LTTB (x croissant, sans NaN sur y)"""
+    n = x.shape[0]
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[n_out - 1] = n - 1
+
+    bucket_size = (n - 2) / (n_out - 2)
+    anchor = 0
+
+    for i in range(n_out - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+
+        # Moyenne du seau suivant (le dernier point pour le dernier seau)
+        next_start = end
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Point du seau courant formant le plus grand triangle
+        areas = np.abs(
+            (x[anchor] - avg_x) * (y[start:end] - y[anchor]) -
+            (x[anchor] - x[start:end]) * (avg_y - y[anchor])
+        )
+        anchor = start + int(np.argmax(areas))
+        indices[i + 1] = anchor
+
+    return indices
+
+
+if NUMBA_AVAILABLE:
+    _lttb_indices = njit(cache=True)(_lttb_indices)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Sélectionne les indices des points à conserver
+
+    Args:
+        x: Abscisses croissantes (converties en float64)
+        y: Ordonnées (float64, sans NaN)
+        n_out: Nombre de points souhaité
+
+    Returns:
+        np.ndarray: Indices triés des points conservés
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n, dtype=np.int64)
+
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    return _lttb_indices(x, y, int(n_out))
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sous-échantillonne une série (x, y) à n_out points
+
+    Returns:
+        Tuple: (x, y) réduits
+    """
+    indices = lttb_indices(x, y, n_out)
+    return np.asarray(x)[indices], np.asarray(y)[indices]
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FOURNISSEUR JSON - DASHBOARD MALAYSIA
+====================================
+
+Fournisseur JSON Flask basé sur orjson pour accélérer la sérialisation
+des réponses volumineuses (graphiques, cartes, heatmaps)
+
+Version: 1.0.0
+"""
+
+import logging
+from typing import Any, Union
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Fournisseur JSON Flask utilisant orjson (encodage C, tableaux numpy natifs)"""
+
+    if ORJSON_AVAILABLE:
+        # Les datetime Python passent par le fallback Flask (format http_date
+        # inchangé) ; les datetime64 numpy restent en ISO 8601 sans fuseau,
+        # format attendu par Plotly.js
+        options = (
+            orjson.OPT_SERIALIZE_NUMPY |
+            orjson.OPT_NON_STR_KEYS |
+            orjson.OPT_PASSTHROUGH_DATETIME
+        )
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Sérialise un objet en JSON via orjson"""
+        option = self.options
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+
+        # Les types non gérés (pd.Timestamp, UUID, dataclass...) passent par
+        # le fallback Flask pour conserver le format de sortie existant
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        """Désérialise du JSON via orjson"""
+        return orjson.loads(s)
+
+
+def install_json_provider(app) -> bool:
+    """
+    Remplace le fournisseur JSON de l'application Flask par orjson
+
+    Args:
+        app: Application Flask
+
+    Returns:
+        bool: True si orjson est actif
+    """
+    if not ORJSON_AVAILABLE:
+        logger.info("ℹ️ orjson non disponible - encodeur JSON standard conservé")
+        return False
+
+    app.json = OrjsonProvider(app)
+    logger.info("✅ Fournisseur JSON orjson activé")
+    return True
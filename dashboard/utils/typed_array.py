@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TABLEAUX TYPÉS - DASHBOARD MALAYSIA
+==================================
+
+Conversion des tableaux numpy en spécifications typées base64
+({"dtype": "f8", "bdata": "..."}), le format standardisé par Plotly,
+pour éviter l'encodage JSON nombre par nombre des réponses cartographiques
+
+Version: 1.0.0
+"""
+
+from typing import Any, Dict
+
+import numpy as np
+
+try:
+    import pybase64 as base64
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    import base64
+    PYBASE64_AVAILABLE = False
+
+# Types décodés côté client (unpackTypedArrays de dashboard-map.js) ;
+# Plotly et les TypedArray JavaScript n'ont pas d'équivalent 64 bits entier
+_TYPED_DTYPES = frozenset({'f8', 'f4', 'i4', 'i2', 'i1', 'u4', 'u2', 'u1', 'b1'})
+
+
+def to_typed_array(values: np.ndarray) -> Dict:
+    """
+    Convertit un tableau numpy en spécification typée base64
+
+    Args:
+        values: Tableau numpy numérique
+
+    Returns:
+        Dict: {'dtype': ..., 'bdata': ...} (plus 'shape' si multidimensionnel)
+    """
+    values = np.ascontiguousarray(values)
+    spec = {
+        'dtype': values.dtype.str[1:],
+        'bdata': base64.b64encode(values.tobytes()).decode('ascii')
+    }
+    if values.ndim > 1:
+        spec['shape'] = list(values.shape)
+    return spec
+
+
+def _to_supported_dtype(values: np.ndarray) -> np.ndarray:
+    """
+    Convertit un tableau numérique vers un type de _TYPED_DTYPES (petit-boutiste)
+
+    Les entiers 64 bits passent en 32 bits s'ils tiennent dans l'intervalle,
+    sinon en float64 ; les flottants 16 bits en float32, les plus larges en float64.
+    """
+    if values.dtype.kind in 'iu' and values.dtype.itemsize > 4:
+        target = np.int32 if values.dtype.kind == 'i' else np.uint32
+        info = np.iinfo(target)
+        if values.size and (values.min() < info.min or values.max() > info.max):
+            target = np.float64
+        values = values.astype(target)
+    elif values.dtype.kind == 'f' and values.dtype.itemsize < 4:
+        values = values.astype(np.float32)
+    elif values.dtype.kind == 'f' and values.dtype.itemsize > 8:
+        values = values.astype(np.float64)
+    return values.astype(values.dtype.newbyteorder('<'), copy=False)
+
+
+def pack_arrays(obj: Any) -> Any:
+    """
+    Remplace récursivement les tableaux numpy numériques par des spécifications typées
+
+    Seuls les dict/list/tuple sont parcourus ; les autres valeurs sont
+    retournées telles quelles.
+    """
+    if isinstance(obj, np.ndarray):
+        # Les tableaux d'objets (chaînes, dates) restent encodés normalement
+        if obj.dtype.kind in 'biuf':
+            values = _to_supported_dtype(obj)
+            if values.dtype.str[1:] in _TYPED_DTYPES:
+                return to_typed_array(values)
+        return obj.tolist()
+    if isinstance(obj, dict):
+        return {key: pack_arrays(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [pack_arrays(value) for value in obj]
+    return obj